@@ -0,0 +1,212 @@
+"""
+Background runner for asynchronous sentiment analysis jobs.
+
+Jobs live in the ``analysis_jobs`` table (see models.AnalysisJob), so a
+restart does not lose them. Each process runs a small thread pool; a worker
+claims a job with a conditional UPDATE, so exactly one process runs it even
+when several gunicorn workers see it. A running job refreshes its heartbeat
+every third of the lease, and a sweeper thread in every process re-queues
+jobs whose worker has gone quiet for longer than the lease (a crashed or
+restarted process), then purges finished jobs past their retention period.
+A queued job's heartbeat is stamped when a process queues it, so a backlog
+waiting on a live process is left alone.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+
+from models import db, AnalysisJob
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def job_key(products):
+    """Identical analyses (same products, ignoring case and spacing) share one key."""
+    return "|".join(" ".join(p.lower().split()) for p in products)
+
+
+class AnalysisJobRunner:
+    """Runs ``run(job, progress)`` for each submitted job; ``progress(fraction)`` records progress.
+
+    ``run`` executes inside an app context and returns the JSON-serialisable
+    result. Anything it stages on ``db.session`` is committed with the result.
+    """
+
+    def __init__(self, run, workers=2, retention_seconds=3600, lease_seconds=60, max_attempts=3):
+        self._run = run
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.app = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._local = set()  # ids of jobs waiting in or run by this process's executor
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['analysis_jobs'] = self
+
+    def _ensure_started(self):
+        # Threads start on first use, in the process that uses them (gunicorn --preload forks after import).
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='analysis-job')
+            self._local = set()
+            threading.Thread(target=self._sweep_forever, name='analysis-job-sweeper', daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, products, user_id=None):
+        """Queues an analysis of products, or returns the queued/running job for the same products.
+
+        Returns (job, created). Commits the session.
+        """
+        self._ensure_started()
+        key = job_key(products)
+        with self._lock:
+            job = AnalysisJob.query.filter(
+                AnalysisJob.job_key == key, AnalysisJob.status.in_([QUEUED, RUNNING])
+            ).first()
+            if job is not None:
+                return job, False
+            job = AnalysisJob(
+                id=uuid.uuid4().hex, job_key=key, user_id=user_id,
+                product1=products[0], product2=products[1] if len(products) > 1 else None,
+                status=QUEUED, progress=0.0, attempts=0
+            )
+            db.session.add(job)
+            db.session.commit()
+        self._queue_local(job.id)
+        return job, True
+
+    def _queue_local(self, job_id):
+        with self._lock:
+            self._local.add(job_id)
+        self._executor.submit(self._execute, job_id)
+
+    def get(self, job_id):
+        """Returns the job, or None when unknown or past its retention period."""
+        self._ensure_started()
+        job = db.session.get(AnalysisJob, job_id)
+        if job is None or (job.expires_at and job.expires_at < datetime.utcnow()):
+            return None
+        return job
+
+    def _claim(self, job_id):
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lease_seconds)
+        claimed = AnalysisJob.query.filter(
+            AnalysisJob.id == job_id,
+            or_(AnalysisJob.status == QUEUED,
+                (AnalysisJob.status == RUNNING) & (AnalysisJob.heartbeat_at < stale))
+        ).update({
+            'status': RUNNING, 'started_at': now, 'heartbeat_at': now,
+            'attempts': AnalysisJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def _execute(self, job_id):
+        with self.app.app_context():
+            stop_heartbeat = threading.Event()
+            try:
+                if not self._claim(job_id):
+                    return
+                job = db.session.get(AnalysisJob, job_id)
+                threading.Thread(target=self._heartbeat, args=(job_id, stop_heartbeat), daemon=True).start()
+
+                def progress(fraction):
+                    job.progress = max(0.0, min(1.0, fraction))
+                    db.session.commit()
+
+                logger.info(f"Running analysis job {job_id} for {', '.join(job.products)} (attempt {job.attempts})")
+                try:
+                    result = self._run(job, progress)
+                    job.result = json.dumps(result)
+                    job.status, job.progress, job.error = DONE, 1.0, None
+                except Exception as e:
+                    logger.error(f"Analysis job {job_id} failed: {e}")
+                    db.session.rollback()
+                    job = db.session.get(AnalysisJob, job_id)
+                    job.status, job.error = FAILED, str(e)
+                job.finished_at = datetime.utcnow()
+                job.expires_at = job.finished_at + timedelta(seconds=self.retention_seconds)
+                db.session.commit()
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} could not be recorded: {e}")
+                db.session.rollback()
+            finally:
+                stop_heartbeat.set()
+                with self._lock:
+                    self._local.discard(job_id)
+                db.session.remove()
+
+    def _heartbeat(self, job_id, stop):
+        # Keeps the lease of a running job fresh however long a single step takes.
+        with self.app.app_context():
+            try:
+                while not stop.wait(self.lease_seconds / 3):
+                    AnalysisJob.query.filter_by(id=job_id, status=RUNNING).update(
+                        {'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+                    db.session.commit()
+            except Exception as e:
+                logger.error(f"Heartbeat for analysis job {job_id} failed: {e}")
+            finally:
+                db.session.remove()
+
+    def _sweep_forever(self):
+        interval = max(1.0, min(self.lease_seconds / 4, 30.0))
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Analysis job sweep failed: {e}")
+            time.sleep(interval)
+
+    def sweep(self):
+        """Re-queues abandoned jobs, fails those out of attempts, and purges expired ones."""
+        with self.app.app_context():
+            try:
+                now = datetime.utcnow()
+                stale = now - timedelta(seconds=self.lease_seconds)
+                abandoned = AnalysisJob.query.filter(
+                    AnalysisJob.status.in_([QUEUED, RUNNING]), AnalysisJob.heartbeat_at < stale
+                ).all()
+                with self._lock:
+                    local = set(self._local)
+                requeue = []
+                for job in abandoned:
+                    if job.id in local:
+                        continue  # still waiting for (or run by) a worker of this process
+                    if job.status == RUNNING and job.attempts >= self.max_attempts:
+                        job.status, job.error = FAILED, f"Abandoned after {job.attempts} attempts"
+                        job.finished_at = now
+                        job.expires_at = now + timedelta(seconds=self.retention_seconds)
+                    else:
+                        if job.status == QUEUED:
+                            job.heartbeat_at = now  # queued here now; other processes leave it for a lease
+                        requeue.append(job.id)
+                purged = AnalysisJob.query.filter(AnalysisJob.expires_at < now).delete(synchronize_session=False)
+                db.session.commit()
+                for job_id in requeue:
+                    self._queue_local(job_id)
+                if requeue or purged:
+                    logger.info(f"Analysis job sweep: {len(requeue)} re-queued, {purged} purged")
+            finally:
+                db.session.remove()
@@ -2,21 +2,116 @@
 REST API endpoints for the Sentiment Analysis application.
 Provides JSON responses for the Angular frontend.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, g, current_app
 from flask_jwt_extended import (
     create_access_token, jwt_required, get_jwt_identity,
     create_refresh_token, get_jwt
 )
-from models import db, User, SearchHistory, SmartphoneScore
-from app_backend.sentiment_logic import get_product_sentiment_analysis
+from models import db, User, SearchHistory, SmartphoneScore, RecentSearch
+from app_backend.sentiment_logic import (
+    get_product_sentiment_analysis, stream_product_sentiment_analysis, word_cloud_status, readiness, start_warm_up
+)
+from app_backend.batch_analysis import iter_batch_analysis, unique_products
+from app_backend.metrics import registry as metrics_registry, timed, API_REQUEST_SECONDS
+from analysis_jobs import AnalysisJobRunner
+from leaderboard import leaderboard
+from history_buffer import search_history_buffer
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import base64
+import gzip
+import hashlib
+import json
 import logging
+import os
+import queue
+import time
+
+try:
+    import brotli
+except ImportError:  # optional: responses fall back to gzip
+    brotli = None
 
 logger = logging.getLogger(__name__)
 
+# Runs the second product of a comparison while the request thread handles the first
+_analysis_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ANALYSIS_WORKERS', '4')), thread_name_prefix='analysis'
+)
+
 # Create API blueprint
 api = Blueprint('api', __name__, url_prefix='/api')
 
+
+@api.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@api.after_request
+def _observe_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        API_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=request.endpoint or 'unknown',
+                                    method=request.method, status=str(response.status_code))
+    return response
+
+
+# ==================== Conditional GET and Compression ====================
+
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+_ENCODING_SUFFIXES = ('', '-br', '-gzip')  # compressed bodies get the encoding appended to their ETag
+
+
+def _etag(*parts):
+    """Strong ETag from the data versions (and request arguments) a response is built from"""
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _validated(response, etag):
+    """Attach etag; clients keep the body but revalidate it on every use"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _client_has(etag):
+    """True when If-None-Match already names etag, in any encoding"""
+    return any(request.if_none_match.contains(etag + suffix) for suffix in _ENCODING_SUFFIXES)
+
+
+def _not_modified(etag):
+    """The 304 for _client_has(etag), carrying the tag of the encoding the client holds"""
+    held = next(etag + suffix for suffix in _ENCODING_SUFFIXES if request.if_none_match.contains(etag + suffix))
+    return _validated(Response(status=304), held)
+
+
+@api.after_request
+def _compress_response(response):
+    """Compress JSON bodies of at least COMPRESS_MIN_BYTES with brotli or gzip, as the client accepts"""
+    if (response.status_code != 200 or response.mimetype != 'application/json' or response.is_streamed
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if brotli is not None and request.accept_encodings['br']:
+        encoding, body = 'br', brotli.compress(body, quality=BROTLI_QUALITY)
+    elif request.accept_encodings['gzip']:
+        encoding, body = 'gzip', gzip.compress(body, compresslevel=GZIP_LEVEL)
+    else:
+        return response
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
 # ==================== Authentication Endpoints ====================
 
 @api.route('/auth/register', methods=['POST'])
@@ -138,92 +233,98 @@ def get_current_user():
 
 # ==================== Sentiment Analysis Endpoints ====================
 
+def _absolutize_result_urls(results):
+    """Convert relative URLs to absolute URLs for Angular frontend"""
+    if results.get('word_cloud_url'):
+        results['word_cloud_url'] = request.host_url.rstrip('/') + results['word_cloud_url']
+    if results.get('product_image_url') and results['product_image_url'].startswith('/'):
+        results['product_image_url'] = request.host_url.rstrip('/') + results['product_image_url']
+    if results.get('word_cloud_status_url'):
+        results['word_cloud_status_url'] = request.host_url.rstrip('/') + results['word_cloud_status_url']
+
+
+def _record_analysis(product_name, results, user_id, aggregates=None):
+    """Stage the search history entry and smartphone score for one analysis (no commit)"""
+    search_history_buffer.record(product_name, user_id)
+    _record_score(product_name, results, aggregates)
+
+
+def _record_score(product_name, results, aggregates=None):
+    """Stage the smartphone score update for one analysis (no commit)"""
+    SmartphoneScore.record_results({product_name: results}, {product_name: aggregates})
+
+
+def _analyze_products(products, progress=None, timings=None, with_version=False, aggregates=None):
+    """Analyze one or two products in parallel: the second on the pool, the first in this thread
+
+    timings, when given, is a list with one dict per product to receive stage timings;
+    aggregates likewise receives each product's exact score sums.
+    with_version returns (results, version) pairs (see get_product_sentiment_analysis).
+    """
+    timings = timings or [None] * len(products)
+    aggregates = aggregates or [None] * len(products)
+    future2 = _analysis_executor.submit(get_product_sentiment_analysis, products[1], True, timings[1], with_version, aggregates[1]) if len(products) == 2 else None
+    all_results = [get_product_sentiment_analysis(products[0], True, timings[0], with_version, aggregates[0])]
+    if progress:
+        progress(len(all_results) / len(products))
+    if future2 is not None:
+        all_results.append(future2.result())
+    return all_results
+
+
 @api.route('/sentiment/analyze', methods=['GET'])
 @jwt_required()
 def analyze_sentiment():
-    """Analyze sentiment for one or two products"""
+    """Analyze sentiment for one or two products
+
+    With debug=1 the response also has a 'timings' block: cache outcome and
+    per-stage milliseconds for each product, the DB commit and the request.
+    Otherwise the ETag is built from the cached results' versions, and a
+    matching If-None-Match gets a 304 (the search is still recorded).
+    """
     try:
+        started = time.perf_counter()
         current_user_id = int(get_jwt_identity())
         product1 = request.args.get('product1')
         product2 = request.args.get('product2')
+        debug = request.args.get('debug', '').lower() in ('1', 'true', 'yes')
         
         if not product1:
             return jsonify({'error': 'product1 parameter is required'}), 400
         
-        # Analyze first product
-        logger.info(f"Analyzing sentiment for: {product1}")
-        results1 = get_product_sentiment_analysis(product1)
-        
-        # Convert relative URLs to absolute URLs for Angular frontend
-        if results1.get('word_cloud_url'):
-            results1['word_cloud_url'] = request.host_url.rstrip('/') + results1['word_cloud_url']
-        if results1.get('product_image_url') and results1['product_image_url'].startswith('/'):
-            results1['product_image_url'] = request.host_url.rstrip('/') + results1['product_image_url']
-        
-        # Save to search history
-        search_entry = SearchHistory(product_name=product1, user_id=current_user_id)
-        db.session.add(search_entry)
-        
-        # Save/update smartphone score
-        existing_score = SmartphoneScore.query.filter_by(product_name=product1).first()
-        if existing_score:
-            existing_score.update_score(results1)
-        else:
-            new_score = SmartphoneScore(
-                product_name=product1,
-                overall_score=results1['overall_score'],
-                positive_count=results1['overall_sentiment']['positive'],
-                negative_count=results1['overall_sentiment']['negative'],
-                neutral_count=results1['overall_sentiment']['neutral'],
-                tweets_count=results1['tweets_count']
-            )
-            db.session.add(new_score)
-        
-        response_data = {
-            'product1': {
-                'name': product1,
-                'results': results1
-            }
-        }
-        
-        # Analyze second product if provided
+        products = [product1]
         if product2 and product2.strip():
-            logger.info(f"Analyzing sentiment for: {product2}")
-            results2 = get_product_sentiment_analysis(product2)
-            
-            # Convert relative URLs to absolute URLs for Angular frontend
-            if results2.get('word_cloud_url'):
-                results2['word_cloud_url'] = request.host_url.rstrip('/') + results2['word_cloud_url']
-            if results2.get('product_image_url') and results2['product_image_url'].startswith('/'):
-                results2['product_image_url'] = request.host_url.rstrip('/') + results2['product_image_url']
-            
-            # Save to search history
-            search_entry2 = SearchHistory(product_name=product2, user_id=current_user_id)
-            db.session.add(search_entry2)
-            
-            # Save/update smartphone score
-            existing_score2 = SmartphoneScore.query.filter_by(product_name=product2).first()
-            if existing_score2:
-                existing_score2.update_score(results2)
-            else:
-                new_score2 = SmartphoneScore(
-                    product_name=product2,
-                    overall_score=results2['overall_score'],
-                    positive_count=results2['overall_sentiment']['positive'],
-                    negative_count=results2['overall_sentiment']['negative'],
-                    neutral_count=results2['overall_sentiment']['neutral'],
-                    tweets_count=results2['tweets_count']
-                )
-                db.session.add(new_score2)
-            
-            response_data['product2'] = {
-                'name': product2,
-                'results': results2
+            products.append(product2)
+        
+        logger.info(f"Analyzing sentiment for: {', '.join(products)}")
+        product_timings = [{} for _ in products] if debug else None
+        aggregates = [{} for _ in products]
+        analyzed = _analyze_products(products, timings=product_timings, with_version=True, aggregates=aggregates)
+        
+        # Save search history and smartphone scores in a single transaction
+        response_data = {}
+        for key, product_name, (results, _), sums in zip(('product1', 'product2'), products, analyzed, aggregates):
+            _absolutize_result_urls(results)
+            _record_analysis(product_name, results, current_user_id, sums)
+            response_data[key] = {
+                'name': product_name,
+                'results': results
             }
         
-        db.session.commit()
+        request_timings = {}
+        with timed('db_commit', request_timings):
+            db.session.commit()
+        
+        if debug:
+            response_data['timings'] = dict(zip(('product1', 'product2'), product_timings))
+            response_data['timings'].update(request_timings, request_ms=round((time.perf_counter() - started) * 1000, 3))
+            return jsonify(response_data), 200
         
-        return jsonify(response_data), 200
+        # URLs in the results are absolute, so the host is part of the representation
+        etag = _etag('analyze', products, [version for _, version in analyzed], request.host_url)
+        if _client_has(etag):
+            return _not_modified(etag)
+        return _validated(jsonify(response_data), etag), 200
         
     except Exception as e:
         logger.error(f"Sentiment analysis error: {e}")
@@ -231,8 +332,278 @@ def analyze_sentiment():
         return jsonify({'error': 'Sentiment analysis failed'}), 500
 
 
+STREAM_KEEPALIVE_SECONDS = float(os.getenv('STREAM_KEEPALIVE_SECONDS', '15'))
+
+
+def _produce_events(key, product_name, events, aggregates):
+    """Push every (key, event, data) of one product's analysis onto events, then a None end marker
+
+    aggregates receives the exact score sums once the result is produced.
+    """
+    try:
+        for event, data in stream_product_sentiment_analysis(product_name, aggregates=aggregates):
+            events.put((key, event, data))
+    except Exception as e:
+        logger.error(f"Streaming analysis error for {product_name}: {e}")
+        events.put((key, 'error', {'error': 'Sentiment analysis failed'}))
+    finally:
+        events.put(None)
+
+
+def _format_event(fmt, event, product, data):
+    if fmt == 'sse':
+        return f"event: {event}\ndata: {current_app.json.dumps({'product': product, 'data': data})}\n\n"
+    return current_app.json.dumps({'event': event, 'product': product, 'data': data}) + "\n"
+
+
+@api.route('/sentiment/analyze/stream', methods=['GET'])
+@jwt_required()
+def analyze_sentiment_stream():
+    """Analyze one or two products, streaming events as each part of the analysis completes
+
+    format=ndjson (default) sends one JSON object per line; format=sse sends
+    Server-Sent Events. Per product: 'tweets', then 'sentiment' and 'aspects'
+    after each chunk of tweets, 'word_cloud', 'image' and 'specs' as they
+    finish, and 'result' with the same results as /sentiment/analyze ('error'
+    instead when it fails). A final 'done' event closes the stream.
+    """
+    current_user_id = int(get_jwt_identity())
+    product1 = request.args.get('product1')
+    product2 = request.args.get('product2')
+    fmt = request.args.get('format', 'ndjson').lower()
+
+    if not product1:
+        return jsonify({'error': 'product1 parameter is required'}), 400
+    if fmt not in ('ndjson', 'sse'):
+        return jsonify({'error': 'format must be ndjson or sse'}), 400
+
+    products = [product1]
+    if product2 and product2.strip():
+        products.append(product2)
+    keys = ('product1', 'product2')[:len(products)]
+
+    logger.info(f"Streaming sentiment analysis for: {', '.join(products)}")
+    events = queue.Queue()
+    aggregates = {key: {} for key in keys}
+    for key, product_name in zip(keys, products):
+        _analysis_executor.submit(_produce_events, key, product_name, events, aggregates[key])
+
+    def generate():
+        final_results = {}
+        running = len(products)
+        while running:
+            try:
+                item = events.get(timeout=STREAM_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                # Keeps proxies from closing an idle connection; ignored by clients
+                yield ": keepalive\n\n" if fmt == 'sse' else "\n"
+                continue
+            if item is None:
+                running -= 1
+                continue
+            key, event, data = item
+            _absolutize_result_urls(data)
+            if event == 'result':
+                final_results[key] = data
+            yield _format_event(fmt, event, key, data)
+
+        try:
+            for key, product_name in zip(keys, products):
+                if key in final_results:
+                    _record_analysis(product_name, final_results[key], current_user_id, aggregates[key])
+            with timed('db_commit'):
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Recording streamed analysis failed: {e}")
+            db.session.rollback()
+        yield _format_event(fmt, 'done', None, {'products': sorted(final_results)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if fmt == 'sse' else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+BATCH_MAX_PRODUCTS = int(os.getenv('BATCH_MAX_PRODUCTS', '500'))
+
+
+@api.route('/sentiment/batch', methods=['POST'])
+@jwt_required()
+def analyze_sentiment_batch():
+    """Analyze a list of products on a process pool, streaming each result as it finishes
+
+    Body: {"products": [...], "workers": optional process count}. Sends one
+    'result' (or 'error') event per product, as NDJSON or SSE (?format=sse),
+    then commits every smartphone score at once and sends 'done'.
+    """
+    data = request.get_json(silent=True) or {}
+    products = data.get('products')
+    fmt = request.args.get('format', 'ndjson').lower()
+
+    if not isinstance(products, list) or not all(isinstance(p, str) for p in products):
+        return jsonify({'error': 'products must be a list of product names'}), 400
+    products = unique_products(products)
+    if not products:
+        return jsonify({'error': 'products must contain at least one product name'}), 400
+    if len(products) > BATCH_MAX_PRODUCTS:
+        return jsonify({'error': f'At most {BATCH_MAX_PRODUCTS} products per batch'}), 400
+    if fmt not in ('ndjson', 'sse'):
+        return jsonify({'error': 'format must be ndjson or sse'}), 400
+    workers = data.get('workers')
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        return jsonify({'error': 'workers must be a positive integer'}), 400
+
+    logger.info(f"Batch sentiment analysis of {len(products)} products")
+
+    def generate():
+        scores = {}
+        aggregates = {}
+        failed = []
+        for item in iter_batch_analysis(products, workers, heartbeat_seconds=STREAM_KEEPALIVE_SECONDS, aggregates=aggregates):
+            if item is None:
+                yield ": keepalive\n\n" if fmt == 'sse' else "\n"
+                continue
+            product_name, results, error = item
+            if error:
+                failed.append(product_name)
+                yield _format_event(fmt, 'error', product_name, {'error': 'Sentiment analysis failed'})
+                continue
+            scores[product_name] = results
+            yield _format_event(fmt, 'result', product_name, results)
+
+        summary = {'analyzed': len(scores), 'failed': failed}
+        try:
+            summary['scores_updated'], summary['scores_created'] = SmartphoneScore.record_results(scores, aggregates)
+            with timed('db_commit'):
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Recording batch scores failed: {e}")
+            db.session.rollback()
+            summary['error'] = 'Failed to save smartphone scores'
+        yield _format_event(fmt, 'done', None, summary)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if fmt == 'sse' else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# ==================== Analysis Job Endpoints ====================
+
+def _run_analysis_job(job, progress):
+    """Run one queued analysis (job runner thread, app context, no request)"""
+    aggregates = [{} for _ in job.products]
+    all_results = _analyze_products(job.products, progress, aggregates=aggregates)
+    response_data = {}
+    for key, product_name, results, sums in zip(('product1', 'product2'), job.products, all_results, aggregates):
+        _record_score(product_name, results, sums)
+        response_data[key] = {
+            'name': product_name,
+            'results': results
+        }
+    return response_data
+
+
+analysis_job_runner = AnalysisJobRunner(
+    _run_analysis_job,
+    workers=int(os.getenv('ANALYSIS_JOB_WORKERS', '2')),
+    retention_seconds=int(os.getenv('ANALYSIS_JOB_RETENTION_SECONDS', '3600')),
+    lease_seconds=int(os.getenv('ANALYSIS_JOB_LEASE_SECONDS', '60'))
+)
+
+
+def _job_response(job):
+    data = job.to_dict()
+    data['status_url'] = request.host_url.rstrip('/') + f"/api/sentiment/jobs/{job.id}"
+    for product in (data['result'] or {}).values():
+        _absolutize_result_urls(product['results'])
+    return data
+
+
+@api.route('/sentiment/jobs', methods=['POST'])
+@jwt_required()
+def create_analysis_job():
+    """Queue an analysis of one or two products; identical in-flight jobs are shared"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        product1 = (data.get('product1') or '').strip()
+        product2 = (data.get('product2') or '').strip()
+        
+        if not product1:
+            return jsonify({'error': 'product1 is required'}), 400
+        
+        products = [product1] + ([product2] if product2 else [])
+        job, created = analysis_job_runner.submit(products, current_user_id)
+        
+        # The search is recorded for every user asking, even when the job is shared
+        for product_name in products:
+            search_history_buffer.record(product_name, current_user_id)
+        db.session.commit()
+        
+        data = _job_response(job)
+        data['deduplicated'] = not created
+        return jsonify(data), 202
+        
+    except Exception as e:
+        logger.error(f"Create analysis job error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to queue analysis'}), 500
+
+
+@api.route('/sentiment/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_analysis_job(job_id):
+    """Get the status, progress and (once done) result of an analysis job"""
+    try:
+        job = analysis_job_runner.get(job_id)
+        
+        if not job:
+            return jsonify({'error': 'Analysis job not found'}), 404
+        
+        # A finished job never changes, so polling it again costs a 304
+        etag = _etag('job', job.id, job.status, job.progress, job.attempts, job.finished_at, request.host_url)
+        if _client_has(etag):
+            return _not_modified(etag)
+        return _validated(jsonify(_job_response(job)), etag), 200
+        
+    except Exception as e:
+        logger.error(f"Get analysis job error: {e}")
+        return jsonify({'error': 'Failed to fetch analysis job'}), 500
+
+
+@api.route('/wordcloud/<job_id>', methods=['GET'])
+@jwt_required()
+def get_word_cloud_status(job_id):
+    """Get the status of a word cloud render; ?wait=N long-polls up to N seconds"""
+    try:
+        wait = min(max(request.args.get('wait', 0, type=float), 0), 30)
+        job = word_cloud_status(job_id, wait=wait)
+        
+        if not job:
+            return jsonify({'error': 'Word cloud job not found'}), 404
+        
+        return jsonify({
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'word_cloud_url': request.host_url.rstrip('/') + job['url'] if job['status'] == 'done' else None,
+            'error': job['error']
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Get word cloud status error: {e}")
+        return jsonify({'error': 'Failed to fetch word cloud status'}), 500
+
+
 # ==================== Smartphone Rankings Endpoints ====================
 
+def _ranked(entry, *fields):
+    """The given fields of a leaderboard entry (entries are shared, never modified)"""
+    return {field: entry[field] for field in fields}
+
+
 @api.route('/smartphones/top', methods=['GET'])
 @jwt_required()
 def get_top_smartphones():
@@ -241,24 +612,18 @@ def get_top_smartphones():
         limit = request.args.get('limit', 10, type=int)
         limit = min(limit, 50)  # Cap at 50
         
-        top_smartphones = SmartphoneScore.get_top_smartphones(limit)
+        version, rankings = leaderboard.snapshot()
+        etag = _etag('smartphones/top', version, limit)
+        if _client_has(etag):
+            return _not_modified(etag)
+        top_smartphones = rankings['overall'][:limit]
         
-        return jsonify({
-            'smartphones': [{
-                'product_name': phone.product_name,
-                'overall_score': phone.overall_score,
-                'positive_count': phone.positive_count,
-                'negative_count': phone.negative_count,
-                'neutral_count': phone.neutral_count,
-                'tweets_count': phone.tweets_count,
-                'price_usd': phone.price_usd,
-                'performance_score': phone.performance_score,
-                'battery_score': phone.battery_score,
-                'camera_score': phone.camera_score,
-                'value_for_money': phone.value_for_money,
-                'last_updated': phone.last_updated.isoformat() if phone.last_updated else None
-            } for phone in top_smartphones]
-        }), 200
+        return _validated(jsonify({
+            'smartphones': [_ranked(phone, 'product_name', 'overall_score', 'positive_count', 'negative_count',
+                                    'neutral_count', 'tweets_count', 'price_usd', 'performance_score',
+                                    'battery_score', 'camera_score', 'value_for_money', 'last_updated')
+                            for phone in top_smartphones]
+        }), etag), 200
         
     except Exception as e:
         logger.error(f"Get top smartphones error: {e}")
@@ -267,39 +632,112 @@ def get_top_smartphones():
 
 # ==================== Search History Endpoints ====================
 
+HISTORY_APPROX_TOTAL_CAP = int(os.getenv('HISTORY_APPROX_TOTAL_CAP', '1000'))
+
+
+def _encode_cursor(item):
+    """Opaque cursor pointing just past a history item (newest first)"""
+    return base64.urlsafe_b64encode(f"{item.search_time.isoformat()}|{item.id}".encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """(search_time, id) of a cursor; ValueError when it is malformed"""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    search_time, item_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(search_time), int(item_id)
+
+
+def _history_total(user_id, mode):
+    """(total, is_estimate) of a user's searches: 'exact' counts them all, 'approx' stops at the cap"""
+    query = db.session.query(SearchHistory.id).filter(SearchHistory.user_id == user_id)
+    if mode == 'exact':
+        return query.count(), False
+    counted = db.session.query(db.func.count()).select_from(query.limit(HISTORY_APPROX_TOTAL_CAP + 1).subquery()).scalar()
+    return min(counted, HISTORY_APPROX_TOTAL_CAP), counted > HISTORY_APPROX_TOTAL_CAP
+
+
+def _history_item(item):
+    return {
+        'id': item.id,
+        'product_name': item.product_name,
+        'search_time': item.search_time
+    }
+
+
 @api.route('/history', methods=['GET'])
 @jwt_required()
 def get_search_history():
-    """Get user's search history with pagination"""
+    """Get user's search history, newest first, one page at a time
+
+    Keyset pagination: pass the previous response's next_cursor as ?cursor=
+    to get the next page; each page costs an index range scan whatever its
+    depth. ?total=approx adds the number of searches, counted up to
+    HISTORY_APPROX_TOTAL_CAP (total_is_estimate is true past it), and
+    ?total=exact counts them all. ?page=N keeps the former offset
+    pagination and its response.
+    """
     try:
         current_user_id = int(get_jwt_identity())
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
-        per_page = min(per_page, 100)  # Cap at 100
-        
-        history_pagination = SearchHistory.query.filter_by(user_id=current_user_id)\
-            .order_by(SearchHistory.search_time.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
-        
-        return jsonify({
-            'history': [{
-                'id': item.id,
-                'product_name': item.product_name,
-                'search_time': item.search_time.isoformat()
-            } for item in history_pagination.items],
-            'total': history_pagination.total,
-            'pages': history_pagination.pages,
-            'current_page': page,
+        per_page = min(max(per_page, 1), 100)  # Cap at 100
+        
+        if 'page' in request.args:
+            return _get_search_history_page(current_user_id, request.args.get('page', 1, type=int), per_page)
+        
+        cursor = request.args.get('cursor')
+        total_mode = request.args.get('total')
+        query = SearchHistory.query.filter(SearchHistory.user_id == current_user_id)
+        if cursor:
+            try:
+                query = query.filter(db.tuple_(SearchHistory.search_time, SearchHistory.id) < _decode_cursor(cursor))
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        items = query.order_by(SearchHistory.search_time.desc(), SearchHistory.id.desc()).limit(per_page + 1).all()
+        has_next = len(items) > per_page
+        items = items[:per_page]
+        total, estimate = _history_total(current_user_id, total_mode) if total_mode in ('exact', 'approx') else (None, False)
+        
+        # Rows never change, so the ids on the page (plus the total) identify the response
+        etag = _etag('history', current_user_id, cursor, per_page, has_next, total, estimate, [item.id for item in items])
+        if _client_has(etag):
+            return _not_modified(etag)
+        
+        return _validated(jsonify({
+            'history': [_history_item(item) for item in items],
             'per_page': per_page,
-            'has_next': history_pagination.has_next,
-            'has_prev': history_pagination.has_prev
-        }), 200
+            'has_next': has_next,
+            'next_cursor': _encode_cursor(items[-1]) if has_next else None,
+            'total': total,
+            'total_is_estimate': estimate
+        }), etag), 200
         
     except Exception as e:
         logger.error(f"Get search history error: {e}")
         return jsonify({'error': 'Failed to fetch search history'}), 500
 
 
+def _get_search_history_page(user_id, page, per_page):
+    """Offset pagination (?page=N), kept for existing clients"""
+    history_pagination = SearchHistory.query.filter_by(user_id=user_id)\
+        .order_by(SearchHistory.search_time.desc(), SearchHistory.id.desc())\
+        .paginate(page=page, per_page=per_page, error_out=False)
+    
+    etag = _etag('history', user_id, page, per_page, history_pagination.total,
+                 [item.id for item in history_pagination.items])
+    if _client_has(etag):
+        return _not_modified(etag)
+    
+    return _validated(jsonify({
+        'history': [_history_item(item) for item in history_pagination.items],
+        'total': history_pagination.total,
+        'pages': history_pagination.pages,
+        'current_page': page,
+        'per_page': per_page,
+        'has_next': history_pagination.has_next,
+        'has_prev': history_pagination.has_prev
+    }), etag), 200
+
+
 @api.route('/history/recent', methods=['GET'])
 @jwt_required()
 def get_recent_history():
@@ -308,17 +746,19 @@ def get_recent_history():
         current_user_id = int(get_jwt_identity())
         limit = request.args.get('limit', 5, type=int)
         
-        # Get distinct product names ordered by most recent search
-        recent_searches = db.session.query(SearchHistory.product_name)\
-            .filter_by(user_id=current_user_id)\
-            .distinct()\
-            .order_by(db.func.max(SearchHistory.search_time).desc())\
-            .group_by(SearchHistory.product_name)\
+        # One row per product, kept current on every search: an index scan of limit rows
+        recent_searches = db.session.query(RecentSearch.product_name, RecentSearch.last_searched)\
+            .filter(RecentSearch.user_id == current_user_id)\
+            .order_by(RecentSearch.last_searched.desc())\
             .limit(limit).all()
         
-        return jsonify({
+        etag = _etag('history/recent', current_user_id, [tuple(item) for item in recent_searches])
+        if _client_has(etag):
+            return _not_modified(etag)
+        
+        return _validated(jsonify({
             'recent_searches': [item[0] for item in recent_searches]
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         logger.error(f"Get recent history error: {e}")
@@ -336,32 +776,19 @@ def get_performance_rankings():
         limit = request.args.get('limit', 10, type=int)
         limit = min(limit, 50)
         
-        if category == 'performance':
-            smartphones = SmartphoneScore.get_top_performance_smartphones(limit)
-        elif category == 'battery':
-            smartphones = SmartphoneScore.get_top_battery_smartphones(limit)
-        elif category == 'camera':
-            smartphones = SmartphoneScore.get_top_camera_smartphones(limit)
-        elif category == 'value':
-            smartphones = SmartphoneScore.get_top_value_smartphones(limit)
-        else:  # overall
-            smartphones = SmartphoneScore.get_top_smartphones(limit)
+        version, rankings = leaderboard.snapshot()
+        etag = _etag('performance/rankings', version, category, limit)
+        if _client_has(etag):
+            return _not_modified(etag)
+        smartphones = rankings.get(category, rankings['overall'])[:limit]  # unknown categories rank overall
         
-        return jsonify({
+        return _validated(jsonify({
             'category': category,
-            'smartphones': [{
-                'product_name': phone.product_name,
-                'overall_score': phone.overall_score,
-                'performance_score': phone.performance_score,
-                'battery_score': phone.battery_score,
-                'camera_score': phone.camera_score,
-                'value_for_money': phone.value_for_money,
-                'price_usd': phone.price_usd,
-                'positive_count': phone.positive_count,
-                'negative_count': phone.negative_count,
-                'neutral_count': phone.neutral_count
-            } for phone in smartphones]
-        }), 200
+            'smartphones': [_ranked(phone, 'product_name', 'overall_score', 'performance_score', 'battery_score',
+                                    'camera_score', 'value_for_money', 'price_usd', 'positive_count',
+                                    'negative_count', 'neutral_count')
+                            for phone in smartphones]
+        }), etag), 200
         
     except Exception as e:
         logger.error(f"Get performance rankings error: {e}")
@@ -376,36 +803,23 @@ def get_all_performance_categories():
         limit = request.args.get('limit', 10, type=int)
         limit = min(limit, 50)
         
-        return jsonify({
-            'overall': [{
-                'product_name': phone.product_name,
-                'overall_score': phone.overall_score,
-                'positive_count': phone.positive_count,
-                'negative_count': phone.negative_count,
-                'neutral_count': phone.neutral_count
-            } for phone in SmartphoneScore.get_top_smartphones(limit)],
-            'performance': [{
-                'product_name': phone.product_name,
-                'performance_score': phone.performance_score,
-                'overall_score': phone.overall_score
-            } for phone in SmartphoneScore.get_top_performance_smartphones(limit)],
-            'battery': [{
-                'product_name': phone.product_name,
-                'battery_score': phone.battery_score,
-                'overall_score': phone.overall_score
-            } for phone in SmartphoneScore.get_top_battery_smartphones(limit)],
-            'camera': [{
-                'product_name': phone.product_name,
-                'camera_score': phone.camera_score,
-                'overall_score': phone.overall_score
-            } for phone in SmartphoneScore.get_top_camera_smartphones(limit)],
-            'value': [{
-                'product_name': phone.product_name,
-                'value_for_money': phone.value_for_money,
-                'price_usd': phone.price_usd,
-                'overall_score': phone.overall_score
-            } for phone in SmartphoneScore.get_top_value_smartphones(limit)]
-        }), 200
+        version, rankings = leaderboard.snapshot()
+        etag = _etag('performance/all-categories', version, limit)
+        if _client_has(etag):
+            return _not_modified(etag)
+        
+        return _validated(jsonify({
+            'overall': [_ranked(phone, 'product_name', 'overall_score', 'positive_count', 'negative_count',
+                                'neutral_count') for phone in rankings['overall'][:limit]],
+            'performance': [_ranked(phone, 'product_name', 'performance_score', 'overall_score')
+                            for phone in rankings['performance'][:limit]],
+            'battery': [_ranked(phone, 'product_name', 'battery_score', 'overall_score')
+                        for phone in rankings['battery'][:limit]],
+            'camera': [_ranked(phone, 'product_name', 'camera_score', 'overall_score')
+                       for phone in rankings['camera'][:limit]],
+            'value': [_ranked(phone, 'product_name', 'value_for_money', 'price_usd', 'overall_score')
+                      for phone in rankings['value'][:limit]]
+        }), etag), 200
         
     except Exception as e:
         logger.error(f"Get all performance categories error: {e}")
@@ -416,8 +830,37 @@ def get_all_performance_categories():
 
 @api.route('/health', methods=['GET'])
 def health_check():
-    """API health check endpoint"""
+    """API health check endpoint (liveness: never waits on models or datasets)"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': datetime.utcnow()
     }), 200
+
+
+@api.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: 200 once NLP models and datasets are loaded, 503 while warming up"""
+    start_warm_up()
+    state = readiness()
+    return jsonify({
+        'status': state['status'],
+        'ready': state['ready'],
+        'steps_ms': state['steps_ms'],
+        'errors': state['errors'],
+        'timestamp': datetime.utcnow()
+    }), 200 if state['ready'] else 503
+
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage timings, cache and external call counters in the Prometheus text format
+
+    Open by default, like /health; set METRICS_TOKEN to require
+    'Authorization: Bearer <token>' from the scraper.
+    """
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -4,12 +4,14 @@ from dotenv import load_dotenv
 from models import db, bcrypt, User, SearchHistory, SmartphoneScore
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from json_provider import FastJSONProvider
 import logging
 from datetime import timedelta
 
 # --- App Initialization & Config ---
 load_dotenv()
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson-backed jsonify; datetimes serialise as ISO 8601
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default_fallback_secret_key')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -38,11 +40,26 @@ def test_route():
 db.init_app(app)
 bcrypt.init_app(app)
 
+# Background analysis jobs run in this app's context
+from api import analysis_job_runner
+analysis_job_runner.init_app(app)
+
+# Search history inserts, batched off the request path when HISTORY_WRITE_BEHIND=1
+from history_buffer import search_history_buffer
+search_history_buffer.init_app(app)
+
 # Initialize CORS and JWT
 CORS(app, resources={r"/api/*": {"origins": ["http://localhost:4200", "http://127.0.0.1:4200", "https://sentiment-frontend-z0tm.onrender.com"]}})
 jwt = JWTManager(app)
 logger.info("CORS and JWT initialized")
 
+# --- Warm-up ---
+# Load NLP models and datasets on a background thread so /api/health answers
+# right away; /api/ready turns 200 once analyses no longer pay for a cold start.
+if os.getenv('WARMUP_ON_START', '1') != '0':
+    from app_backend.sentiment_logic import start_warm_up
+    start_warm_up()
+
 # --- Create Database Tables & Required Directories ---
 # Commented out temporarily to debug route registration
 # with app.app_context():
@@ -0,0 +1,87 @@
+"""
+Multi-pattern aspect matcher for ASPECTS_KEYWORDS.
+
+All keywords of all aspects are compiled once into a single Aho-Corasick
+automaton over word tokens, so a sentence is scanned in one linear pass no
+matter how many keywords the table holds. Matching works on whole words:
+"os" no longer fires inside "most", nor "ui" inside "build". A keyword's last
+word also matches its plural ("speaker" -> "speakers", "touch" -> "touches").
+"""
+import hashlib
+import json
+import re
+from collections import deque
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_PLURAL_SUFFIXES = ("s", "es")
+
+
+def _words(text):
+    return _WORD_RE.findall(text.lower())
+
+
+class AspectMatcher:
+    """Finds every aspect whose keywords occur in a piece of text."""
+
+    def __init__(self, aspects_keywords):
+        self.aspects = list(aspects_keywords)
+        # Identifies the keyword table; used to key anything derived from matches.
+        self.version = hashlib.sha1(
+            json.dumps(aspects_keywords, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+
+        # State 0 is the root. _goto[state] maps a word to the next state and
+        # _outputs[state] holds the aspects of every keyword ending there,
+        # including those inherited through failure links.
+        self._goto = [{}]
+        self._outputs = [set()]
+        for aspect, keywords in aspects_keywords.items():
+            for keyword in keywords:
+                words = _words(keyword)
+                if not words:
+                    continue
+                for last in [words[-1]] + [words[-1] + suffix for suffix in _PLURAL_SUFFIXES]:
+                    self._add_pattern(words[:-1] + [last], aspect)
+        self._fail = [0] * len(self._goto)
+        self._build_failure_links()
+
+    def _add_pattern(self, words, aspect):
+        state = 0
+        for word in words:
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._outputs.append(set())
+                self._goto[state][word] = nxt
+            state = nxt
+        self._outputs[state].add(aspect)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(word, 0)
+                self._outputs[nxt] |= self._outputs[self._fail[nxt]]
+
+    def match(self, text):
+        """Returns the set of aspects mentioned in text."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = set()
+        state = 0
+        for word in _words(text):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+    def match_many(self, texts):
+        """Returns one aspect set per text."""
+        return [self.match(text) for text in texts]
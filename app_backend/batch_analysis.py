@@ -0,0 +1,94 @@
+"""
+Multi-product sentiment analysis on a process pool.
+
+Scoring tweets is CPU-bound Python, so a thread pool only ever uses one
+core; a batch of products is instead spread over worker processes, one per
+core by default. Each worker loads the NLP resources once and then analyzes
+products one after another. Results come back in completion order so a
+caller can stream them out.
+
+Workers are started with ``spawn`` (override with BATCH_START_METHOD): the
+web process is multi-threaded, and forking it could copy a lock held by
+another thread.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '0'))  # 0: one per core
+BATCH_START_METHOD = os.getenv('BATCH_START_METHOD', 'spawn')
+
+
+def batch_worker_count(products_count, workers=None):
+    """Processes to start for products_count products: workers, else BATCH_WORKERS, else the core count."""
+    workers = workers or BATCH_WORKERS or os.cpu_count() or 1
+    return max(1, min(workers, products_count))
+
+
+def unique_products(products):
+    """Drops blank names and repeats (ignoring case and spacing), keeping the first spelling."""
+    seen, unique = set(), []
+    for product in products:
+        name = " ".join((product or '').split())
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            unique.append(name)
+    return unique
+
+
+def _init_worker():
+    logging.basicConfig(level=logging.WARNING)
+    from app_backend.sentiment_logic import load_nlp_resources
+    load_nlp_resources()
+
+
+def _analyze(product_name):
+    # Runs in a worker process; the word cloud is skipped, nothing would serve it.
+    from app_backend.sentiment_logic import compute_product_sentiment_analysis
+    try:
+        aggregates = {}
+        return compute_product_sentiment_analysis(product_name, word_cloud=False, aggregates=aggregates), aggregates, None
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}"
+
+
+def iter_batch_analysis(products, workers=None, heartbeat_seconds=None, aggregates=None):
+    """Analyzes products on a process pool, yielding (product_name, results, error) as each finishes.
+
+    Exactly one of results and error is None. With heartbeat_seconds, None is
+    also yielded whenever nothing finished for that long, so a streaming
+    caller can keep its connection alive. When aggregates is a dict it
+    receives each analyzed product's exact score sums, keyed by product name.
+    """
+    products = unique_products(products)
+    if not products:
+        return
+    workers = batch_worker_count(len(products), workers)
+    logger.info(f"Batch analysis of {len(products)} products on {workers} processes")
+    context = multiprocessing.get_context(BATCH_START_METHOD)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        pending = {pool.submit(_analyze, product): product for product in products}
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=heartbeat_seconds, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield None
+                    continue
+                for future in done:
+                    product = pending.pop(future)
+                    try:
+                        results, sums, error = future.result()
+                    except Exception as e:  # the worker process died
+                        results, sums, error = None, None, f"{type(e).__name__}: {e}"
+                    if error:
+                        logger.error(f"Batch analysis of {product} failed: {error}")
+                    elif aggregates is not None:
+                        aggregates[product] = sums
+                    yield product, results, error
+        finally:
+            # Stop queued work when the caller gives up early (e.g. a closed connection)
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,133 @@
+"""
+Single-file SQLite cache store for external API responses.
+
+Replaces the old one-JSON-file-per-key layout of ``api_cache/``. Entries are
+keyed by the SHA-256 of the full cache key (no truncation, so distinct
+queries never collide), values are stored as compact JSON (zlib-compressed
+above a threshold), and expiry time is indexed so expired entries and the
+oldest entries beyond the size budget are evicted in bulk.
+
+The database runs in WAL mode, so any number of readers proceed while one
+writer commits; this is what makes it safe to share between gunicorn
+workers. Connections are per thread and re-opened after a fork.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+_COMPRESS_THRESHOLD = 512
+_FLAG_JSON = 0
+_FLAG_ZLIB_JSON = 1
+
+
+class SQLiteCacheStore:
+    """Key/value cache with TTL and a total size budget, backed by one SQLite file."""
+
+    def __init__(self, path, ttl, max_bytes, purge_interval=60.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._purge_lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key_hash BLOB PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " flags INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+        return conn
+
+    @staticmethod
+    def _hash(key):
+        return hashlib.sha256(key.encode('utf-8')).digest()
+
+    def get(self, key):
+        """Returns the cached value for key, or None when missing or expired."""
+        row = self._conn.execute(
+            "SELECT value, flags FROM cache WHERE key_hash = ? AND expires_at > ?",
+            (self._hash(key), time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        value, flags = row
+        if flags == _FLAG_ZLIB_JSON:
+            value = zlib.decompress(value)
+        return json.loads(value)
+
+    def set(self, key, content, ttl=None):
+        payload = json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        flags = _FLAG_JSON
+        if len(payload) > _COMPRESS_THRESHOLD:
+            payload, flags = zlib.compress(payload), _FLAG_ZLIB_JSON
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key_hash, value, flags, size, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (self._hash(key), payload, flags, len(payload), expires_at),
+        )
+        self._maybe_purge()
+
+    def delete(self, key):
+        self._conn.execute("DELETE FROM cache WHERE key_hash = ?", (self._hash(key),))
+
+    def _maybe_purge(self):
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval or not self._purge_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_purge = now
+            self.purge()
+        finally:
+            self._purge_lock.release()
+
+    def purge(self):
+        """Deletes expired entries, then the soonest-expiring ones until under max_bytes."""
+        conn = self._conn
+        removed = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total > self.max_bytes:
+            # Walk entries by expiry and cut at the point where the remainder fits the budget.
+            excess = total - self.max_bytes
+            cutoff = None
+            freed = 0
+            for expires_at, size in conn.execute("SELECT expires_at, size FROM cache ORDER BY expires_at"):
+                freed += size
+                cutoff = expires_at
+                if freed >= excess:
+                    break
+            if cutoff is not None:
+                removed += conn.execute("DELETE FROM cache WHERE expires_at <= ?", (cutoff,)).rowcount
+        if removed:
+            logger.debug(f"Cache store purge removed {removed} entries")
+        return removed
+
+    def stats(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {'entries': count, 'bytes': total, 'max_bytes': self.max_bytes}
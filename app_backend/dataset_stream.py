@@ -0,0 +1,110 @@
+"""
+Streaming readers for tweet dataset files, with reservoir sampling.
+
+Datasets are either a JSON array (``[...]``) or JSON Lines (one value per
+line, ``.jsonl``). Items are tweet strings, or objects with a ``text`` field.
+Files are read in fixed-size chunks and decoded one item at a time, so
+sampling ``k`` tweets from a file uses O(k) memory whatever its size.
+"""
+import json
+import math
+import random
+import re
+from itertools import islice
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+_SKIP_WHITESPACE = re.compile(r'[ \t\n\r]*').match
+_SKIP_SEPARATORS = re.compile(r'[ \t\n\r,]*').match
+
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """Yields the items of a top-level JSON array read incrementally from text file f."""
+    buf = f.read(chunk_size)
+    eof = not buf
+    pos = _SKIP_WHITESPACE(buf, 0).end()
+    if pos >= len(buf) or buf[pos] != '[':
+        raise ValueError("Dataset is not a JSON array")
+    pos += 1
+    while True:
+        pos = _SKIP_SEPARATORS(buf, pos).end()
+        if pos < len(buf) and buf[pos] == ']':
+            return
+        try:
+            item, end = _decoder.raw_decode(buf, pos)
+            # A number cut by the chunk boundary ("-1." of "-1.5") still decodes,
+            # so only trust a value once the delimiter after it is in the buffer.
+            complete = eof or (end < len(buf) and buf[end] in _DELIMITERS)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield item
+            pos = end
+            continue
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+        if eof and not buf.strip():
+            raise ValueError("Unterminated JSON array")
+
+
+def iter_json_lines(f):
+    """Yields one decoded value per non-blank line of text file f."""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_tweets(path, chunk_size=CHUNK_SIZE):
+    """Yields tweet texts from a .json (array) or .jsonl dataset file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        items = iter_json_lines(f) if path.endswith('.jsonl') else iter_json_array(f, chunk_size)
+        for item in items:
+            text = item.get('text') if isinstance(item, dict) else item
+            if isinstance(text, str) and text:
+                yield text
+
+
+def reservoir_sample(iterable, k, rng=random):
+    """Uniform sample of k items from iterable in one pass (Li's Algorithm L), in random order.
+
+    Returns every item when there are fewer than k.
+    """
+    if k <= 0:
+        return []
+    it = iter(iterable)
+    reservoir = list(islice(it, k))
+    if len(reservoir) == k:
+        w = math.exp(math.log(_uniform(rng)) / k)
+        while True:
+            # Skip the items that would not enter the reservoir without drawing for each.
+            skip = math.floor(math.log(_uniform(rng)) / math.log1p(-w))
+            item = next(islice(it, skip, None), _END)
+            if item is _END:
+                break
+            reservoir[rng.randrange(k)] = item
+            w *= math.exp(math.log(_uniform(rng)) / k)
+    rng.shuffle(reservoir)
+    return reservoir
+
+
+def sample_tweets(path, count, rng=random):
+    """Returns up to count tweets drawn uniformly from the dataset file at path."""
+    return reservoir_sample(iter_tweets(path), count, rng)
+
+
+def _uniform(rng):
+    # rng.random() is in [0, 1); the logarithms above need (0, 1).
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+_END = object()
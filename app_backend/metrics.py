@@ -0,0 +1,177 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are plain Python objects guarded by one lock each,
+so recording a value costs well under a microsecond; nothing is sent
+anywhere until /api/metrics is scraped. Values that other components
+already count (cache statistics, queue depth) are read at scrape time
+through collectors instead of being counted twice.
+
+Metrics are per process: with several gunicorn workers, each scrape is
+answered by one worker, and the ``pid`` label tells them apart.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set."""
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, '') for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name + '_total', tuple(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Distribution of observed values (seconds, by default buckets) per label set."""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label values -> [count per bucket (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, '') for n in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield self.name + '_bucket', labels + (('le', _format_value(float(bound))),), cumulative
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, cumulative
+
+
+class Registry:
+    """Holds metrics and collectors and renders them for a scrape."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        """collect() returns [(name, type, documentation, [(labels dict, value), ...]), ...] at scrape time."""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self):
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        pid = (('pid', str(os.getpid())),)
+        lines = []
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(pid + labels)} {_format_value(value)}")
+        for collect in collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                lines.append(f"# collector {getattr(collect, '__name__', collect)} failed: {_escape(e)}")
+                continue
+            for name, metric_type, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                suffix = '_total' if metric_type == 'counter' else ''
+                for labels, value in samples:
+                    lines.append(f"{name}{suffix}{_format_labels(pid + tuple(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    'sentiment_stage_seconds', 'Time spent in each stage of a product analysis.', ['stage'])
+EXTERNAL_REQUEST_SECONDS = registry.histogram(
+    'sentiment_external_request_seconds', 'Latency of calls to external services.', ['service', 'kind'])
+EXTERNAL_ERRORS = registry.counter(
+    'sentiment_external_errors', 'Failed calls to external services.', ['service', 'kind'])
+CACHE_REQUESTS = registry.counter(
+    'sentiment_cache_requests', 'Cache lookups by cache and result (hit/miss).', ['cache', 'result'])
+TWEETS_SCORED = registry.counter(
+    'sentiment_tweets_scored', 'Tweets scored with VADER (per-tweet cache misses).')
+API_REQUEST_SECONDS = registry.histogram(
+    'api_request_seconds', 'API request handling time until the response starts, by endpoint.',
+    ['endpoint', 'method', 'status'])
+
+
+@contextmanager
+def timed(stage, timings=None):
+    """Records the duration of the block in STAGE_SECONDS, and adds it to timings['<stage>_ms'] when given."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[f"{stage}_ms"] = round(timings.get(f"{stage}_ms", 0.0) + elapsed * 1000, 3)
@@ -0,0 +1,127 @@
+"""
+TTL result cache with single-flight de-duplication.
+
+Concurrent callers asking for the same key while it is being computed wait
+for that one computation instead of starting their own. Successful results
+are kept for ``ttl`` seconds; failures are never cached and are re-raised
+to every waiter.
+
+With ``version_of``, each stored value also gets a version (for example a
+content digest) computed once when it is stored, so callers can build HTTP
+validators without serialising the value again.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.version = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """Caches results of an expensive function per key, at most max_entries at a time."""
+
+    def __init__(self, ttl, max_entries=256, version_of=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version_of = version_of
+        self._entries = OrderedDict()  # key -> (expires_at, value, version)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key, compute):
+        """Returns a deep copy of the cached value for key, computing it once if needed."""
+        return self.get_or_compute_versioned(key, compute)[0]
+
+    def get_or_compute_versioned(self, key, compute):
+        """Like get_or_compute, but returns (value, version); version is None without version_of."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1]), entry[2]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.value), flight.version
+
+        try:
+            flight.value = compute()
+            flight.version = self.version_of(flight.value) if self.version_of else None
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._entries[key] = (time.monotonic() + self.ttl, flight.value, flight.version)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                del self._flights[key]
+            flight.done.set()
+        return copy.deepcopy(flight.value), flight.version
+
+    def get(self, key):
+        """Returns a deep copy of the fresh cached value for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, value):
+        """Caches a value computed outside get_or_compute (a copy is stored)."""
+        value = copy.deepcopy(value)
+        version = self.version_of(value) if self.version_of else None
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drops one key, or every entry when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate):
+        """Drops every entry whose key satisfies predicate."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'in_flight': len(self._flights),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+            }
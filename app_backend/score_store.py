@@ -0,0 +1,122 @@
+"""
+Persistent per-tweet score store, filled offline by prescore_tweets.py.
+
+Holds, for every tweet of the local datasets, the same result the live path
+computes (tweet label and compound score, then each sentence's label and
+aspects), keyed by ``sentiment_logic.tweet_cache_key``. That key already
+covers the lexicon and aspect table versions, so a score from an older
+version is simply never found; the ``version`` column lets re-runs skip
+tweets already scored and lets ``prune`` drop outdated rows.
+
+The app opens the file read-only. It uses the default rollback journal
+rather than WAL, so readers create no side files next to the datasets.
+Connections are per thread and re-opened after a fork.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+LABELS = ('positive', 'negative', 'neutral')
+_LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+_MAX_VARIABLES = 900  # stay under SQLite's default limit on bound parameters
+
+
+class TweetScoreStore:
+    """Maps tweet keys to (label, compound, sentences) rows in one SQLite file."""
+
+    def __init__(self, path, readonly=True):
+        self.path = path
+        self.readonly = readonly
+        self._local = threading.local()
+
+    def _connect(self):
+        if self.readonly:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=10.0, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tweet_scores ("
+                " key BLOB PRIMARY KEY,"
+                " version TEXT NOT NULL,"
+                " label INTEGER NOT NULL,"
+                " compound REAL NOT NULL,"
+                " sentences TEXT NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tweet_scores_version ON tweet_scores (version)")
+            conn.commit()
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+        return conn
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def get_many(self, keys):
+        """Returns {key: (label, compound, sentences)} for the keys present in the store."""
+        found = {}
+        for start in range(0, len(keys), _MAX_VARIABLES):
+            batch = keys[start:start + _MAX_VARIABLES]
+            rows = self._conn.execute(
+                f"SELECT key, label, compound, sentences FROM tweet_scores WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            for key, label, compound, sentences in rows:
+                found[bytes(key)] = (LABELS[label], compound, _decode_sentences(sentences))
+        return found
+
+    def missing(self, keys):
+        """The keys (in order) that have no score in the store."""
+        present = set()
+        for start in range(0, len(keys), _MAX_VARIABLES):
+            batch = keys[start:start + _MAX_VARIABLES]
+            present.update(bytes(row[0]) for row in self._conn.execute(
+                f"SELECT key FROM tweet_scores WHERE key IN ({','.join('?' * len(batch))})", batch))
+        return [k for k in keys if k not in present]
+
+    def put_many(self, version, items):
+        """Stores (key, (label, compound, sentences)) pairs scored with version; commits."""
+        conn = self._conn
+        conn.executemany(
+            "INSERT OR REPLACE INTO tweet_scores (key, version, label, compound, sentences) VALUES (?, ?, ?, ?, ?)",
+            [(key, version, _LABEL_CODES[label], compound, _encode_sentences(sentences))
+             for key, (label, compound, sentences) in items],
+        )
+        conn.commit()
+
+    def prune(self, version):
+        """Deletes scores from any other version; returns how many."""
+        conn = self._conn
+        removed = conn.execute("DELETE FROM tweet_scores WHERE version != ?", (version,)).rowcount
+        conn.commit()
+        if removed:
+            conn.execute("VACUUM")
+        return removed
+
+    def counts(self):
+        """{version: number of scored tweets}."""
+        return dict(self._conn.execute("SELECT version, COUNT(*) FROM tweet_scores GROUP BY version"))
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _encode_sentences(sentences):
+    return json.dumps([[_LABEL_CODES[label], list(aspects)] for label, aspects in sentences], separators=(',', ':'))
+
+
+def _decode_sentences(encoded):
+    # Aspect names are interned, like the live path's, so cached analyses share them.
+    return tuple((LABELS[code], tuple(sys.intern(a) for a in aspects)) for code, aspects in json.loads(encoded))
@@ -1,30 +1,15 @@
 import os
-import nltk
 import json # For loading local tweet datasets
 import time # For caching
-# ---- BEGIN NLTK Path Configuration ----
-project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-custom_nltk_data_path = os.path.join(project_root_dir, 'nltk_data')
-if os.path.isdir(custom_nltk_data_path):
-    if custom_nltk_data_path not in nltk.data.path:
-        nltk.data.path.insert(0, custom_nltk_data_path)
-else:
-    print(f"WARNING (sentiment_logic): Custom NLTK data path does not exist: {custom_nltk_data_path}.")
-# ---- END NLTK Path Configuration ----
-
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk.tokenize import sent_tokenize
 import random
-from googleapiclient.discovery import build
 import logging
-import requests 
+import threading
 
-# --- NEW: Word Cloud Generation ---
-from wordcloud import WordCloud
-import matplotlib
-matplotlib.use('Agg') # Use non-interactive backend for server-side rendering
-import matplotlib.pyplot as plt
-# --- END NEW ---
+# NLTK, NumPy, wordcloud/matplotlib, the Google client and the large mock
+# dataset are loaded on first use (or by warm_up() on a background thread),
+# not at import, so the app answers /api/health while they load.
+project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+custom_nltk_data_path = os.path.join(project_root_dir, 'nltk_data')
 
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers():
@@ -32,33 +17,86 @@ if not logger.hasHandlers():
 else:
     logger.setLevel(logging.DEBUG)
 
-try:
-    sid = SentimentIntensityAnalyzer()
-except LookupError: 
-    logger.info("Downloading VADER lexicon for NLTK...")
-    nltk.download('vader_lexicon', download_dir=custom_nltk_data_path if os.path.isdir(custom_nltk_data_path) else None, quiet=True)
-    sid = SentimentIntensityAnalyzer()
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError: 
-    logger.info("Downloading Punkt tokenizer for NLTK...")
-    nltk.download('punkt', download_dir=custom_nltk_data_path if os.path.isdir(custom_nltk_data_path) else None, quiet=True)
+# --- NEW: Lazily loaded NLP resources ---
+sid = None
+batch_scorer = None
+_sent_tokenize = None
+_nlp_lock = threading.Lock()
+
+def load_nlp_resources():
+    """Imports NLTK, builds the VADER analyzer and the batch scorer (see app_backend/vader_batch.py) once, and returns the scorer."""
+    global sid, batch_scorer, _sent_tokenize
+    if batch_scorer is not None: return batch_scorer
+    with _nlp_lock:
+        if batch_scorer is not None: return batch_scorer
+        import nltk
+        # ---- BEGIN NLTK Path Configuration ----
+        if os.path.isdir(custom_nltk_data_path):
+            if custom_nltk_data_path not in nltk.data.path:
+                nltk.data.path.insert(0, custom_nltk_data_path)
+        else:
+            print(f"WARNING (sentiment_logic): Custom NLTK data path does not exist: {custom_nltk_data_path}.")
+        # ---- END NLTK Path Configuration ----
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        from nltk.tokenize import sent_tokenize
+        from app_backend.vader_batch import BatchVaderScorer
+        try:
+            analyzer = SentimentIntensityAnalyzer()
+        except LookupError:
+            logger.info("Downloading VADER lexicon for NLTK...")
+            nltk.download('vader_lexicon', download_dir=custom_nltk_data_path if os.path.isdir(custom_nltk_data_path) else None, quiet=True)
+            analyzer = SentimentIntensityAnalyzer()
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            logger.info("Downloading Punkt tokenizer for NLTK...")
+            nltk.download('punkt', download_dir=custom_nltk_data_path if os.path.isdir(custom_nltk_data_path) else None, quiet=True)
+        sid, _sent_tokenize = analyzer, sent_tokenize
+        batch_scorer = BatchVaderScorer(analyzer)  # set last: other threads only check this one
+    return batch_scorer
 
 ASPECTS_KEYWORDS = {
     "battery": ["battery", "power", "charge", "life", "charging", "mah", "backup", "lasts", "duration"],
     "camera": ["camera", "photo", "picture", "lens", "image", "video", "shot", "sensor", "zoom", "pixel", "focus", "megapixel", "mp", "photos", "videos", "photograph"],
     "screen": ["screen", "display", "resolution", "amoled", "lcd", "brightness", "hdr", "refresh rate", "size", "oled", "dynamic island", "proMotion"],
-    "performance": ["performance", "speed", "fast", "slow", "lag", "chip", "processor", "ram", "gaming", "smooth", "a16", "a17", "benchmark"],
+    "performance": ["performance", "speed", "fast", "slow", "lag", "chip", "chipset", "processor", "ram", "gaming", "smooth", "a16", "a17", "benchmark"],
     "price": ["price", "cost", "value", "cheap", "expensive", "budget", "affordable", "money", "worth", "deal"],
     "design": ["design", "look", "feel", "build", "aesthetic", "style", "beautiful", "ugly", "premium", "color", "material", "titanium", "action button"],
     "software": ["software", "os", "ui", "update", "app", "bloatware", "interface", "ios", "ios 17", "siri"],
     "sound": ["sound", "audio", "speaker", "music", "volume", "microphone", "call quality", "spatial audio"],
     "durability": ["durability", "strong", "robust", "scratch", "waterproof", "resistant", "ip68", "ceramic shield"],
     "features": ["feature", "functionality", "fingerprint", "face id", "nfc", "5g", "wireless charging", "storage", "usb-c", "connectivity"],
-    "heating": ["heat", "hot", "warm", "overheating", "cool"],
-    "overall": ["love it", "hate it", "amazing", "disappointed", "best phone", "worst phone", "recommend", "impressed", "regret"]
+    "heating": ["heat", "heating", "hot", "warm", "overheating", "cool"],
+    "overall": ["love it", "hate it", "amazing", "disappointed", "best phone", "worst phone", "recommend", "recommendation", "impressed", "regret", "regretting"]
 }
 
+# --- NEW: Compiled aspect matcher (see app_backend/aspect_matcher.py) ---
+from app_backend.aspect_matcher import AspectMatcher
+ASPECTS_KEYWORDS_FILE = os.getenv('ASPECTS_KEYWORDS_FILE')
+
+def reload_aspect_keywords(aspects_keywords=None):
+    """Rebuilds the aspect matcher, from the given table or from ASPECTS_KEYWORDS_FILE.
+
+    The new matcher is swapped in atomically; analyses already running keep
+    the matcher they started with.
+    """
+    global ASPECTS_KEYWORDS, aspect_matcher
+    if aspects_keywords is None:
+        if not ASPECTS_KEYWORDS_FILE or not os.path.exists(ASPECTS_KEYWORDS_FILE):
+            logger.warning(f"No aspect keywords file to reload from (ASPECTS_KEYWORDS_FILE={ASPECTS_KEYWORDS_FILE}).")
+            return aspect_matcher
+        with open(ASPECTS_KEYWORDS_FILE, 'r', encoding='utf-8') as f:
+            aspects_keywords = json.load(f)
+    matcher = AspectMatcher(aspects_keywords)
+    ASPECTS_KEYWORDS, aspect_matcher = dict(aspects_keywords), matcher
+    logger.info(f"Aspect matcher loaded: {len(matcher.aspects)} aspects, version {matcher.version}")
+    return matcher
+
+aspect_matcher = AspectMatcher(ASPECTS_KEYWORDS)
+if ASPECTS_KEYWORDS_FILE:
+    try: reload_aspect_keywords()
+    except Exception as e: logger.error(f"Could not load aspect keywords from {ASPECTS_KEYWORDS_FILE}: {e}")
+
 CACHE_DIR = os.path.join(project_root_dir, "api_cache")
 CACHE_EXPIRY_SECONDS = 3600 
 if not os.path.exists(CACHE_DIR):
@@ -71,52 +109,119 @@ if not os.path.exists(WORDCLOUD_DIR):
     try: os.makedirs(WORDCLOUD_DIR)
     except OSError as e: logger.error(f"Could not create wordcloud directory {WORDCLOUD_DIR}: {e}")
 
+# --- NEW: Stage timers and counters (see app_backend/metrics.py) ---
+from app_backend.metrics import registry as metrics_registry, timed, CACHE_REQUESTS, EXTERNAL_REQUEST_SECONDS, EXTERNAL_ERRORS, TWEETS_SCORED
+
+# --- NEW: Single-file API cache store (see app_backend/cache_store.py) ---
+from app_backend.cache_store import SQLiteCacheStore
+CACHE_DB_PATH = os.getenv('API_CACHE_DB', os.path.join(CACHE_DIR, 'api_cache.sqlite3'))
+API_CACHE_MAX_BYTES = int(float(os.getenv('API_CACHE_MAX_MB', '64')) * 1024 * 1024)
+api_cache_store = None
+try:
+    api_cache_store = SQLiteCacheStore(CACHE_DB_PATH, ttl=CACHE_EXPIRY_SECONDS, max_bytes=API_CACHE_MAX_BYTES)
+except Exception as e:
+    logger.error(f"Could not open API cache store {CACHE_DB_PATH}: {e}")
+
 def get_cached_data(cache_key):
-    if not os.path.exists(CACHE_DIR): return None
-    cache_file = os.path.join(CACHE_DIR, f"{cache_key.replace(' ', '_').replace('/', '_')[:50]}.json")
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f: data = json.load(f)
-            if time.time() - data.get('timestamp', 0) < CACHE_EXPIRY_SECONDS:
-                logger.debug(f"Serving cached data for key '{cache_key}'")
-                return data.get('content')
-            else: logger.debug(f"Cache expired for key '{cache_key}'")
-        except Exception as e: logger.error(f"Error reading cache for {cache_key}: {e}")
+    if api_cache_store is None: return None
+    try:
+        content = api_cache_store.get(cache_key)
+        CACHE_REQUESTS.inc(cache='api', result='miss' if content is None else 'hit')
+        if content is not None: logger.debug(f"Serving cached data for key '{cache_key}'")
+        return content
+    except Exception as e: logger.error(f"Error reading cache for {cache_key}: {e}")
     return None
 
 def cache_data(cache_key, content):
-    if not os.path.exists(CACHE_DIR):
-        try: os.makedirs(CACHE_DIR)
-        except OSError as e: logger.error(f"Could not create cache directory {CACHE_DIR} for writing: {e}"); return
-    cache_file = os.path.join(CACHE_DIR, f"{cache_key.replace(' ', '_').replace('/', '_')[:50]}.json")
+    if api_cache_store is None: return
     try:
-        with open(cache_file, 'w', encoding='utf-8') as f: json.dump({'timestamp': time.time(), 'content': content}, f, ensure_ascii=False, indent=2)
+        api_cache_store.set(cache_key, content)
         logger.debug(f"Cached data for key '{cache_key}'")
     except Exception as e: logger.error(f"Error writing cache for {cache_key}: {e}")
 
+# --- NEW: Shared Google CSE client and bounded lookup executors ---
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, as_completed
+
+GOOGLE_HTTP_TIMEOUT = float(os.getenv('GOOGLE_HTTP_TIMEOUT', '10'))
+# Helpers (image/specs) run on one pool, their individual CSE queries on another,
+# so a helper waiting on its queries can never starve them of workers.
+_lookup_executor = ThreadPoolExecutor(max_workers=int(os.getenv('EXTERNAL_LOOKUP_WORKERS', '4')), thread_name_prefix='lookup')
+_query_executor = ThreadPoolExecutor(max_workers=int(os.getenv('EXTERNAL_QUERY_WORKERS', '12')), thread_name_prefix='cse-query')
+_cse_lock = threading.Lock()
+_cse_service = None
+_cse_service_key = None
+_cse_local = threading.local()
+
+def get_cse_service(api_key):
+    """Returns the process-wide Custom Search service, building it (and parsing discovery) once.
+
+    GOOGLE_CSE_ENDPOINT redirects requests, e.g. to a local fake server (see fake_cse_server.py).
+    """
+    global _cse_service, _cse_service_key
+    endpoint = os.getenv('GOOGLE_CSE_ENDPOINT')
+    key = (api_key, endpoint, os.getpid())
+    with _cse_lock:
+        if _cse_service is None or _cse_service_key != key:
+            from googleapiclient.discovery import build
+            client_options = {'api_endpoint': endpoint} if endpoint else None
+            _cse_service = build("customsearch", "v1", developerKey=api_key, client_options=client_options, cache_discovery=False)
+            _cse_service_key = key
+        return _cse_service
+
+def _thread_http():
+    # httplib2.Http is not thread-safe; each thread gets its own, passed to execute().
+    if getattr(_cse_local, 'pid', None) != os.getpid():
+        import httplib2
+        _cse_local.http = httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT)
+        _cse_local.pid = os.getpid()
+    return _cse_local.http
+
+def _race_queries(queries, fetch, accept):
+    """Runs fetch(query) for all queries concurrently.
+
+    Returns (query, result) for the first result accepted by accept(query, result),
+    cancelling the queries that have not started yet, or (None, results) with
+    every result by query when none is accepted.
+    """
+    futures = {_query_executor.submit(fetch, q): q for q in queries}
+    results = {}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                query = futures[future]
+                results[query] = future.result()
+                if accept(query, results[query]):
+                    return query, results[query]
+    finally:
+        for future in pending: future.cancel()
+    return None, results
+
 def test_google_search_api_access():
     api_key = os.getenv("GOOGLE_API_KEY"); cse_id = os.getenv("GOOGLE_CSE_ID")
     if not api_key or not cse_id: return False, "Google API Key or CSE ID not set."
     try:
-        service = build("customsearch", "v1", developerKey=api_key)
-        res = service.cse().list(q="test", cx=cse_id, num=1).execute()
+        service = get_cse_service(api_key)
+        res = service.cse().list(q="test", cx=cse_id, num=1).execute(http=_thread_http())
         if 'items' in res: return True, "Google Custom Search API access successful."
         elif 'error' in res: return False, f"Google API Error: {res['error'].get('message', 'Unknown')}"
         else: return True, "Google API call made, no items (check CSE config)."
     except Exception as e: return False, f"Google API Error: {str(e)}"
 
 def fetch_google_search_result(full_query, product_name_for_log, search_type=None):
-    cache_key = f"google_{search_type or 'web'}_{full_query.replace(' ', '_')[:50]}"
+    cache_key = f"google_{search_type or 'web'}_{full_query}"
     cached_content = get_cached_data(cache_key)
     if cached_content is not None: return cached_content
     api_key = os.getenv("GOOGLE_API_KEY"); cse_id = os.getenv("GOOGLE_CSE_ID")
     if not api_key or not cse_id: logger.warning(f"Google API Key/CSE ID not set for '{full_query}' search."); return None
     try:
-        service = build("customsearch", "v1", developerKey=api_key)
+        service = get_cse_service(api_key)
         search_params = {'q': full_query, 'cx': cse_id, 'num': 5, 'safe': 'medium'} 
         if search_type == 'image': search_params['searchType'] = 'image'; search_params['imgSize'] = 'LARGE'
         logger.debug(f"Google Search for '{product_name_for_log}' query '{full_query}', params: {search_params}")
-        res = service.cse().list(**search_params).execute()
+        with EXTERNAL_REQUEST_SECONDS.time(service='google_cse', kind=search_type or 'web'):
+            res = service.cse().list(**search_params).execute(http=_thread_http())
         content_to_cache = None
         if 'items' in res and len(res['items']) > 0:
             if search_type == 'image':
@@ -136,41 +241,95 @@ def fetch_google_search_result(full_query, product_name_for_log, search_type=Non
                 if not content_to_cache: content_to_cache = res['items'][0].get('snippet') or res['items'][0].get('title')
         if content_to_cache: cache_data(cache_key, content_to_cache)
         return content_to_cache
-    except Exception as e: logger.error(f"Error Google fetch '{full_query}': {e}", exc_info=False); return None
+    except Exception as e:
+        EXTERNAL_ERRORS.inc(service='google_cse', kind=search_type or 'web')
+        logger.error(f"Error Google fetch '{full_query}': {e}", exc_info=False); return None
 
 def fetch_product_image_url(product_name):
     logger.info(f"Fetching image for: {product_name}")
     queries = [f"{product_name} official product image png", f"{product_name} official product image white background", f"{product_name} product photo"]
-    for q in queries:
-        url = fetch_google_search_result(q, product_name, search_type='image')
-        if url: return url
-    return None
+    query, url = _race_queries(queries, lambda q: fetch_google_search_result(q, product_name, search_type='image'), lambda q, url: bool(url))
+    return url if query else None
 
 def fetch_product_specifications_snippet(product_name):
     logger.info(f"Fetching specs for: {product_name}")
     queries = [f"{product_name} key specifications list", f"{product_name} official tech specs", f"{product_name} gsmarena specifications"]
     best_snippet = "Detailed specifications snippet not found."
     max_score = 0
+    # A long gsmarena snippet wins outright; otherwise pick the best-scoring one.
+    query, found = _race_queries(queries, lambda q: fetch_google_search_result(q, product_name),
+                                 lambda q, snip: bool(snip) and "gsmarena" in q.lower() and len(snip) > 100)
+    if query: return found
+    snippets = found
     for q in queries:
-        snip = fetch_google_search_result(q, product_name)
+        snip = snippets.get(q)
         if snip:
             score = len(snip)
             if "gsmarena" in q.lower(): score += 100
             if score > max_score and len(snip) > 50: max_score = score; best_snippet = snip
-            if "gsmarena" in q.lower() and len(snip) > 100: return snip 
     return best_snippet
 
+# --- NEW: Streaming dataset readers (see app_backend/dataset_stream.py) ---
+from app_backend.dataset_stream import iter_tweets, sample_tweets
+
+# --- NEW: Memory-mapped corpora (see app_backend/tweet_corpus.py, build_tweet_corpus.py) ---
+def _fresh_corpus_path(dataset_base, sources):
+    """<dataset_base>.corpus when it exists and is at least as new as every source file, else None."""
+    corpus_path = f"{dataset_base}.corpus"
+    try:
+        corpus_mtime = os.path.getmtime(corpus_path)
+    except OSError:
+        return None
+    if any(os.path.getmtime(source) > corpus_mtime for source in sources):
+        logger.warning(f"{corpus_path} is older than its source dataset; ignoring it (re-run build_tweet_corpus.py).")
+        return None
+    return corpus_path
+
 LARGE_MOCK_DATASET_PATH = os.path.join(project_root_dir, "tweet_datasets", "various_smartphones_tweets.json")
 ALL_MOCK_TWEETS = []
-if os.path.exists(LARGE_MOCK_DATASET_PATH):
-    try:
-        with open(LARGE_MOCK_DATASET_PATH, 'r', encoding='utf-8') as f:
-            ALL_MOCK_TWEETS = json.load(f)
-        logger.info(f"Successfully loaded {len(ALL_MOCK_TWEETS)} tweets from the large mock dataset.")
-    except Exception as e:
-        logger.error(f"Error loading large mock dataset from {LARGE_MOCK_DATASET_PATH}: {e}")
-else:
-    logger.warning(f"Large mock dataset not found at {LARGE_MOCK_DATASET_PATH}. Generic mocks will be very simple if product-specific files also missing.")
+# --- NEW: Inverted keyword index over the mock corpus (see app_backend/tweet_index.py) ---
+MOCK_TWEET_INDEX = None
+_mock_corpus_lock = threading.Lock()
+
+def get_mock_tweet_index():
+    """Loads the large mock dataset and builds its keyword index on first use."""
+    global ALL_MOCK_TWEETS, MOCK_TWEET_INDEX
+    if MOCK_TWEET_INDEX is not None: return MOCK_TWEET_INDEX
+    with _mock_corpus_lock:
+        if MOCK_TWEET_INDEX is not None: return MOCK_TWEET_INDEX
+        from app_backend.tweet_index import TweetIndex
+        from app_backend.tweet_corpus import MappedCorpus
+        sources = [LARGE_MOCK_DATASET_PATH] if os.path.exists(LARGE_MOCK_DATASET_PATH) else []
+        corpus_path = _fresh_corpus_path(os.path.splitext(LARGE_MOCK_DATASET_PATH)[0], sources)
+        if corpus_path:
+            try:
+                # Shared by every worker through the page cache; tweets decode on access.
+                corpus = MappedCorpus(corpus_path)
+                if corpus.has_token_ids:
+                    index = TweetIndex.from_token_ids(corpus, corpus.vocabulary(), *corpus.token_id_arrays())
+                else:
+                    index = TweetIndex(corpus)
+                ALL_MOCK_TWEETS, MOCK_TWEET_INDEX = corpus, index
+                logger.info(f"Mapped {len(corpus)} tweets from the large mock corpus {corpus_path}.")
+                return MOCK_TWEET_INDEX
+            except Exception as e:
+                logger.error(f"Error mapping large mock corpus {corpus_path}: {e}")
+        tweets = []
+        if sources:
+            try:
+                tweets = list(iter_tweets(LARGE_MOCK_DATASET_PATH))
+                logger.info(f"Successfully loaded {len(tweets)} tweets from the large mock dataset.")
+            except Exception as e:
+                logger.error(f"Error loading large mock dataset from {LARGE_MOCK_DATASET_PATH}: {e}")
+        else:
+            logger.warning(f"Large mock dataset not found at {LARGE_MOCK_DATASET_PATH}. Generic mocks will be very simple if product-specific files also missing.")
+        ALL_MOCK_TWEETS = tweets
+        MOCK_TWEET_INDEX = TweetIndex(tweets)
+    return MOCK_TWEET_INDEX
+
+def add_mock_tweets(texts):
+    """Appends tweets to the large mock dataset and indexes them without a rebuild."""
+    return get_mock_tweet_index().add(texts)
 
 def generate_fallback_mock_tweets(product_name, count=50):
     logger.info(f"Generating {count} FALLBACK mock tweets for {product_name}.")
@@ -179,36 +338,37 @@ def generate_fallback_mock_tweets(product_name, count=50):
     return [random.choice(templates) for _ in range(count)], None
 
 def generate_mock_tweets_from_large_dataset(product_name, count=100):
-    if not ALL_MOCK_TWEETS:
+    from app_backend.tweet_index import tokenize as tokenize_for_index
+    index = get_mock_tweet_index()
+    if not len(index):
         logger.warning(f"Large mock dataset not loaded. Using fallback generic mock for {product_name}.")
         return generate_fallback_mock_tweets(product_name, count)
 
-    product_keywords = product_name.lower().split()
-    relevant_tweets = [t for t in ALL_MOCK_TWEETS if any(pk in t.lower() for pk in product_keywords)]
-    other_tweets = [t for t in ALL_MOCK_TWEETS if not any(pk in t.lower() for pk in product_keywords)]
-    
-    final_selection = []
-    random.shuffle(relevant_tweets)
-    final_selection.extend(relevant_tweets)
-    
-    if len(final_selection) < count:
-        random.shuffle(other_tweets)
-        final_selection.extend(other_tweets)
-        
-    logger.info(f"Selected {min(count, len(final_selection))} mock tweets for '{product_name}' from large dataset.")
-    return final_selection[:count], None
+    relevant_ids = index.union(tokenize_for_index(product_name))
+    selected_ids = random.sample(relevant_ids.tolist(), min(count, len(relevant_ids)))
+    if len(selected_ids) < count:
+        selected_ids.extend(index.sample_excluding(relevant_ids, count - len(selected_ids)))
+    final_selection = [index.documents[i] for i in selected_ids]
+
+    logger.info(f"Selected {len(final_selection)} mock tweets for '{product_name}' from large dataset ({len(relevant_ids)} relevant).")
+    return final_selection, None
 
 def fetch_real_tweets(product_name, count=100):
     product_file_key = product_name.lower().replace(" ", "_").replace("/", "_").replace("\\", "_")
-    dataset_file_path = os.path.join(project_root_dir, "tweet_datasets", f"{product_file_key}_tweets.json")
-
-    if os.path.exists(dataset_file_path):
+    dataset_base = os.path.join(project_root_dir, "tweet_datasets", f"{product_file_key}_tweets")
+    sources = [path for path in (f"{dataset_base}.json", f"{dataset_base}.jsonl") if os.path.exists(path)]
+    corpus_path = _fresh_corpus_path(dataset_base, sources)
+    for dataset_file_path in ([corpus_path] if corpus_path else []) + sources:
         try:
-            with open(dataset_file_path, 'r', encoding='utf-8') as f:
-                tweets_from_file = json.load(f)
-            logger.info(f"Loaded {len(tweets_from_file)} tweets for '{product_name}' from specific local dataset: {dataset_file_path}")
-            random.shuffle(tweets_from_file)
-            return tweets_from_file[:count], None
+            if dataset_file_path == corpus_path:
+                from app_backend.tweet_corpus import MappedCorpus
+                with MappedCorpus(corpus_path) as corpus:
+                    tweets_from_file = corpus.sample(count)
+            else:
+                # Single pass with reservoir sampling: memory stays O(count) whatever the file size.
+                tweets_from_file = sample_tweets(dataset_file_path, count)
+            logger.info(f"Sampled {len(tweets_from_file)} tweets for '{product_name}' from specific local dataset: {dataset_file_path}")
+            return tweets_from_file, None
         except Exception as e:
             logger.error(f"Error reading specific local dataset {dataset_file_path} for {product_name}: {e}")
 
@@ -216,6 +376,7 @@ def fetch_real_tweets(product_name, count=100):
     return generate_mock_tweets_from_large_dataset(product_name, count=count)
 
 def analyze_sentiment_vader(text):
+    load_nlp_resources()
     if not sid: return 'neutral', {}
     scores = sid.polarity_scores(text)
     compound = scores['compound']
@@ -223,98 +384,599 @@ def analyze_sentiment_vader(text):
     elif compound <= -0.05: return 'negative', scores
     else: return 'neutral', scores
 
+def analyze_sentiment_batch(texts):
+    """Scores many texts in one vectorized pass.
+
+    Returns a dict of NumPy arrays ('label', 'compound', 'pos', 'neg', 'neu'),
+    one entry per text, matching analyze_sentiment_vader within the tolerance
+    documented in app_backend/vader_batch.py.
+    """
+    return load_nlp_resources().score(texts)
+
+# --- NEW: Per-tweet analysis cache ---
+from collections import namedtuple
+import hashlib
+from app_backend.lru_cache import BoundedLRUCache
+
+# label/compound of the whole tweet, plus (sentence_label, aspects) for each of its sentences
+TweetAnalysis = namedtuple('TweetAnalysis', ['label', 'compound', 'sentences'])
+
+TWEET_CACHE_MAX_BYTES = int(float(os.getenv('TWEET_CACHE_MAX_MB', '64')) * 1024 * 1024)
+
+def _tweet_analysis_size(key, analysis):
+    # Rough CPython footprint: key + namedtuple + float, then one tuple per sentence
+    # and one pointer per aspect (aspect names are interned strings shared by all entries).
+    return 250 + sum(120 + 8 * len(aspects) for _, aspects in analysis.sentences)
+
+tweet_analysis_cache = BoundedLRUCache(TWEET_CACHE_MAX_BYTES, _tweet_analysis_size)
+
+def tweet_score_version(matcher):
+    """Lexicon and aspect table versions a tweet analysis depends on."""
+    return f"{load_nlp_resources().lexicon_version}:{matcher.version}"
+
+def tweet_cache_key(text, matcher):
+    versions = f"{tweet_score_version(matcher)}:".encode('utf-8')
+    return hashlib.blake2b(versions + text.encode('utf-8'), digest_size=16).digest()
+
+# --- NEW: Offline per-tweet scores (see app_backend/score_store.py, prescore_tweets.py) ---
+from app_backend.score_store import TweetScoreStore
+TWEET_SCORE_DB = os.getenv('TWEET_SCORE_DB', os.path.join(project_root_dir, "tweet_datasets", "tweet_scores.sqlite3"))
+tweet_score_store = TweetScoreStore(TWEET_SCORE_DB)
+
+def _prescored(keys):
+    if not keys or not tweet_score_store.available(): return {}
+    try: return tweet_score_store.get_many(keys)
+    except Exception as e: logger.error(f"Error reading tweet score store {TWEET_SCORE_DB}: {e}")
+    return {}
+
+def analyze_tweets(tweets, matcher=None, timings=None):
+    """Returns a TweetAnalysis per tweet, looking each up in the in-memory cache,
+    then in the offline score store, and scoring only tweets found in neither.
+
+    Stage durations are added to timings (see metrics.timed) when given.
+    """
+    matcher = matcher or aspect_matcher
+    keys = [tweet_cache_key(t, matcher) for t in tweets]
+    analyses = [tweet_analysis_cache.get(k) for k in keys]
+    missing = [i for i, a in enumerate(analyses) if a is None]
+    CACHE_REQUESTS.inc(len(tweets) - len(missing), cache='tweet_analysis', result='hit')
+    CACHE_REQUESTS.inc(len(missing), cache='tweet_analysis', result='miss')
+    if not missing:
+        return analyses
+
+    with timed('score_store', timings):
+        stored = _prescored([keys[i] for i in missing])
+    if stored:
+        for i in missing:
+            row = stored.get(keys[i])
+            if row is not None:
+                analyses[i] = TweetAnalysis(*row)
+                tweet_analysis_cache.put(keys[i], analyses[i])
+        stored_count = len(missing)
+        missing = [i for i in missing if analyses[i] is None]
+        CACHE_REQUESTS.inc(stored_count - len(missing), cache='tweet_score_store', result='hit')
+    CACHE_REQUESTS.inc(len(missing), cache='tweet_score_store', result='miss')
+    if not missing:
+        return analyses
+
+    for i, analysis in zip(missing, score_tweets([tweets[i] for i in missing], matcher, timings)):
+        tweet_analysis_cache.put(keys[i], analysis)
+        analyses[i] = analysis
+    return analyses
+
+def score_tweets(texts, matcher=None, timings=None):
+    """Scores, tokenizes and aspect-matches tweets without any cache; returns a TweetAnalysis per tweet."""
+    matcher = matcher or aspect_matcher
+    if not texts:
+        return []
+    TWEETS_SCORED.inc(len(texts))
+    with timed('vader', timings):
+        tweet_scores = analyze_sentiment_batch(texts)
+    tweet_sentences = []
+    with timed('tokenize', timings):
+        for tweet_text in texts:
+            try:
+                tweet_sentences.append(_sent_tokenize(tweet_text.lower()))
+            except Exception as e:
+                logger.warning(f"Could not tokenize tweet: {tweet_text[:50]}... Error: {e}")
+                tweet_sentences.append([tweet_text.lower()])
+    with timed('vader', timings):
+        sentence_labels = analyze_sentiment_batch([s for sentences in tweet_sentences for s in sentences])['label']
+
+    analyses = []
+    sentence_idx = 0
+    with timed('aspect_match', timings):
+        for i in range(len(texts)):
+            sentences = []
+            for sentence in tweet_sentences[i]:
+                sentences.append((str(sentence_labels[sentence_idx]), tuple(matcher.match(sentence))))
+                sentence_idx += 1
+            analyses.append(TweetAnalysis(str(tweet_scores['label'][i]), float(tweet_scores['compound'][i]), tuple(sentences)))
+    return analyses
+
 # --- NEW: Word Cloud Generation Function ---
-def generate_word_cloud(text, product_name):
-    """Generates a word cloud image from a block of text and saves it."""
-    if not text.strip():
-        logger.warning(f"No text provided for word cloud generation for {product_name}.")
-        return None
-        
-    safe_filename = "".join(c for c in product_name if c.isalnum() or c in (' ', '_')).rstrip()
-    safe_filename = safe_filename.replace(' ', '_').lower()
-    
-    output_filename = f"wc_{safe_filename}_{int(time.time())}.png"
+# Word clouds are rendered from a token-frequency table and named by a hash of
+# that table, so identical inputs reuse the image already on disk.
+import re
+from collections import Counter
+
+WORDCLOUD_MAX_WORDS = 100
+WORDCLOUD_WIDTH = int(os.getenv('WORDCLOUD_WIDTH', '800'))  # height is half the width
+WORDCLOUD_FORMAT = os.getenv('WORDCLOUD_FORMAT', 'png').lower()  # 'png' or 'webp'
+WORDCLOUD_DIR_MAX_BYTES = int(float(os.getenv('WORDCLOUD_DIR_MAX_MB', '200')) * 1024 * 1024)
+WORDCLOUD_MAX_AGE_SECONDS = float(os.getenv('WORDCLOUD_MAX_AGE_DAYS', '7')) * 86400
+WORDCLOUD_GC_INTERVAL_SECONDS = 300
+_WORD_CLOUD_TOKEN_RE = re.compile(r"\w[\w']+")
+_wordcloud_module = None
+_stopwords_lower = None
+_word_cloud_gc_lock = threading.Lock()
+_last_word_cloud_gc = 0.0
+
+def _load_wordcloud():
+    """Imports wordcloud (and matplotlib, on the non-interactive backend) on first use."""
+    global _wordcloud_module, _stopwords_lower
+    if _wordcloud_module is None:
+        import matplotlib
+        matplotlib.use('Agg') # wordcloud's colormaps load pyplot
+        import wordcloud
+        _stopwords_lower = frozenset(w.lower() for w in wordcloud.STOPWORDS)
+        _wordcloud_module = wordcloud
+    return _wordcloud_module
+
+def word_frequencies(texts, max_words=WORDCLOUD_MAX_WORDS):
+    """Top word counts across texts, tokenized like WordCloud.process_text (stopwords, numbers and possessives dropped, plurals folded)."""
+    _load_wordcloud()
+    counts = Counter(
+        w[:-2] if w.endswith("'s") else w
+        for w in _WORD_CLOUD_TOKEN_RE.findall(" ".join(texts).lower())
+        if w not in _stopwords_lower and not w.isdigit()
+    )
+    for word in [w for w in counts if w.endswith('s') and not w.endswith('ss') and w[:-1] in counts]:
+        counts[word[:-1]] += counts.pop(word)
+    return dict(counts.most_common(max_words))
+
+def _word_cloud_filename(frequencies):
+    params = f"{WORDCLOUD_WIDTH}:{WORDCLOUD_FORMAT}:"
+    digest = hashlib.sha1((params + json.dumps(sorted(frequencies.items()))).encode('utf-8')).hexdigest()
+    return f"wc_{digest[:20]}.{WORDCLOUD_FORMAT}"
+
+def render_word_cloud(frequencies, output_filename):
+    """Renders a frequency table to WORDCLOUD_DIR/output_filename and returns its URL path."""
     output_path = os.path.join(WORDCLOUD_DIR, output_filename)
-    
+    tmp_path = f"{output_path}.{threading.get_ident()}.tmp"
     try:
-        wordcloud = WordCloud(
-            width=800, height=400,
-            background_color='white',
-            colormap='viridis',
-            max_words=100,
-            collocations=False
-        ).generate(text)
-
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis("off")
-        plt.tight_layout(pad=0)
-        plt.savefig(output_path)
-        plt.close()
-
-        logger.info(f"Word cloud saved for {product_name} at {output_path}")
+        with timed('word_cloud_render'):
+            wordcloud = _load_wordcloud().WordCloud(
+                width=WORDCLOUD_WIDTH, height=WORDCLOUD_WIDTH // 2,
+                background_color='white',
+                colormap='viridis',
+                max_words=WORDCLOUD_MAX_WORDS,
+                random_state=int(output_filename[3:11], 16)  # same table, same layout
+            ).generate_from_frequencies(frequencies)
+            if WORDCLOUD_FORMAT == 'webp':
+                wordcloud.to_image().save(tmp_path, format='WEBP', quality=80, method=4)
+            else:
+                wordcloud.to_image().save(tmp_path, format='PNG', optimize=True)
+        os.replace(tmp_path, output_path)
+        logger.info(f"Word cloud saved at {output_path}")
         return f"/static/generated_images/{output_filename}"
     except Exception as e:
-        logger.error(f"Could not generate word cloud for {product_name}: {e}")
+        logger.error(f"Could not generate word cloud {output_filename}: {e}")
+        try: os.remove(tmp_path)
+        except OSError: pass
+        return None
+    finally:
+        collect_word_cloud_garbage()
+
+def collect_word_cloud_garbage(force=False):
+    """Deletes word clouds older than WORDCLOUD_MAX_AGE_DAYS, then the least recently used until under WORDCLOUD_DIR_MAX_MB.
+
+    Runs at most once per WORDCLOUD_GC_INTERVAL_SECONDS unless forced. Reused
+    images have their mtime refreshed, so mtime order is recency order.
+    """
+    global _last_word_cloud_gc
+    now = time.time()
+    if not force and now - _last_word_cloud_gc < WORDCLOUD_GC_INTERVAL_SECONDS: return 0
+    if not _word_cloud_gc_lock.acquire(blocking=False): return 0
+    removed = 0
+    try:
+        _last_word_cloud_gc = now
+        files = []
+        for entry in os.scandir(WORDCLOUD_DIR):
+            if entry.is_file() and entry.name.startswith('wc_'):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if mtime >= now - WORDCLOUD_MAX_AGE_SECONDS and total <= WORDCLOUD_DIR_MAX_BYTES: break
+            try:
+                os.remove(path); total -= size; removed += 1
+            except OSError as e: logger.warning(f"Could not remove old word cloud {path}: {e}")
+        if removed: logger.info(f"Word cloud GC removed {removed} files; {total} bytes remain")
+    except OSError as e:
+        logger.error(f"Word cloud GC failed for {WORDCLOUD_DIR}: {e}")
+    finally:
+        _word_cloud_gc_lock.release()
+    return removed
+
+def _existing_word_cloud(output_filename):
+    output_path = os.path.join(WORDCLOUD_DIR, output_filename)
+    try:
+        os.utime(output_path)  # mark as recently used for the GC
+        return f"/static/generated_images/{output_filename}"
+    except OSError:
+        return None
+
+def generate_word_cloud(text, product_name):
+    """Generates a word cloud image from a block of text, reusing an identical existing one."""
+    frequencies = word_frequencies([text])
+    if not frequencies:
+        logger.warning(f"No text provided for word cloud generation for {product_name}.")
+        return None
+    output_filename = _word_cloud_filename(frequencies)
+    return _existing_word_cloud(output_filename) or render_word_cloud(frequencies, output_filename)
+
+# --- NEW: Whole-result cache with single-flight de-duplication ---
+from app_backend.result_cache import SingleFlightCache
+
+TWEET_DATASETS_DIR = os.path.join(project_root_dir, "tweet_datasets")
+PRODUCT_RESULT_TTL_SECONDS = int(os.getenv('PRODUCT_RESULT_TTL_SECONDS', '300'))
+
+def result_version(results):
+    """Content digest of an analysis result; equal results get equal versions in every process."""
+    return hashlib.blake2b(json.dumps(results, sort_keys=True, default=str).encode('utf-8'), digest_size=12).hexdigest()
+
+# Entries are (results, aggregates, word counts): the exact sums and the word cloud's frequency
+# table travel with a cached result but are not part of it (see _cache_entry)
+product_result_cache = SingleFlightCache(ttl=PRODUCT_RESULT_TTL_SECONDS, max_entries=int(os.getenv('PRODUCT_RESULT_CACHE_SIZE', '256')),
+                                         version_of=lambda entry: result_version(entry[0]))
+
+def dataset_version():
+    """Fingerprint of everything an analysis result is derived from.
+
+    Changes whenever a dataset file is added, removed or rewritten, tweets are
+    added to the mock index, or the lexicon/aspect table is reloaded.
+    """
+    parts = [load_nlp_resources().lexicon_version, aspect_matcher.version, str(len(get_mock_tweet_index()))]
+    try:
+        for entry in sorted(os.scandir(TWEET_DATASETS_DIR), key=lambda e: e.name):
+            st = entry.stat()
+            parts.append(f"{entry.name}:{st.st_size}:{st.st_mtime_ns}")
+    except OSError as e:
+        logger.error(f"Could not stat dataset directory {TWEET_DATASETS_DIR}: {e}")
+    return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()[:12]
+
+# --- NEW: Background word cloud rendering (see app_backend/wordcloud_queue.py) ---
+from app_backend.wordcloud_queue import RenderQueue
+wordcloud_queue = RenderQueue(
+    render_word_cloud,
+    workers=int(os.getenv('WORDCLOUD_WORKERS', '2')),
+    max_depth=int(os.getenv('WORDCLOUD_QUEUE_MAX', '32')),
+    retention_seconds=max(3600, PRODUCT_RESULT_TTL_SECONDS * 2),
+)
+
+_WORD_CLOUD_JOB_ID_RE = re.compile(r'^wc_[0-9a-f]{20}$')
+
+def word_cloud_job(frequencies):
+    """Returns a job snapshot for the word cloud of a frequency table without waiting for the render.
+
+    An identical image already on disk is returned as done; otherwise a render
+    is queued, shared with any pending render of the same table. The job id
+    is the image's file name without extension, so it is the same in every
+    process.
+    """
+    output_filename = _word_cloud_filename(frequencies)
+    job_id = os.path.splitext(output_filename)[0]
+    url = _existing_word_cloud(output_filename)
+    if url:
+        return {'job_id': job_id, 'status': 'done', 'url': url, 'error': None}
+    return wordcloud_queue.submit(output_filename, f"/static/generated_images/{output_filename}", frequencies, output_filename, job_id=job_id)
+
+def word_cloud_status(job_id, wait=0.0):
+    """Snapshot of a render job, waiting up to wait seconds for it to finish; None when unknown.
+
+    Jobs queued by another process (or pruned from this one) are answered
+    from the image on disk: done once it exists.
+    """
+    if not _WORD_CLOUD_JOB_ID_RE.match(job_id):
         return None
+    job = wordcloud_queue.get(job_id, wait=wait)
+    if job is not None:
+        return job
+    deadline = time.monotonic() + wait
+    while True:
+        url = _existing_word_cloud(f"{job_id}.{WORDCLOUD_FORMAT}")
+        if url:
+            return {'job_id': job_id, 'status': 'done', 'url': url, 'error': None}
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(0.25, remaining))
+
+def _set_word_cloud_job(results, job):
+    results['word_cloud_url'] = results['word_cloud_status'] = results['word_cloud_status_url'] = None
+    if job:
+        results['word_cloud_status'] = job['status']
+        if job['status'] != 'rejected':
+            results['word_cloud_url'] = job['url']
+        if job['status'] not in ('done', 'rejected'):
+            results['word_cloud_status_url'] = f"/api/wordcloud/{job['job_id']}"
+
+def _cache_entry(results, aggregates, word_counts):
+    # The word cloud fields change as the render progresses, so they are filled per response
+    results = dict(results, word_cloud_url=None, word_cloud_status=None, word_cloud_status_url=None)
+    return results, aggregates, word_counts
+
+def _from_cache_entry(entry, aggregates):
+    """A cached result with its current word cloud status (a missing image is queued again)."""
+    results, sums, word_counts = entry
+    if aggregates is not None: aggregates.update(sums)
+    _set_word_cloud_job(results, word_cloud_job(word_counts) if word_counts else None)
+    return results
+
+def _product_cache_key(product_name):
+    return " ".join(product_name.lower().split())
 
-def get_product_sentiment_analysis(product_name):
+def invalidate_product_results(product_name=None):
+    """Drops cached analysis results for one product, or for all products."""
+    if product_name is None:
+        product_result_cache.invalidate()
+        return
+    product_key = _product_cache_key(product_name)
+    product_result_cache.invalidate_matching(lambda key: key[0] == product_key)
+
+def get_product_sentiment_analysis(product_name, use_cache=True, timings=None, with_version=False, aggregates=None):
+    """Full analysis of a product, served from the result cache when fresh.
+
+    Concurrent calls for the same product share a single computation. When
+    timings is a dict it receives the cache outcome ('cache': hit/miss/off)
+    and, for a computed result, the duration of each stage. with_version
+    returns (results, result_version(results)), the version being computed
+    once per cached result plus the word cloud status, which is filled in for
+    each call. When aggregates is a dict it receives the exact sums behind
+    the result (see iter_product_sentiment_analysis).
+    """
+    if not use_cache:
+        if timings is not None: timings['cache'] = 'off'
+        results = compute_product_sentiment_analysis(product_name, timings=timings, aggregates=aggregates)
+        return (results, result_version(results)) if with_version else results
+    computed = []
+    def compute():
+        computed.append(True)
+        sums, word_counts = {}, {}
+        results = compute_product_sentiment_analysis(product_name, timings=timings, aggregates=sums, word_counts=word_counts)
+        return _cache_entry(results, sums, word_counts)
+    key = (_product_cache_key(product_name), dataset_version())
+    entry, version = product_result_cache.get_or_compute_versioned(key, compute)
+    results = _from_cache_entry(entry, aggregates)
+    CACHE_REQUESTS.inc(cache='product_result', result='miss' if computed else 'hit')
+    if timings is not None: timings['cache'] = 'miss' if computed else 'hit'
+    return (results, f"{version}:{results['word_cloud_status']}") if with_version else results
+
+# --- NEW: Incremental analysis ---
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', '50'))
+
+def _finished_lookups(pending, results, wait_all=False):
+    # Yields an event for each external lookup that has finished (or, with wait_all, for all of them as they finish).
+    for future in (as_completed(list(pending)) if wait_all else [f for f in list(pending) if f.done()]):
+        event, field = pending.pop(future)
+        results[field] = future.result()
+        yield event, {field: results[field]}
+
+def _reported_aspects(aspect_sentiments_data):
+    return { asp: dict(data) for asp, data in aspect_sentiments_data.items() if data['mentions'] >= 2 }
+
+def _timed_call(stage, timings, function, *args):
+    with timed(stage, timings):
+        return function(*args)
+
+def iter_product_sentiment_analysis(product_name, chunk_size=None, word_cloud=True, timings=None, aggregates=None, word_counts=None):
+    """Runs the analysis of a product step by step, yielding (event, data) as each part is ready.
+
+    Events, in order: 'tweets' (how many will be analyzed); after every chunk_size
+    tweets (all at once by default) 'sentiment' (running counts and score) and
+    'aspects' (running aspect counts); 'word_cloud'; 'image' and 'specs' whenever
+    their lookups finish; finally 'result', the complete result dict.
+    With word_cloud=False no word cloud is requested and 'word_cloud' is skipped.
+    Stage durations are added to timings when it is a dict (see metrics.timed).
+    When aggregates is a dict it receives the exact sums behind the rounded
+    figures ('compound_sum', 'aspect_counts'), which SmartphoneScore merges;
+    they are not part of the result. word_counts likewise receives the word
+    frequencies the word cloud is drawn from.
+    """
     logger.info(f"Starting analysis for: {product_name}")
     
-    tweets, twitter_error_message = fetch_real_tweets(product_name, count=200)
-    
-    product_image = fetch_product_image_url(product_name)
-    spec_snippet = fetch_product_specifications_snippet(product_name)
+    # External lookups run in the background while tweets are loaded and scored.
+    pending = {
+        _lookup_executor.submit(_timed_call, 'image_lookup', timings, fetch_product_image_url, product_name): ('image', 'product_image_url'),
+        _lookup_executor.submit(_timed_call, 'specs_lookup', timings, fetch_product_specifications_snippet, product_name): ('specs', 'product_specifications_snippet'),
+    }
+
+    with timed('dataset_load', timings):
+        tweets, twitter_error_message = fetch_real_tweets(product_name, count=200)
 
     results = {
-        'product_image_url': product_image,
-        'product_specifications_snippet': spec_snippet,
+        'product_image_url': None,
+        'product_specifications_snippet': None,
         'overall_sentiment': {'positive': 0, 'negative': 0, 'neutral': 0},
         'aspect_sentiments': {}, 'tweets_count': 0, 'sample_tweets': [],
         'error_message': twitter_error_message,
         'overall_score': 0.0, # NEW: Add numerical score
-        'word_cloud_url': None # NEW: Add path for word cloud image
+        'word_cloud_url': None, # NEW: Add path for word cloud image
+        'word_cloud_status': None, # queued/running/done/failed/rejected; the image exists once 'done'
+        'word_cloud_status_url': None
     }
+    yield 'tweets', {'tweets_count': len(tweets) if tweets else 0, 'error_message': twitter_error_message}
 
     if not tweets:
         logger.warning(f"No tweets available (mocked or live) for '{product_name}'. Error: {twitter_error_message}")
         results['error_message'] = results.get('error_message') or "No tweets available for analysis."
         results['sample_tweets'] = [{"text": results['error_message'], "sentiment": "neutral"}]
-        return results
+        yield from _finished_lookups(pending, results, wait_all=True)
+        yield 'result', results
+        return
 
     results['tweets_count'] = len(tweets)
-    aspect_sentiments_data = {aspect: {'positive': 0, 'negative': 0, 'neutral': 0, 'mentions': 0} for aspect in ASPECTS_KEYWORDS}
+    matcher = aspect_matcher
+    aspect_sentiments_data = {aspect: {'positive': 0, 'negative': 0, 'neutral': 0, 'mentions': 0} for aspect in matcher.aspects}
     analyzed_tweets_details = []
     total_compound_score = 0.0
+    chunk_size = chunk_size or len(tweets)
 
-    for tweet_text in tweets:
-        sentiment_label, scores = analyze_sentiment_vader(tweet_text)
-        total_compound_score += scores.get('compound', 0.0)
-        results['overall_sentiment'][sentiment_label] += 1
-        analyzed_tweets_details.append({'text': tweet_text, 'sentiment': sentiment_label})
-        try:
-            sentences = sent_tokenize(tweet_text.lower())
-        except Exception as e:
-            logger.warning(f"Could not tokenize tweet: {tweet_text[:50]}... Error: {e}")
-            sentences = [tweet_text.lower()] 
-
-        tweet_aspects_found = set()
-        for sentence in sentences:
-            sentence_sentiment_label, _ = analyze_sentiment_vader(sentence)
-            for aspect, keywords in ASPECTS_KEYWORDS.items():
-                if any(keyword in sentence for keyword in keywords):
+    for chunk_start in range(0, len(tweets), chunk_size):
+        chunk = tweets[chunk_start:chunk_start + chunk_size]
+        for tweet_text, analysis in zip(chunk, analyze_tweets(chunk, matcher, timings)):
+            total_compound_score += analysis.compound
+            results['overall_sentiment'][analysis.label] += 1
+            analyzed_tweets_details.append({'text': tweet_text, 'sentiment': analysis.label})
+
+            tweet_aspects_found = set()
+            for sentence_sentiment_label, aspects in analysis.sentences:
+                for aspect in aspects:
                     if aspect not in tweet_aspects_found:
                         aspect_sentiments_data[aspect]['mentions'] += 1
                         tweet_aspects_found.add(aspect)
                     aspect_sentiments_data[aspect][sentence_sentiment_label] += 1
-    
-    if results['tweets_count'] > 0:
-        results['overall_score'] = round(total_compound_score / results['tweets_count'], 3)
-        full_tweet_text = " ".join(tweets)
-        results['word_cloud_url'] = generate_word_cloud(full_tweet_text, product_name)
 
-    results['aspect_sentiments'] = { asp: data for asp, data in aspect_sentiments_data.items() if data['mentions'] >= 2 }
+        processed = len(analyzed_tweets_details)
+        results['overall_score'] = round(total_compound_score / processed, 3)
+        if processed < len(tweets):
+            yield 'sentiment', {'processed': processed, 'tweets_count': len(tweets),
+                                'overall_sentiment': dict(results['overall_sentiment']), 'overall_score': results['overall_score']}
+            yield 'aspects', {'processed': processed, 'aspect_sentiments': _reported_aspects(aspect_sentiments_data)}
+            yield from _finished_lookups(pending, results)
+
+    results['aspect_sentiments'] = _reported_aspects(aspect_sentiments_data)
+    if aggregates is not None:
+        aggregates['compound_sum'] = total_compound_score
+        aggregates['aspect_counts'] = {asp: dict(data) for asp, data in aspect_sentiments_data.items() if data['mentions']}
+    yield 'sentiment', {'processed': len(tweets), 'tweets_count': len(tweets),
+                        'overall_sentiment': dict(results['overall_sentiment']), 'overall_score': results['overall_score']}
+    yield 'aspects', {'processed': len(tweets), 'aspect_sentiments': results['aspect_sentiments']}
+
+    if word_cloud:
+        with timed('word_cloud_request', timings):
+            frequencies = word_frequencies(tweets)
+            if not frequencies:
+                logger.warning(f"No text provided for word cloud generation for {product_name}.")
+            _set_word_cloud_job(results, word_cloud_job(frequencies) if frequencies else None)
+        if word_counts is not None: word_counts.update(frequencies)
+        yield 'word_cloud', {field: results[field] for field in ('word_cloud_url', 'word_cloud_status', 'word_cloud_status_url')}
+
     results['sample_tweets'] = random.sample(analyzed_tweets_details, min(5, len(analyzed_tweets_details))) if analyzed_tweets_details else [{"text": "No tweets available for sampling.", "sentiment": "neutral"}]
+    yield from _finished_lookups(pending, results, wait_all=True)
     
     logger.info(f"Finished analysis for: {product_name}")
-    return results
\ No newline at end of file
+    yield 'result', results
+
+def stream_product_sentiment_analysis(product_name, chunk_size=None, aggregates=None):
+    """iter_product_sentiment_analysis() through the result cache.
+
+    A fresh cached result is sent straight away as the only event; a newly
+    computed one is cached when its 'result' event is produced. aggregates
+    is filled as in get_product_sentiment_analysis.
+    """
+    key = (_product_cache_key(product_name), dataset_version())
+    cached = product_result_cache.get(key)
+    CACHE_REQUESTS.inc(cache='product_result', result='miss' if cached is None else 'hit')
+    if cached is not None:
+        yield 'result', _from_cache_entry(cached, aggregates)
+        return
+    sums, word_counts = {}, {}
+    for event, data in iter_product_sentiment_analysis(product_name, chunk_size or STREAM_CHUNK_SIZE, aggregates=sums, word_counts=word_counts):
+        if event == 'result':
+            product_result_cache.put(key, _cache_entry(data, sums, word_counts))
+            if aggregates is not None: aggregates.update(sums)
+        yield event, data
+
+def compute_product_sentiment_analysis(product_name, word_cloud=True, timings=None, aggregates=None, word_counts=None):
+    with timed('analysis', timings):
+        for event, data in iter_product_sentiment_analysis(product_name, word_cloud=word_cloud, timings=timings,
+                                                           aggregates=aggregates, word_counts=word_counts):
+            if event == 'result':
+                return data
+
+# --- NEW: Gauges read at scrape time ---
+def _collect_gauges():
+    tweet_cache = tweet_analysis_cache.stats()
+    queue = wordcloud_queue.stats()
+    return [
+        ('sentiment_cache_entries', 'gauge', 'Entries held by each in-memory cache.', [
+            ({'cache': 'product_result'}, product_result_cache.stats()['entries']),
+            ({'cache': 'tweet_analysis'}, tweet_cache['entries']),
+        ]),
+        ('sentiment_tweet_cache_bytes', 'gauge', 'Estimated size of the per-tweet analysis cache.', [({}, tweet_cache['bytes'])]),
+        ('wordcloud_queue_depth', 'gauge', 'Word cloud renders waiting for a worker.', [({}, queue['depth'])]),
+        ('wordcloud_queue_active', 'gauge', 'Word cloud renders in progress.', [({}, queue['active'])]),
+        ('wordcloud_queue_rejected', 'counter', 'Word cloud renders refused because the queue was full.', [({}, queue['rejected'])]),
+    ]
+
+metrics_registry.register_collector(_collect_gauges)
+
+# --- NEW: Background warm-up and readiness ---
+# /api/health only says the process is alive; readiness() says whether an
+# analysis can run without first paying for imports and dataset loading.
+def _warm_nlp():
+    load_nlp_resources()
+    _sent_tokenize("Warm up. Punkt loads its parameters on first use.")
+
+def _warm_google_client():
+    import googleapiclient.discovery
+    import httplib2
+
+_WARMUP_STEPS = (
+    ('nlp', _warm_nlp),
+    ('mock_corpus', get_mock_tweet_index),
+    ('wordcloud', _load_wordcloud),
+    ('google_client', _warm_google_client),
+)
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+_warmup_state = {'status': 'cold', 'started_at': None, 'finished_at': None, 'steps_ms': {}, 'errors': {}}
+
+def warm_up():
+    """Loads every lazily initialised resource now, recording how long each step took."""
+    with _warmup_lock:
+        _warmup_state.update(status='warming', started_at=time.time(), finished_at=None, steps_ms={}, errors={})
+    for name, step in _WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"Warm-up step '{name}' failed: {e}")
+            with _warmup_lock: _warmup_state['errors'][name] = str(e)
+        with _warmup_lock: _warmup_state['steps_ms'][name] = round((time.perf_counter() - start) * 1000, 1)
+    with _warmup_lock:
+        _warmup_state.update(status='failed' if _warmup_state['errors'] else 'ready', finished_at=time.time())
+        logger.info(f"Warm-up {_warmup_state['status']} in {_warmup_state['finished_at'] - _warmup_state['started_at']:.2f}s: {_warmup_state['steps_ms']}")
+    return readiness()
+
+def start_warm_up():
+    """Starts warm_up() on a daemon thread unless it is running or has already succeeded."""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_state['status'] == 'ready' or (_warmup_thread is not None and _warmup_thread.is_alive()):
+            return _warmup_thread
+        _warmup_thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+        _warmup_thread.start()
+        return _warmup_thread
+
+def readiness():
+    """Snapshot of the warm-up state; 'ready' is True once every step has succeeded."""
+    with _warmup_lock:
+        state = dict(_warmup_state, steps_ms=dict(_warmup_state['steps_ms']), errors=dict(_warmup_state['errors']))
+    state['ready'] = state['status'] == 'ready'
+    return state
+
+def _after_fork_in_child():
+    # With gunicorn --preload the master imports this module and may fork while
+    # warm-up holds a lock; give the worker fresh locks and resume the warm-up there.
+    global _nlp_lock, _mock_corpus_lock, _warmup_lock, _word_cloud_gc_lock, _cse_lock, _warmup_thread
+    _nlp_lock, _mock_corpus_lock, _warmup_lock = threading.Lock(), threading.Lock(), threading.Lock()
+    _word_cloud_gc_lock, _cse_lock = threading.Lock(), threading.Lock()
+    _warmup_thread = None
+    if _warmup_state['status'] == 'warming':
+        start_warm_up()
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,223 @@
+"""
+Compact, memory-mapped tweet corpus format.
+
+A ``.corpus`` file holds every tweet as one UTF-8 blob plus an offsets
+array, optionally followed by the lowercased text and by each tweet's
+token IDs (unique, as produced by ``tweet_index.tokenize``) against a
+vocabulary. It is opened with ``mmap``, so every gunicorn worker reading
+the same file shares one physical copy through the page cache, and a tweet
+is only decoded to ``str`` when it is accessed.
+
+Layout (little-endian): a fixed header (magic, version, flags, document and
+vocabulary counts), a table of (offset, length) for each section, then the
+sections themselves, each 8-byte aligned.
+"""
+import mmap
+import os
+import random
+import struct
+import tempfile
+from array import array
+
+import numpy as np
+
+from app_backend.tweet_index import tokenize
+
+MAGIC = b'TWCORPUS'
+VERSION = 1
+FLAG_LOWERCASE = 1
+FLAG_TOKEN_IDS = 2
+
+# text, text_offsets, lower, lower_offsets, vocab, vocab_offsets, token_offsets, token_ids
+_SECTIONS = 8
+_HEADER = struct.Struct('<8sIIQQ')
+_SECTION = struct.Struct('<QQ')
+_ALIGN = 8
+
+
+class MappedCorpus:
+    """Read-only sequence of tweets backed by a memory-mapped .corpus file.
+
+    Supports ``len``, indexing, slicing and iteration like a list of str.
+    ``extend`` keeps tweets added at runtime in memory after the mapped ones,
+    so the corpus can back a ``TweetIndex`` that grows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.flags, self._count, vocab_size = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} tweet corpus")
+        sections = [_SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size) for i in range(_SECTIONS)]
+        self._text, self._lower, self._vocab = sections[0][0], sections[2][0], sections[4][0]
+        self._text_offsets = self._u64(sections[1], self._count + 1)
+        self._lower_offsets = self._u64(sections[3], self._count + 1) if self.has_lowercase else None
+        self._vocab_offsets = self._token_offsets = self._token_ids = None
+        if self.has_token_ids:
+            self._vocab_offsets = self._u64(sections[5], vocab_size + 1)
+            self._token_offsets = self._u64(sections[6], self._count + 1)
+            self._token_ids = np.frombuffer(self._mm, dtype='<u4', count=sections[7][1] // 4, offset=sections[7][0])
+        self._extra = []
+
+    def _u64(self, section, count):
+        return np.frombuffer(self._mm, dtype='<u8', count=count, offset=section[0])
+
+    @property
+    def has_lowercase(self):
+        return bool(self.flags & FLAG_LOWERCASE)
+
+    @property
+    def has_token_ids(self):
+        return bool(self.flags & FLAG_TOKEN_IDS)
+
+    def __len__(self):
+        return self._count + len(self._extra)
+
+    def _index(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('corpus index out of range')
+        return i
+
+    def _decode(self, base, offsets, i):
+        return self._mm[base + int(offsets[i]):base + int(offsets[i + 1])].decode('utf-8')
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = self._index(i)
+        if i >= self._count:
+            return self._extra[i - self._count]
+        return self._decode(self._text, self._text_offsets, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def lower(self, i):
+        """Lowercased text of tweet i, precomputed when the corpus has it."""
+        i = self._index(i)
+        if self._lower_offsets is None or i >= self._count:
+            return self[i].lower()
+        return self._decode(self._lower, self._lower_offsets, i)
+
+    def vocabulary(self):
+        """Token strings, indexed by token ID."""
+        if not self.has_token_ids:
+            return []
+        offsets = self._vocab_offsets.tolist()
+        return [self._mm[self._vocab + a:self._vocab + b].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+
+    def token_ids(self, i):
+        """Unique token IDs of mapped tweet i (a read-only view into the file)."""
+        return self._token_ids[int(self._token_offsets[i]):int(self._token_offsets[i + 1])]
+
+    def token_id_arrays(self):
+        """(token_offsets, token_ids) views for TweetIndex.from_token_ids."""
+        return self._token_offsets, self._token_ids
+
+    def sample(self, k, rng=random):
+        """Up to k distinct random tweets; only the chosen ones are decoded."""
+        return [self[i] for i in rng.sample(range(len(self)), min(k, len(self)))]
+
+    def append(self, text):
+        self._extra.append(text)
+
+    def extend(self, texts):
+        self._extra.extend(texts)
+
+    def close(self):
+        # Views into the map must be dropped before it can be closed.
+        self._text_offsets = self._lower_offsets = None
+        self._vocab_offsets = self._token_offsets = self._token_ids = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # still referenced elsewhere; the map closes when those views go away
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_corpus(path, texts, lowercase=False, token_ids=True):
+    """Writes tweets to a .corpus file at path (atomically); returns the number written.
+
+    texts may be any iterable, e.g. dataset_stream.iter_tweets(...): tweet text
+    is spooled to temporary files, so only offsets and token IDs stay in memory.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    text_offsets, lower_offsets = array('Q', [0]), array('Q', [0])
+    token_offsets, ids = array('Q', [0]), array('I')
+    vocab = {}
+    with tempfile.TemporaryFile(dir=directory) as text_blob, tempfile.TemporaryFile(dir=directory) as lower_blob:
+        for text in texts:
+            encoded = text.encode('utf-8')
+            text_blob.write(encoded)
+            text_offsets.append(text_offsets[-1] + len(encoded))
+            if lowercase:
+                encoded = text.lower().encode('utf-8')
+                lower_blob.write(encoded)
+                lower_offsets.append(lower_offsets[-1] + len(encoded))
+            if token_ids:
+                ids.extend(sorted({vocab.setdefault(t, len(vocab)) for t in tokenize(text)}))
+                token_offsets.append(len(ids))
+        count = len(text_offsets) - 1
+
+        vocab_blob = bytearray()
+        vocab_offsets = array('Q', [0])
+        for token in vocab:  # insertion order is ID order
+            vocab_blob += token.encode('utf-8')
+            vocab_offsets.append(len(vocab_blob))
+
+        flags = (FLAG_LOWERCASE if lowercase else 0) | (FLAG_TOKEN_IDS if token_ids else 0)
+        sections = [
+            text_blob, _le(text_offsets),
+            lower_blob if lowercase else b'', _le(lower_offsets) if lowercase else b'',
+            bytes(vocab_blob) if token_ids else b'', _le(vocab_offsets) if token_ids else b'',
+            _le(token_offsets) if token_ids else b'', _le(ids) if token_ids else b'',
+        ]
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                table_end = _HEADER.size + _SECTIONS * _SECTION.size
+                out.write(b'\0' * _aligned(table_end))
+                table = []
+                for section in sections:
+                    start = out.tell()
+                    if isinstance(section, bytes):
+                        out.write(section)
+                    else:
+                        section.seek(0)
+                        while chunk := section.read(1 << 20):
+                            out.write(chunk)
+                    table.append((start, out.tell() - start))
+                    out.write(b'\0' * (_aligned(out.tell()) - out.tell()))
+                out.seek(0)
+                out.write(_HEADER.pack(MAGIC, VERSION, flags, count, len(vocab) if token_ids else 0))
+                for start, length in table:
+                    out.write(_SECTION.pack(start, length))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            raise
+    return count
+
+
+def _le(values):
+    if struct.pack('=H', 1) != struct.pack('<H', 1):
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _aligned(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
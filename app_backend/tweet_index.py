@@ -0,0 +1,126 @@
+"""
+Token-level inverted index over a tweet corpus.
+
+Each lowercase word token maps to a sorted posting list of tweet IDs (the
+tweet's position in the corpus list). Tweets are only ever appended, so new
+IDs are always the largest and posting lists stay sorted without a rebuild.
+"""
+import random
+import re
+import threading
+from array import array
+
+import numpy as np
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_EMPTY = np.zeros(0, dtype=np.uint32)
+
+
+def tokenize(text):
+    """Lowercase word tokens of text, as used for indexing and queries."""
+    return _WORD_RE.findall(text.lower())
+
+
+class TweetIndex:
+    """Inverted index mapping tokens to sorted arrays of tweet IDs."""
+
+    def __init__(self, documents=None):
+        self.documents = documents if documents is not None else []
+        self._postings = {}
+        self._lock = threading.Lock()
+        self._indexed = 0
+        self._index_pending()
+
+    @classmethod
+    def from_token_ids(cls, documents, vocabulary, token_offsets, token_ids):
+        """Builds the index from precomputed token IDs instead of tokenizing (see tweet_corpus.py).
+
+        token_ids[token_offsets[d]:token_offsets[d + 1]] are the unique IDs, into
+        vocabulary, of the tokens of document d. Documents past the last offset
+        are tokenized as usual.
+        """
+        index = cls([])
+        index.documents = documents
+        token_ids = np.asarray(token_ids)
+        if token_ids.size:
+            counts = np.diff(np.asarray(token_offsets, dtype=np.int64))
+            doc_ids = np.repeat(np.arange(len(counts), dtype=np.uint32), counts)
+            order = np.argsort(token_ids, kind='stable')  # stable: doc IDs stay sorted per token
+            sorted_tokens, sorted_docs = token_ids[order], doc_ids[order]
+            bounds = (np.flatnonzero(np.diff(sorted_tokens)) + 1).tolist()
+            for start, end in zip([0] + bounds, bounds + [len(sorted_tokens)]):
+                index._postings[vocabulary[sorted_tokens[start]]] = array('I', sorted_docs[start:end].tobytes())
+        index._indexed = len(token_offsets) - 1
+        index._index_pending()
+        return index
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _index_pending(self):
+        postings = self._postings
+        for doc_id in range(self._indexed, len(self.documents)):
+            for token in set(tokenize(self.documents[doc_id])):
+                posting = postings.get(token)
+                if posting is None:
+                    posting = postings[token] = array('I')
+                posting.append(doc_id)
+        self._indexed = len(self.documents)
+
+    def add(self, texts):
+        """Appends tweets to the corpus and indexes them; returns their IDs."""
+        with self._lock:
+            start = len(self.documents)
+            self.documents.extend(texts)
+            self._index_pending()
+            return range(start, len(self.documents))
+
+    def postings(self, token):
+        """Sorted tweet IDs containing token."""
+        with self._lock:
+            posting = self._postings.get(token.lower())
+            return np.array(posting, dtype=np.uint32) if posting else _EMPTY
+
+    def union(self, tokens):
+        """Sorted IDs of tweets containing any of tokens."""
+        lists = [self.postings(t) for t in set(tokens)]
+        lists = [p for p in lists if p.size]
+        if not lists:
+            return _EMPTY
+        if len(lists) == 1:
+            return lists[0]
+        return np.unique(np.concatenate(lists))
+
+    def intersection(self, tokens):
+        """Sorted IDs of tweets containing all of tokens."""
+        lists = sorted((self.postings(t) for t in set(tokens)), key=len)
+        if not lists:
+            return _EMPTY
+        result = lists[0]
+        for posting in lists[1:]:
+            if not result.size:
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def sample_excluding(self, excluded_ids, k, rng=random):
+        """Picks up to k random tweet IDs that are not in the sorted excluded_ids array."""
+        n = len(self.documents)
+        k = min(k, n - len(excluded_ids))
+        if k <= 0:
+            return []
+        if k + len(excluded_ids) < n // 2:
+            # Sparse case: rejection sampling touches only O(k) IDs.
+            chosen, seen = [], set()
+            while len(chosen) < k:
+                candidate = rng.randrange(n)
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                i = np.searchsorted(excluded_ids, candidate)
+                if i < len(excluded_ids) and excluded_ids[i] == candidate:
+                    continue
+                chosen.append(candidate)
+            return chosen
+        remaining = np.setdiff1d(np.arange(n, dtype=np.uint32), excluded_ids, assume_unique=True)
+        return rng.sample(remaining.tolist(), k)
@@ -0,0 +1,270 @@
+"""
+Vectorized batch scoring engine for NLTK's VADER analyzer.
+
+Texts are tokenized once (the same way ``SentiText`` does it), every token is
+mapped to an ID in a vocabulary that carries its lexicon valence and rule
+flags, and the VADER rules (caps emphasis, boosters, negation, "least",
+"but", punctuation emphasis and compound normalisation) are evaluated as
+NumPy array operations over the whole batch.
+
+Tolerance: ``compound`` matches ``SentimentIntensityAnalyzer.polarity_scores``
+to within 1e-4 and ``pos``/``neg``/``neu`` to within 1e-3. The only source of
+difference is ``np.round`` versus Python's ``round`` on exact decimal ties;
+the valence arithmetic itself is performed in the same order as NLTK.
+"""
+import hashlib
+import string
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+COMPOUND_TOLERANCE = 1e-4
+PROPORTION_TOLERANCE = 1e-3
+
+_PUNCTUATION = string.punctuation
+_SO_THIS = ("so", "this")
+
+
+class BatchVaderScorer:
+    """Scores many texts at once with the rules of a SentimentIntensityAnalyzer."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.lexicon = analyzer.lexicon
+        self.constants = analyzer.constants
+        # Identifies the lexicon; used to key anything derived from scores.
+        self.lexicon_version = hashlib.sha1(
+            "\n".join(f"{w}\t{v!r}" for w, v in sorted(self.lexicon.items())).encode("utf-8")
+        ).hexdigest()[:12]
+        self._punc_set = set(self.constants.PUNC_LIST)
+        self._remove_punctuation = self.constants.REGEX_REMOVE_PUNCTUATION
+        # Words taking part in multi-word idioms or boosters ("kind of", "the bomb")
+        # are rare; positions near them are re-scored with NLTK's own code.
+        self._idiom_words = set()
+        for phrase in list(self.constants.SPECIAL_CASE_IDIOMS) + list(self.constants.BOOSTER_DICT):
+            if " " in phrase:
+                self._idiom_words.update(phrase.split())
+
+        self._lock = threading.Lock()
+        self._vocab = {}
+        self._size = 0
+        self._capacity = 0
+        self._features = {}
+        self._grow(4096)
+
+    # ---- Vocabulary ----
+
+    _FLOAT_FEATURES = ("valence", "booster")
+    _BOOL_FEATURES = ("in_lexicon", "is_booster", "negated", "upper", "never", "so_this",
+                      "least", "at_very", "kind", "of", "but", "idiom")
+
+    def _grow(self, capacity):
+        for name in self._FLOAT_FEATURES:
+            arr = np.zeros(capacity, dtype=np.float64)
+            if name in self._features:
+                arr[:self._size] = self._features[name][:self._size]
+            self._features[name] = arr
+        for name in self._BOOL_FEATURES:
+            arr = np.zeros(capacity, dtype=bool)
+            if name in self._features:
+                arr[:self._size] = self._features[name][:self._size]
+            self._features[name] = arr
+        self._capacity = capacity
+
+    def _add_token(self, token):
+        """Registers a raw token and its rule flags, returning its vocabulary ID."""
+        if self._size == self._capacity:
+            self._grow(self._capacity * 2)
+        idx = self._size
+        lower = token.lower()
+        f = self._features
+        if lower in self.lexicon:
+            f["in_lexicon"][idx] = True
+            f["valence"][idx] = self.lexicon[lower]
+        if lower in self.constants.BOOSTER_DICT:
+            f["is_booster"][idx] = True
+            f["booster"][idx] = self.constants.BOOSTER_DICT[lower]
+        f["negated"][idx] = lower in self.constants.NEGATE or "n't" in lower
+        f["upper"][idx] = token.isupper()
+        f["never"][idx] = token == "never"
+        f["so_this"][idx] = token in _SO_THIS
+        f["least"][idx] = lower == "least"
+        f["at_very"][idx] = lower in ("at", "very")
+        f["kind"][idx] = lower == "kind"
+        f["of"][idx] = lower == "of"
+        f["but"][idx] = lower == "but"
+        f["idiom"][idx] = token in self._idiom_words
+        self._vocab[token] = idx
+        self._size += 1
+        return idx
+
+    # ---- Tokenization ----
+
+    def tokenize(self, text):
+        """Splits text into VADER's words-and-emoticons list."""
+        words_only = {w for w in self._remove_punctuation.sub("", text).split() if len(w) > 1}
+        tokens = []
+        for we in text.split():
+            if len(we) <= 1:
+                continue
+            stripped = we.rstrip(_PUNCTUATION)
+            if stripped != we and we[len(stripped):] in self._punc_set and stripped in words_only:
+                we = stripped
+            else:
+                stripped = we.lstrip(_PUNCTUATION)
+                if stripped != we and we[:len(we) - len(stripped)] in self._punc_set and stripped in words_only:
+                    we = stripped
+            tokens.append(we)
+        return tokens
+
+    # ---- Scoring ----
+
+    def score(self, texts):
+        """
+        Scores a sequence of texts.
+
+        Returns a dict of NumPy arrays with one entry per text: ``label``,
+        ``compound``, ``pos``, ``neg`` and ``neu``.
+        """
+        texts = [t if isinstance(t, str) else str(t) for t in texts]
+        n_texts = len(texts)
+
+        token_lists = [self.tokenize(t) for t in texts]
+        lengths = np.fromiter((len(toks) for toks in token_lists), dtype=np.int64, count=n_texts)
+        flat_tokens = [tok for toks in token_lists for tok in toks]
+
+        with self._lock:
+            vocab = self._vocab
+            ids = np.fromiter(
+                (vocab[tok] if tok in vocab else self._add_token(tok) for tok in flat_tokens),
+                dtype=np.int64, count=len(flat_tokens),
+            )
+            f = {name: arr[:self._size] for name, arr in self._features.items()}
+
+        n_tokens = ids.size
+        text_id = np.repeat(np.arange(n_texts), lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if n_texts else np.zeros(0, dtype=np.int64)
+        index = np.arange(n_tokens)
+        pos = index - starts[text_id] if n_tokens else index
+
+        in_lex = f["in_lexicon"][ids]
+        upper = f["upper"][ids]
+        upper_count = np.bincount(text_id, weights=upper, minlength=n_texts)
+        cap_diff = (lengths - upper_count > 0) & (lengths - upper_count < lengths)
+        cap_tok = cap_diff[text_id] if n_tokens else np.zeros(0, dtype=bool)
+
+        def back(k):
+            """IDs of the token k places earlier (clipped at the text start) and its validity mask."""
+            return ids[np.maximum(index - k, 0)], pos >= k
+
+        C_INCR = self.constants.C_INCR
+        N_SCALAR = self.constants.N_SCALAR
+
+        valence = f["valence"][ids].copy()
+        valence += np.where(in_lex & upper & cap_tok, np.where(valence > 0, C_INCR, -C_INCR), 0.0)
+
+        prev_ids = {}
+        for k, damp in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            prev, valid = back(k)
+            prev_ids[k] = prev
+            active = in_lex & valid & ~f["in_lexicon"][prev]
+
+            s = np.where(valence < 0, -f["booster"][prev], f["booster"][prev])
+            cap_boost = f["is_booster"][prev] & f["upper"][prev] & cap_tok
+            s = s + np.where(cap_boost, np.where(valence > 0, C_INCR, -C_INCR), 0.0)
+            if damp != 1.0:
+                s = s * damp
+            valence = np.where(active, valence + s, valence)
+
+            if k == 1:
+                valence = np.where(active & f["negated"][prev], valence * N_SCALAR, valence)
+            elif k == 2:
+                special = f["never"][prev] & f["so_this"][prev_ids[1]]
+                valence = np.where(active & special, valence * 1.5,
+                                   np.where(active & f["negated"][prev], valence * N_SCALAR, valence))
+            else:
+                special = (f["never"][prev] & f["so_this"][prev_ids[2]]) | f["so_this"][prev_ids[1]]
+                valence = np.where(active & special, valence * 1.25,
+                                   np.where(active & f["negated"][prev], valence * N_SCALAR, valence))
+
+        least_prev = f["least"][prev_ids[1]] & ~f["in_lexicon"][prev_ids[1]]
+        least = in_lex & least_prev & (
+            ((pos > 1) & ~f["at_very"][prev_ids[2]]) | (pos == 1)
+        )
+        valence = np.where(least, valence * N_SCALAR, valence)
+        valence = np.where(in_lex, valence, 0.0)
+
+        # Idiom windows: re-score the (rare) affected positions with NLTK itself.
+        idiom = f["idiom"][ids]
+        if idiom.any():
+            near = np.zeros(n_tokens, dtype=bool)
+            for offset in (-3, -2, -1, 0, 1, 2):
+                src = np.clip(index + offset, 0, n_tokens - 1)
+                same_text = (index + offset >= 0) & (index + offset < n_tokens) & (text_id[src] == text_id)
+                near |= same_text & idiom[src]
+            k3_prev, k3_valid = back(3)
+            candidates = np.flatnonzero(near & in_lex & k3_valid & ~f["in_lexicon"][k3_prev])
+            for j in candidates:
+                t = text_id[j]
+                sentitext = SimpleNamespace(is_cap_diff=bool(cap_diff[t]), words_and_emoticons=token_lists[t])
+                i = int(pos[j])
+                valence[j] = self.analyzer.sentiment_valence(0, sentitext, token_lists[t][i], i, [])[-1]
+
+        # Boosters and "kind of" carry no valence of their own.
+        next_ids = ids[np.minimum(index + 1, max(n_tokens - 1, 0))]
+        has_next = pos < (lengths[text_id] - 1) if n_tokens else index.astype(bool)
+        skip = f["is_booster"][ids] | (f["kind"][ids] & has_next & f["of"][next_ids])
+        valence = np.where(skip, 0.0, valence)
+
+        # NLTK scores each item at list.index(item), i.e. its first occurrence in the text.
+        if n_tokens:
+            _, first, inverse = np.unique(text_id * (self._size + 1) + ids, return_index=True, return_inverse=True)
+            sentiments = valence[first[inverse.reshape(-1)]]
+        else:
+            sentiments = valence
+
+        # "but": halve everything before the first one, boost everything after it.
+        is_but = f["but"][ids]
+        no_but = np.iinfo(np.int64).max
+        but_pos = np.full(n_texts, no_but, dtype=np.int64)
+        np.minimum.at(but_pos, text_id[is_but], pos[is_but])
+        token_but = but_pos[text_id]
+        has_but = token_but != no_but
+        sentiments = np.where(has_but & (pos < token_but), sentiments * 0.5,
+                              np.where(has_but & (pos > token_but), sentiments * 1.5, sentiments))
+
+        sum_s = np.bincount(text_id, weights=sentiments, minlength=n_texts)
+        ep = np.minimum(np.fromiter((t.count("!") for t in texts), dtype=np.int64, count=n_texts), 4) * 0.292
+        qm_count = np.fromiter((t.count("?") for t in texts), dtype=np.int64, count=n_texts)
+        qm = np.where(qm_count > 1, np.where(qm_count <= 3, qm_count * 0.18, 0.96), 0.0)
+        amplifier = ep + qm
+
+        sum_s = np.where(sum_s > 0, sum_s + amplifier, np.where(sum_s < 0, sum_s - amplifier, sum_s))
+        compound = sum_s / np.sqrt(sum_s * sum_s + 15)
+
+        pos_sum = np.bincount(text_id, weights=np.where(sentiments > 0, sentiments + 1, 0.0), minlength=n_texts)
+        neg_sum = np.bincount(text_id, weights=np.where(sentiments < 0, sentiments - 1, 0.0), minlength=n_texts)
+        neu_count = np.bincount(text_id, weights=sentiments == 0, minlength=n_texts)
+        abs_neg = np.abs(neg_sum)
+        pos_wins, neg_wins = pos_sum > abs_neg, pos_sum < abs_neg
+        pos_sum = np.where(pos_wins, pos_sum + amplifier, pos_sum)
+        neg_sum = np.where(neg_wins, neg_sum - amplifier, neg_sum)
+
+        total = pos_sum + np.abs(neg_sum) + neu_count
+        has_tokens = lengths > 0
+        safe_total = np.where(has_tokens, total, 1.0)
+        pos_ratio = np.where(has_tokens, np.abs(pos_sum / safe_total), 0.0)
+        neg_ratio = np.where(has_tokens, np.abs(neg_sum / safe_total), 0.0)
+        neu_ratio = np.where(has_tokens, np.abs(neu_count / safe_total), 0.0)
+        compound = np.where(has_tokens, compound, 0.0)
+
+        compound = np.round(compound, 4)
+        labels = np.where(compound >= 0.05, "positive", np.where(compound <= -0.05, "negative", "neutral"))
+        return {
+            "label": labels,
+            "compound": compound,
+            "pos": np.round(pos_ratio, 3),
+            "neg": np.round(neg_ratio, 3),
+            "neu": np.round(neu_ratio, 3),
+        }
@@ -0,0 +1,135 @@
+"""
+Background render queue for word-cloud images.
+
+Analyses submit render jobs instead of drawing the image inside the request.
+Jobs with the same key (same product and tweet text) coalesce into one
+render while queued or running, the number of queued jobs is bounded (a full
+queue rejects new work instead of piling it up), and callers can poll or
+long-poll a job until it finishes.
+
+Worker threads start on the first submit, in the process that submits, so a
+queue created at import survives gunicorn's --preload fork.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+REJECTED = 'rejected'
+
+
+class RenderQueue:
+    """Fixed pool of worker threads rendering jobs from a bounded queue.
+
+    ``render(*args)`` does the work and returns the image URL (or None on failure).
+    """
+
+    def __init__(self, render, workers=2, max_depth=32, retention_seconds=3600):
+        self._render = render
+        self.workers = workers
+        self.max_depth = max_depth
+        self.retention_seconds = retention_seconds
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.max_depth)
+        self._jobs = {}         # job_id -> job dict
+        self._active = {}       # coalescing key -> job_id, while queued or running
+        self._cond = threading.Condition()
+        self._workers = []
+        self.rejected = 0
+        self.coalesced = 0
+
+    def _ensure_workers(self):
+        if self._workers: return
+        self._workers = [
+            threading.Thread(target=self._run, name=f'wordcloud-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, key, url, *args, job_id=None):
+        """Queues a render producing url, or joins the in-flight job with the same key.
+
+        job_id defaults to a random id; a caller deriving it from the content
+        lets any process answer for the job once its image exists.
+        Returns the job dict snapshot; its status is REJECTED when the queue is full.
+        """
+        with self._cond:
+            self._ensure_workers()
+            self._prune()
+            active_id = self._active.get(key)
+            if active_id is not None:
+                self.coalesced += 1
+                return dict(self._jobs[active_id])
+            job = {'job_id': job_id or uuid.uuid4().hex, 'status': QUEUED, 'url': url, 'error': None,
+                   'submitted_at': time.time(), 'finished_at': None}
+            try:
+                self._queue.put_nowait((key, job['job_id'], args))
+            except queue.Full:
+                self.rejected += 1
+                logger.warning(f"Word cloud queue full ({self._queue.maxsize}); rejecting render for {url}")
+                job['status'] = REJECTED
+                return job
+            self._jobs[job['job_id']] = job
+            self._active[key] = job['job_id']
+            return dict(job)
+
+    def _run(self):
+        while True:
+            key, job_id, args = self._queue.get()
+            with self._cond:
+                self._jobs[job_id]['status'] = RUNNING
+            try:
+                url = self._render(*args)
+                error = None if url else 'render failed'
+            except Exception as e:
+                logger.error(f"Word cloud render job {job_id} crashed: {e}")
+                url, error = None, str(e)
+            with self._cond:
+                job = self._jobs[job_id]
+                job['status'] = DONE if error is None else FAILED
+                job['error'] = error
+                job['finished_at'] = time.time()
+                self._active.pop(key, None)
+                self._cond.notify_all()
+            self._queue.task_done()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [j for j, job in self._jobs.items() if job['finished_at'] and job['finished_at'] < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id, wait=0.0):
+        """Returns a snapshot of the job, waiting up to wait seconds for it to finish."""
+        deadline = time.monotonic() + wait
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] in (DONE, FAILED):
+                    return dict(job) if job else None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return dict(job)
+                self._cond.wait(remaining)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'depth': self._queue.qsize(),
+                'max_depth': self._queue.maxsize,
+                'active': len(self._active),
+                'jobs': len(self._jobs),
+                'rejected': self.rejected,
+                'coalesced': self.coalesced,
+            }
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Batch sentiment analysis from the command line.
+
+Analyzes many products on a process pool (one process per core by default,
+see app_backend/batch_analysis.py), prints each result as it finishes, and
+commits all SmartphoneScore updates in one transaction at the end:
+
+    python batch_analyze.py "iPhone 15" "Galaxy S24"
+    python batch_analyze.py --file products.txt --workers 8
+    python batch_analyze.py --all-scored              # refresh every phone already in the leaderboard
+    python batch_analyze.py --all-scored --dry-run --output results.ndjson
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dotenv import load_dotenv
+from flask import Flask
+from models import db, SmartphoneScore
+import leaderboard  # noqa: F401 (its session hooks update the leaderboard snapshot on commit)
+from app_backend.batch_analysis import iter_batch_analysis, unique_products, batch_worker_count
+
+def create_app():
+    """Create and configure the Flask app for batch analysis."""
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///sentiment_app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+
+    db.init_app(app)
+    return app
+
+def read_products(path):
+    """One product per line; blank lines and lines starting with # are ignored."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def run_batch(products, workers=None, dry_run=False, output=None):
+    """Analyze products, then save every score at once; returns True when all succeeded."""
+    app = create_app()
+
+    with app.app_context():
+        if not products:
+            print("❌ No products to analyze")
+            return False
+
+        print(f"🚀 Analyzing {len(products)} products on {batch_worker_count(len(products), workers)} processes...")
+        start = time.time()
+        scores = {}
+        aggregates = {}
+        failed = []
+        for i, (product_name, results, error) in enumerate(iter_batch_analysis(products, workers, aggregates=aggregates), 1):
+            if error:
+                failed.append(product_name)
+                print(f"❌ [{i}/{len(products)}] {product_name}: {error}")
+                continue
+            scores[product_name] = results
+            print(f"✅ [{i}/{len(products)}] {product_name}: score {results['overall_score']} "
+                  f"({results['tweets_count']} tweets)")
+            if output:
+                output.write(json.dumps({'product': product_name, 'results': results}) + "\n")
+                output.flush()
+        print(f"\n⏱️  Analyzed {len(scores)} products in {time.time() - start:.1f}s")
+
+        if dry_run:
+            print("⏭️  Dry run: smartphone scores not saved")
+        elif scores:
+            try:
+                updated, created = SmartphoneScore.record_results(scores, aggregates)
+                db.session.commit()
+                print(f"💾 Smartphone scores saved: {updated} updated, {created} created")
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Saving smartphone scores failed: {e}")
+                return False
+
+        if failed:
+            print(f"⚠️  {len(failed)} products failed: {', '.join(failed)}")
+        return not failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('products', nargs='*', help='product names')
+    parser.add_argument('--file', help='file with one product name per line')
+    parser.add_argument('--all-scored', action='store_true', help='every product already in smartphone_scores')
+    parser.add_argument('--workers', type=int, help='worker processes (default: BATCH_WORKERS or the core count)')
+    parser.add_argument('--dry-run', action='store_true', help='analyze without saving scores')
+    parser.add_argument('--output', help='also write each result to this NDJSON file')
+    args = parser.parse_args()
+
+    products = list(args.products)
+    if args.file:
+        products += read_products(args.file)
+    if args.all_scored:
+        with create_app().app_context():
+            products += [name for (name,) in db.session.query(SmartphoneScore.product_name).order_by(SmartphoneScore.product_name)]
+    products = unique_products(products)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        ok = run_batch(products, args.workers, args.dry_run, output)
+    finally:
+        if output:
+            output.close()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the sentiment pipeline and the API.
+
+Generates synthetic tweet corpora (1k to 1M tweets by default) by splicing
+tweets from tweet_datasets/various_smartphones_tweets.json, then times each
+stage of the pipeline and the end-to-end request through the Flask test
+client, with Google CSE served by fake_cse_server.py. Every stage reports
+throughput and p50/p95/p99 latency, and the results are written as JSON so
+runs can be compared across commits:
+
+    python benchmark.py                                   # writes benchmark_results.json
+    python benchmark.py --sizes 1000,10000 --output after.json
+    python benchmark.py --compare before.json after.json  # exit 1 on a regression
+    python benchmark.py --sizes 1000 --baseline before.json
+
+Per-tweet and per-chunk stages stop after --max-ops operations, so they
+measure the same amount of work at every size; the dataset, index and
+end-to-end stages scale with the corpus. The json_* stages (endpoint group)
+serialise real analysis and rankings bodies with Flask's stdlib provider
+and with the app's own.
+
+Nothing outside a temporary directory is written except the results file:
+the database, API cache, datasets and word clouds all live in the temp dir.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+SEED_DATASET = os.path.join(PROJECT_ROOT, 'tweet_datasets', 'various_smartphones_tweets.json')
+BENCH_PRODUCT = 'Bench Phone'
+CHUNK = 200  # tweets per analysis, as in compute_product_sentiment_analysis
+STAGE_GROUPS = ('pipeline', 'dataset', 'analysis', 'endpoint')
+
+
+def synthetic_tweets(seed_tweets, count, rng):
+    """Yields count tweets, each the opening of one seed tweet spliced onto the ending of another."""
+    words = [t.split() for t in seed_tweets if len(t.split()) >= 2]
+    for _ in range(count):
+        a, b = rng.choice(words), rng.choice(words)
+        yield " ".join(a[:rng.randint(1, len(a) - 1)] + b[rng.randint(1, len(b) - 1):])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=PROJECT_ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(stage, size, ops, run, items_per_op=1, setup=None):
+    """Times run(op) for each op (setup(op) runs first, untimed); returns one result row."""
+    latencies = []
+    for op in ops:
+        if setup:
+            setup(op)
+        start = time.perf_counter()
+        run(op)
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    items = len(latencies) * items_per_op
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000 if latencies else (0.0, 0.0, 0.0)
+    row = {
+        'stage': stage, 'size': size, 'ops': len(latencies), 'items': items,
+        'seconds': round(total, 4),
+        'throughput': round(items / total, 2) if total else None,
+        'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3), 'p99_ms': round(float(p99), 3),
+    }
+    print(f"  {stage:<26} {row['throughput'] or 0:>12,.1f} items/s   "
+          f"p50 {row['p50_ms']:>9.3f} ms   p95 {row['p95_ms']:>9.3f} ms   p99 {row['p99_ms']:>9.3f} ms")
+    return row
+
+
+def chunks(tweets, max_ops):
+    return [tweets[i:i + CHUNK] for i in range(0, min(len(tweets), max_ops * CHUNK), CHUNK)]
+
+
+def bench_pipeline(logic, tweets, size, max_ops):
+    """Per-tweet and per-chunk stages of the analysis."""
+    rows = []
+    singles = tweets[:max_ops]
+    lowered = [t.lower() for t in singles]
+    rows.append(measure('vader', size, singles, logic.analyze_sentiment_vader))
+    rows.append(measure('vader_batch', size, chunks(tweets, max_ops), logic.analyze_sentiment_batch, CHUNK))
+    rows.append(measure('sent_tokenize', size, lowered, logic._sent_tokenize))
+    rows.append(measure('aspect_match', size, lowered, logic.aspect_matcher.match))
+    rows.append(measure('analyze_tweets_cold', size, chunks(tweets, max_ops), logic.analyze_tweets, CHUNK,
+                        setup=lambda _: logic.tweet_analysis_cache.clear()))
+    rows.append(measure('analyze_tweets_cached', size, chunks(tweets, max_ops), logic.analyze_tweets, CHUNK,
+                        setup=lambda chunk: logic.analyze_tweets(chunk)))
+    rows.append(measure('word_frequencies', size, chunks(tweets, max_ops), logic.word_frequencies, CHUNK))
+    # Content-addressed: every chunk is a different table, so each one really renders.
+    rows.append(measure('generate_word_cloud', size, chunks(tweets, min(max_ops, 5)),
+                        lambda chunk: logic.generate_word_cloud(" ".join(chunk), BENCH_PRODUCT), CHUNK))
+    return rows
+
+
+def write_bench_dataset(datasets_dir, tweets):
+    """Writes tweets as the BENCH_PRODUCT dataset (.jsonl plus its .corpus); returns the path without extension."""
+    from app_backend.tweet_corpus import write_corpus
+    base = os.path.join(datasets_dir, f"{BENCH_PRODUCT.lower().replace(' ', '_')}_tweets")
+    with open(f"{base}.jsonl", 'w', encoding='utf-8') as f:
+        for tweet in tweets:
+            f.write(json.dumps(tweet) + "\n")
+    write_corpus(f"{base}.corpus", tweets)
+    return base
+
+
+def bench_dataset(tweets, size, repeats, base):
+    """Dataset sampling (JSONL stream vs mapped corpus) and the keyword index, all scaling with size."""
+    from app_backend.dataset_stream import sample_tweets
+    from app_backend.tweet_corpus import MappedCorpus, write_corpus
+    from app_backend.tweet_index import TweetIndex, tokenize
+
+    rows = []
+    rows.append(measure('write_corpus', size, [None], lambda _: write_corpus(f"{base}.copy.corpus", tweets), size))
+    rows.append(measure('sample_jsonl', size, range(repeats), lambda _: sample_tweets(f"{base}.jsonl", CHUNK), size))
+
+    def sample_corpus(_):
+        with MappedCorpus(f"{base}.corpus") as corpus:
+            corpus.sample(CHUNK)
+    rows.append(measure('sample_corpus', size, range(repeats), sample_corpus, CHUNK))
+
+    index = TweetIndex()
+    rows.append(measure('index_build', size, [None], lambda _: index.add(tweets), size))
+    queries = [tokenize(q) for q in ('iPhone 15', 'Galaxy S23 Ultra', 'Pixel 8 Pro', 'OnePlus 11', 'battery camera')]
+    rows.append(measure('index_query', size, [queries[i % len(queries)] for i in range(repeats * 4)], index.union))
+    return rows
+
+
+def bench_analysis(logic, size, repeats):
+    """Whole-product analysis on the size-tweet dataset written by bench_dataset."""
+    return [measure('product_analysis', size, range(repeats),
+                    lambda _: logic.get_product_sentiment_analysis(BENCH_PRODUCT, use_cache=False),
+                    setup=lambda _: logic.tweet_analysis_cache.clear())]
+
+
+def bench_endpoint(logic, client, headers, size, repeats):
+    """End-to-end requests through the Flask test client."""
+    url = f"/api/sentiment/analyze?product1={BENCH_PRODUCT}"
+
+    def request(path):
+        response = client.get(path, headers=headers)
+        response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+    def cold(_):
+        logic.invalidate_product_results()
+        logic.tweet_analysis_cache.clear()
+
+    rows = [
+        measure('endpoint_analyze', size, [url] * repeats, request, setup=cold),
+        measure('endpoint_analyze_cached', size, [url] * repeats * 4, request),
+        measure('endpoint_stream', size, [url.replace('/analyze?', '/analyze/stream?')] * repeats, request, setup=cold),
+    ]
+    return rows + bench_json(client, headers, size, repeats)
+
+
+def bench_json(client, headers, size, repeats):
+    """Serialising real response bodies: Flask's stdlib provider against the app's provider."""
+    from flask.json.provider import DefaultJSONProvider
+    app = client.application
+    stdlib = DefaultJSONProvider(app)
+    bodies = {
+        'analysis': client.get(f"/api/sentiment/analyze?product1={BENCH_PRODUCT}", headers=headers).get_json(),
+        'rankings': client.get('/api/performance/all-categories?limit=50', headers=headers).get_json(),
+    }
+    rows = []
+    for name, body in bodies.items():
+        ops = [body] * repeats * 20
+        rows.append(measure(f'json_{name}_stdlib', size, ops, lambda b: stdlib.dumps(b, separators=(',', ':'))))
+        rows.append(measure(f'json_{name}_provider', size, ops, lambda b: app.json.dumps(b, separators=(',', ':'))))
+    return rows
+
+
+def run_benchmarks(sizes, groups, max_ops, repeats, seed):
+    with tempfile.TemporaryDirectory(prefix='sentiment-bench-') as tmp:
+        # Everything the app writes goes to the temp dir; configure before importing it.
+        from fake_cse_server import start_fake_cse_server
+        cse_server, cse_url = start_fake_cse_server()
+        os.environ.update({
+            'DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'API_CACHE_DB': os.path.join(tmp, 'api_cache.sqlite3'),
+            'GOOGLE_CSE_ENDPOINT': cse_url, 'GOOGLE_API_KEY': 'fake', 'GOOGLE_CSE_ID': 'fake',
+            'WARMUP_ON_START': '0',
+        })
+        os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-' + 'x' * 32)
+        datasets_dir = os.path.join(tmp, 'tweet_datasets')
+        os.makedirs(os.path.join(tmp, 'static', 'generated_images'))
+        os.makedirs(datasets_dir)
+
+        import logging
+        logging.disable(logging.INFO)
+        from app_backend import sentiment_logic as logic
+        logic.project_root_dir = tmp
+        logic.TWEET_DATASETS_DIR = datasets_dir
+        logic.WORDCLOUD_DIR = os.path.join(tmp, 'static', 'generated_images')
+        logic.load_nlp_resources()
+
+        client = headers = None
+        if 'endpoint' in groups:
+            from app import app
+            from models import db
+            with app.app_context():
+                db.create_all()
+            client = app.test_client()
+            client.post('/api/auth/register', json={'username': 'bench', 'email': 'bench@example.com', 'password': 'bench'})
+            token = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'bench'}).get_json()['access_token']
+            headers = {'Authorization': f'Bearer {token}'}
+
+        from app_backend.dataset_stream import iter_tweets
+        seed_tweets = list(iter_tweets(SEED_DATASET))
+        rows = []
+        for size in sizes:
+            print(f"\n📊 {size:,} tweets")
+            tweets = list(synthetic_tweets(seed_tweets, size, random.Random(seed + size)))
+            if 'pipeline' in groups:
+                rows += bench_pipeline(logic, tweets, size, max_ops)
+            base = write_bench_dataset(datasets_dir, tweets)
+            if 'dataset' in groups:
+                rows += bench_dataset(tweets, size, repeats, base)
+            if 'analysis' in groups:
+                rows += bench_analysis(logic, size, repeats)
+            if 'endpoint' in groups:
+                rows += bench_endpoint(logic, client, headers, size, repeats)
+
+        # Let queued word cloud renders finish before the temp dir goes away
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            stats = logic.wordcloud_queue.stats()
+            if not stats['depth'] and not stats['active']:
+                break
+            time.sleep(0.1)
+        cse_server.shutdown()
+        return rows
+
+
+def compare(baseline, current, threshold):
+    """Prints per-stage changes; returns the (stage, size) rows that regressed by more than threshold."""
+    base_rows = {(r['stage'], r['size']): r for r in baseline['results']}
+    regressions = []
+    print(f"Comparing {current['meta'].get('commit')} against {baseline['meta'].get('commit')} (threshold {threshold:.0%})\n")
+    for row in current['results']:
+        base = base_rows.get((row['stage'], row['size']))
+        if not base or not base['throughput'] or not row['throughput']:
+            continue
+        throughput_change = row['throughput'] / base['throughput'] - 1
+        p95_change = row['p95_ms'] / base['p95_ms'] - 1 if base['p95_ms'] else 0.0
+        regressed = throughput_change < -threshold or p95_change > threshold
+        if regressed:
+            regressions.append((row['stage'], row['size']))
+        print(f"{'❌' if regressed else '  '} {row['stage']:<26} {row['size']:>9,}   "
+              f"throughput {throughput_change:+7.1%}   p95 {p95_change:+7.1%}")
+    return regressions
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000', help='comma-separated corpus sizes')
+    parser.add_argument('--only', default=','.join(STAGE_GROUPS), help=f"stage groups to run ({', '.join(STAGE_GROUPS)})")
+    parser.add_argument('--max-ops', type=int, default=2000, help='operations per per-tweet/per-chunk stage')
+    parser.add_argument('--repeats', type=int, default=5, help='operations per dataset/analysis/endpoint stage')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='results file to compare this run against')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='compare two results files and exit')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change counted as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    groups = {g.strip() for g in args.only.split(',') if g.strip()}
+    unknown = groups - set(STAGE_GROUPS)
+    if unknown:
+        parser.error(f"unknown stage groups: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    started = time.time()
+    rows = run_benchmarks(sizes, groups, args.max_ops, args.repeats, args.seed)
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sizes': sizes, 'max_ops': args.max_ops, 'repeats': args.repeats, 'seed': args.seed,
+            'duration_seconds': round(time.time() - started, 1),
+        },
+        'results': rows,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ {len(rows)} results written to {args.output}")
+
+    if args.baseline:
+        print()
+        regressions = compare(load_results(args.baseline), results, args.threshold)
+        sys.exit(1 if regressions else 0)
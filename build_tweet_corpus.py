@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Converts tweet datasets (tweet_datasets/*.json and *.jsonl) into the compact
+memory-mapped .corpus format (see app_backend/tweet_corpus.py).
+
+Each <name>.json / <name>.jsonl gets a <name>.corpus next to it; the app
+prefers the .corpus when it is at least as new as its source. Re-run after
+changing a dataset:
+
+    python build_tweet_corpus.py                      # every dataset, with token IDs
+    python build_tweet_corpus.py --lowercase          # also store lowercased text
+    python build_tweet_corpus.py tweet_datasets/iphone_15_tweets.json
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+from app_backend.dataset_stream import iter_tweets
+from app_backend.tweet_corpus import write_corpus
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tweet_datasets')
+
+
+def corpus_path_for(dataset_path):
+    return os.path.splitext(dataset_path)[0] + '.corpus'
+
+
+def convert(dataset_path, lowercase=False, token_ids=True, force=False):
+    """Writes the .corpus for one dataset file; returns its path, or None when already up to date."""
+    corpus_path = corpus_path_for(dataset_path)
+    if not force and os.path.exists(corpus_path) and os.path.getmtime(corpus_path) >= os.path.getmtime(dataset_path):
+        return None
+    start = time.time()
+    count = write_corpus(corpus_path, iter_tweets(dataset_path), lowercase=lowercase, token_ids=token_ids)
+    print(f"✅ {os.path.basename(dataset_path)} -> {os.path.basename(corpus_path)}: "
+          f"{count} tweets, {os.path.getsize(corpus_path) / 1024:.0f} KB in {time.time() - start:.2f}s")
+    return corpus_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('datasets', nargs='*', help='dataset files (default: every .json/.jsonl in tweet_datasets/)')
+    parser.add_argument('--lowercase', action='store_true', help='also store lowercased text')
+    parser.add_argument('--no-token-ids', action='store_true', help='skip the token ID section')
+    parser.add_argument('--force', action='store_true', help='rebuild even when the .corpus is up to date')
+    args = parser.parse_args()
+
+    datasets = args.datasets or sorted(glob.glob(os.path.join(DATASETS_DIR, '*.json')) + glob.glob(os.path.join(DATASETS_DIR, '*.jsonl')))
+    failed = False
+    for path in datasets:
+        try:
+            if convert(path, args.lowercase, not args.no_token_ids, args.force) is None:
+                print(f"⏭️  {os.path.basename(path)}: .corpus is up to date")
+        except Exception as e:
+            print(f"❌ {path}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the backend.
+
+Imports a module (default: app) in a fresh interpreter with ``-X importtime``,
+prints the slowest imports, and exits with status 1 when the total exceeds
+the budget. Run it before deploying, or in CI, to catch a heavy dependency
+creeping back into the import path:
+
+    python check_import_time.py --budget-ms 1000
+    python check_import_time.py --module app_backend.sentiment_logic --top 15
+
+Warm-up is disabled for the measurement (WARMUP_ON_START=0), so only what
+runs at import time is counted.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+def measure_imports(module, env=None):
+    """Returns (total_us, rows) for importing module; rows are (self_us, cumulative_us, name, depth)."""
+    env = dict(os.environ if env is None else env)
+    env.setdefault('WARMUP_ON_START', '0')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), name.strip(), depth))
+    # Rows are printed as each import finishes, so the module's own tree is the
+    # run of nested rows just before its top-level row; earlier ones are interpreter startup.
+    end = max((i for i, row in enumerate(rows) if row[2] == module and row[3] == 0), default=None)
+    if end is None:
+        return 0, rows
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return rows[end][1], rows[start:end + 1]
+
+
+def report(module, total_us, rows, top=10):
+    print(f"import {module}: {total_us / 1000:.0f} ms total")
+    print("\nSlowest imports (cumulative, top-level packages):")
+    seen = set()
+    for _, cumulative_us, name, _ in sorted(rows, key=lambda r: -r[1]):
+        root = name.split('.')[0]
+        if root in seen or name == module:
+            continue
+        seen.add(root)
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+        if len(seen) >= top:
+            break
+    print("\nSlowest modules (own time):")
+    for self_us, _, name, _ in sorted(rows, key=lambda r: -r[0])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_TIME_BUDGET_MS', '1000')))
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    total_us, rows = measure_imports(args.module)
+    report(args.module, total_us, rows, args.top)
+    if total_us / 1000 > args.budget_ms:
+        print(f"\n❌ Import time {total_us / 1000:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+    print(f"\n✅ Import time within the {args.budget_ms:.0f} ms budget")
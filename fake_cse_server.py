@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Google Custom Search JSON API, for tests and benchmarks.
+
+Point the app at it with:
+    GOOGLE_CSE_ENDPOINT=http://127.0.0.1:8765/ GOOGLE_API_KEY=fake GOOGLE_CSE_ID=fake
+
+Web queries return five items with deterministic snippets mentioning the
+query; image queries return items whose links end in .png. An optional
+per-request latency simulates network round-trips. Tests can set
+``server.responses`` (query -> response body) and ``server.latencies``
+(query -> seconds) to override single queries.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def build_response(query, search_type=None):
+    """Returns a CSE-shaped JSON response for a query."""
+    slug = "_".join(query.lower().split())
+    if search_type == 'image':
+        items = [{
+            'title': f"{query} image {i}",
+            'link': f"https://images.example.com/{slug}_{i}.png",
+            'mime': 'image/png',
+        } for i in range(5)]
+    else:
+        items = [{
+            'title': f"{query} result {i}",
+            'link': f"https://www.example.com/{slug}/{i}",
+            'snippet': f"{query}: 6.1-inch OLED display, 48MP main camera, 3349 mAh battery, "
+                       f"USB-C, 5G, IP68 water resistance (result {i}).",
+        } for i in range(5)]
+    return {'kind': 'customsearch#search', 'items': items}
+
+
+class FakeCSEHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.queries.append(params.get('q'))
+        if not parsed.path.rstrip('/').endswith('customsearch/v1') or 'q' not in params:
+            self.send_error(404)
+            return
+        latency = self.server.latencies.get(params['q'], self.server.latency)
+        if latency:
+            time.sleep(latency)
+        response = self.server.responses.get(params['q'])
+        if response is None:
+            response = build_response(params['q'], params.get('searchType'))
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_cse_server(host='127.0.0.1', port=0, latency=0.0):
+    """Starts the server on a background thread; returns (server, endpoint_url)."""
+    server = ThreadingHTTPServer((host, port), FakeCSEHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.latencies = {}
+    server.responses = {}
+    server.request_count = 0
+    server.queries = []
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before each response')
+    args = parser.parse_args()
+    server, url = start_fake_cse_server(args.host, args.port, args.latency)
+    print(f"Fake CSE listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
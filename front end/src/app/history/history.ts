@@ -15,8 +15,12 @@ export class History implements OnInit {
   loading = false;
   currentPage = 1;
   totalPages = 1;
+  totalIsEstimate = false;
   hasNext = false;
   hasPrev = false;
+  private readonly perPage = 20;
+  private cursors: (string | null)[] = [null]; // cursor of each page visited; the first page has none
+  private nextCursor: string | null = null;
 
   constructor(
     private apiService: Api,
@@ -29,13 +33,19 @@ export class History implements OnInit {
 
   loadHistory(page: number = 1) {
     this.loading = true;
-    this.apiService.getSearchHistory(page, 20).subscribe({
+    // The total is only needed once; later pages skip counting
+    const total = page === 1 ? 'approx' : null;
+    this.apiService.getSearchHistory(this.cursors[page - 1], this.perPage, total).subscribe({
       next: (response) => {
         this.history = response.history;
-        this.currentPage = response.current_page;
-        this.totalPages = response.pages;
+        this.currentPage = page;
+        if (response.total !== null) {
+          this.totalPages = Math.max(1, Math.ceil(response.total / this.perPage));
+          this.totalIsEstimate = response.total_is_estimate;
+        }
+        this.nextCursor = response.next_cursor;
         this.hasNext = response.has_next;
-        this.hasPrev = response.has_prev;
+        this.hasPrev = page > 1;
         this.loading = false;
       },
       error: (err) => {
@@ -53,6 +63,7 @@ export class History implements OnInit {
 
   nextPage() {
     if (this.hasNext) {
+      this.cursors[this.currentPage] = this.nextCursor;
       this.loadHistory(this.currentPage + 1);
     }
   }
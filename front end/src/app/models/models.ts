@@ -45,6 +45,8 @@ export interface SentimentResult {
     error_message: string | null;
     overall_score: number;
     word_cloud_url: string | null;
+    word_cloud_status?: WordCloudStatus['status'] | null;
+    word_cloud_status_url?: string | null;
     price_usd?: number;
     performance_score?: number;
     battery_score?: number;
@@ -52,6 +54,13 @@ export interface SentimentResult {
     value_for_money?: number;
 }
 
+export interface WordCloudStatus {
+    job_id: string;
+    status: 'queued' | 'running' | 'done' | 'failed' | 'rejected';
+    word_cloud_url: string | null;
+    error: string | null;
+}
+
 export interface AnalysisResponse {
     product1: {
         name: string;
@@ -63,6 +72,20 @@ export interface AnalysisResponse {
     };
 }
 
+export type AnalysisStreamEventName =
+    'tweets' | 'sentiment' | 'aspects' | 'image' | 'specs' | 'word_cloud' | 'result' | 'error' | 'done';
+
+// One event of /sentiment/analyze/stream; data holds the result fields that just became available
+export interface AnalysisStreamEvent {
+    event: AnalysisStreamEventName;
+    product: 'product1' | 'product2' | null;
+    data: Partial<SentimentResult> & {
+        processed?: number;
+        error?: string;
+        products?: string[];
+    };
+}
+
 export interface SmartphoneScore {
     product_name: string;
     overall_score: number;
@@ -84,14 +107,15 @@ export interface SearchHistoryItem {
     search_time: string;
 }
 
+export type HistoryTotal = 'exact' | 'approx';
+
 export interface HistoryResponse {
     history: SearchHistoryItem[];
-    total: number;
-    pages: number;
-    current_page: number;
     per_page: number;
     has_next: boolean;
-    has_prev: boolean;
+    next_cursor: string | null; // pass as cursor to get the next page
+    total: number | null; // only when requested
+    total_is_estimate: boolean; // approx total that reached the server's cap
 }
 
 export interface PerformanceRankingsResponse {
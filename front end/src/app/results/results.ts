@@ -2,7 +2,7 @@ import { Component, OnInit, AfterViewInit } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { ActivatedRoute } from '@angular/router';
 import { Api } from '../services/api';
-import { AnalysisResponse, SentimentResult } from '../models/models';
+import { AnalysisStreamEvent, SentimentResult } from '../models/models';
 import { Chart, ChartConfiguration, registerables } from 'chart.js';
 
 // Register Chart.js components
@@ -48,25 +48,88 @@ export class Results implements OnInit, AfterViewInit {
   analyzeProducts() {
     this.loading = true;
     this.error = '';
+    this.product1Results = null;
+    this.product2Results = null;
 
-    this.apiService.analyzeSentiment(this.product1Name, this.product2Name).subscribe({
-      next: (response: AnalysisResponse) => {
-        this.product1Results = response.product1.results;
-        if (response.product2) {
-          this.product2Results = response.product2.results;
-        }
-        this.loading = false;
-
-        // Create charts after data is loaded
-        setTimeout(() => this.createCharts(), 100);
-      },
+    // Results fill in as the server streams them: counts and aspects per chunk of tweets, then the rest
+    this.apiService.analyzeSentimentStream(this.product1Name, this.product2Name).subscribe({
+      next: (event: AnalysisStreamEvent) => this.applyStreamEvent(event),
       error: (err) => {
         this.error = err.message || 'Failed to analyze sentiment';
         this.loading = false;
+      },
+      complete: () => {
+        this.loading = false;
       }
     });
   }
 
+  private applyStreamEvent(event: AnalysisStreamEvent) {
+    if (event.event === 'done' || !event.product) return;
+    if (event.event === 'error') {
+      this.error = event.data.error || 'Failed to analyze sentiment';
+      this.loading = false;
+      return;
+    }
+
+    this.loading = false;
+    const key = event.product === 'product1' ? 'product1Results' : 'product2Results';
+    const { processed, ...fields } = event.data;
+    const wordCloudSeen = !!this[key]?.word_cloud_status;
+    if (event.event === 'result' && wordCloudSeen) {
+      // Already being awaited since the 'word_cloud' event
+      delete fields.word_cloud_url;
+      delete fields.word_cloud_status;
+      delete fields.word_cloud_status_url;
+    }
+    const results: SentimentResult = Object.assign(this[key] || this.emptyResult(), fields);
+    this[key] = results;
+
+    // Word clouds render in the background; show each image once it is ready
+    if (event.event === 'word_cloud' || (event.event === 'result' && !wordCloudSeen)) {
+      this.awaitWordCloud(results);
+    }
+    if (event.event === 'result') {
+      setTimeout(() => this.createCharts(), 100);
+    }
+  }
+
+  private emptyResult(): SentimentResult {
+    return {
+      product_image_url: null,
+      product_specifications_snippet: '',
+      overall_sentiment: { positive: 0, negative: 0, neutral: 0 },
+      aspect_sentiments: {},
+      tweets_count: 0,
+      sample_tweets: [],
+      error_message: null,
+      overall_score: 0,
+      word_cloud_url: null
+    };
+  }
+
+  awaitWordCloud(results: SentimentResult | null) {
+    if (!results || !results.word_cloud_status_url || results.word_cloud_status === 'done') return;
+
+    const imageUrl = results.word_cloud_url;
+    results.word_cloud_url = null;
+    this.pollWordCloud(results, results.word_cloud_status_url, imageUrl, 5);
+  }
+
+  private pollWordCloud(results: SentimentResult, statusUrl: string, imageUrl: string | null, attempts: number) {
+    this.apiService.waitForWordCloud(statusUrl).subscribe({
+      next: (status) => {
+        results.word_cloud_status = status.status;
+        if (status.status === 'done') {
+          results.word_cloud_url = status.word_cloud_url || imageUrl;
+        } else if ((status.status === 'queued' || status.status === 'running') && attempts > 1) {
+          this.pollWordCloud(results, statusUrl, imageUrl, attempts - 1);
+        }
+      },
+      error: () => { /* keep the page usable without a word cloud */ }
+    });
+  }
+
   createCharts() {
     if (this.product1Results) {
       this.createSentimentChart('sentimentChart1', this.product1Results);
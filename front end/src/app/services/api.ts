@@ -1,12 +1,15 @@
 import { Injectable } from '@angular/core';
-import { HttpClient, HttpParams } from '@angular/common/http';
-import { Observable, catchError, throwError } from 'rxjs';
+import { HttpClient, HttpParams, HttpEventType } from '@angular/common/http';
+import { Observable, catchError, throwError, mergeMap, from } from 'rxjs';
 import {
   AnalysisResponse,
+  AnalysisStreamEvent,
   SmartphoneScore,
   HistoryResponse,
+  HistoryTotal,
   PerformanceRankingsResponse,
-  AllPerformanceCategoriesResponse
+  AllPerformanceCategoriesResponse,
+  WordCloudStatus
 } from '../models/models';
 
 @Injectable({
@@ -27,16 +30,57 @@ export class Api {
       .pipe(catchError(this.handleError));
   }
 
+  // Emits the events of the streaming analysis (NDJSON) as each line arrives
+  analyzeSentimentStream(product1: string, product2?: string): Observable<AnalysisStreamEvent> {
+    let params = new HttpParams().set('product1', product1).set('format', 'ndjson');
+    if (product2) {
+      params = params.set('product2', product2);
+    }
+
+    let consumed = 0;
+    const parseLines = (text: string, final: boolean): AnalysisStreamEvent[] => {
+      const end = final ? text.length : text.lastIndexOf('\n') + 1;
+      const lines = text.substring(consumed, end).split('\n');
+      consumed = Math.max(consumed, end);
+      return lines.filter(line => line.trim()).map(line => JSON.parse(line));
+    };
+
+    return this.http.get(`${this.API_URL}/sentiment/analyze/stream`, {
+      params, observe: 'events', reportProgress: true, responseType: 'text'
+    }).pipe(
+      mergeMap(event => {
+        if (event.type === HttpEventType.DownloadProgress) {
+          return from(parseLines((event as any).partialText || '', false));
+        }
+        if (event.type === HttpEventType.Response) {
+          return from(parseLines(event.body || '', true));
+        }
+        return from([] as AnalysisStreamEvent[]);
+      }),
+      catchError(this.handleError)
+    );
+  }
+
+  waitForWordCloud(statusUrl: string, waitSeconds: number = 20): Observable<WordCloudStatus> {
+    const params = new HttpParams().set('wait', waitSeconds.toString());
+    return this.http.get<WordCloudStatus>(statusUrl, { params })
+      .pipe(catchError(this.handleError));
+  }
+
   getTopSmartphones(limit: number = 10): Observable<{ smartphones: SmartphoneScore[] }> {
     const params = new HttpParams().set('limit', limit.toString());
     return this.http.get<{ smartphones: SmartphoneScore[] }>(`${this.API_URL}/smartphones/top`, { params })
       .pipe(catchError(this.handleError));
   }
 
-  getSearchHistory(page: number = 1, perPage: number = 20): Observable<HistoryResponse> {
-    const params = new HttpParams()
-      .set('page', page.toString())
-      .set('per_page', perPage.toString());
+  getSearchHistory(cursor: string | null = null, perPage: number = 20, total: HistoryTotal | null = null): Observable<HistoryResponse> {
+    let params = new HttpParams().set('per_page', perPage.toString());
+    if (cursor) {
+      params = params.set('cursor', cursor);
+    }
+    if (total) {
+      params = params.set('total', total);
+    }
 
     return this.http.get<HistoryResponse>(`${this.API_URL}/history`, { params })
       .pipe(catchError(this.handleError));
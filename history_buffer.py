@@ -0,0 +1,153 @@
+"""
+Optional write-behind buffer for SearchHistory rows.
+
+With ``HISTORY_WRITE_BEHIND=1`` a search is appended to an in-memory queue
+instead of being inserted in the request's transaction. A flusher thread
+per process writes the queue with one multi-row INSERT (executemany)
+whenever ``HISTORY_FLUSH_SIZE`` events are waiting or every
+``HISTORY_FLUSH_SECONDS``, and whatever is left is flushed at interpreter
+exit. The queue holds at most ``HISTORY_MAX_PENDING`` events; past that new
+events are dropped and counted, as are events of a batch that cannot be
+written and no longer fits back in the queue. History is advisory, so a
+crash loses at most the pending events.
+
+Disabled (the default), ``record`` stages the row on ``db.session`` as
+before, to be committed with the request. Either way the user's
+recent_searches row (models.RecentSearch) is upserted in the same
+transaction as the history rows.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from app_backend.metrics import registry as metrics_registry
+from models import db, SearchHistory, RecentSearch
+
+logger = logging.getLogger(__name__)
+
+
+class SearchHistoryBuffer:
+    """Collects (user_id, product_name, search_time) events and inserts them in bulk."""
+
+    def __init__(self, enabled=False, max_pending=10000, flush_size=200, flush_seconds=2.0):
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.app = None
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time, so batches are written in order
+        self._wake = threading.Event()
+        self._pid = None
+        self.flushed = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['search_history_buffer'] = self
+        if self.enabled:
+            atexit.register(self.flush)
+
+    def _ensure_started(self):
+        # The flusher starts on first use, in the process that uses it (gunicorn --preload forks after import).
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._flush_forever, name='search-history-flusher', daemon=True).start()
+            self._pid = os.getpid()
+
+    def record(self, product_name, user_id):
+        """Record one search: queued when enabled, otherwise staged on db.session (no commit)."""
+        event = {'user_id': user_id, 'product_name': product_name, 'search_time': datetime.utcnow()}
+        if not self.enabled:
+            db.session.add(SearchHistory(**event))
+            RecentSearch.record([event])
+            return
+        self._ensure_started()
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append(event)
+            if len(self._pending) >= self.flush_size:
+                self._wake.set()
+
+    def _flush_forever(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Search history flush failed: {e}")
+
+    def flush(self):
+        """Insert every pending event, in batches of flush_size; returns how many were written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.flush_size, len(self._pending)))]
+                if not batch:
+                    return written
+                if not self._write(batch):
+                    return written
+                written += len(batch)
+
+    def _write(self, batch):
+        with self.app.app_context():
+            try:
+                db.session.execute(SearchHistory.__table__.insert(), batch)
+                RecentSearch.record(batch)
+                db.session.commit()
+                with self._lock:
+                    self.flushed += len(batch)
+                return True
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Writing {len(batch)} search history events failed: {e}")
+                with self._lock:
+                    self.failed_flushes += 1
+                    room = max(0, self.max_pending - len(self._pending))
+                    self._pending.extendleft(reversed(batch[:room]))  # retried on the next flush
+                    self.dropped += len(batch) - min(room, len(batch))
+                return False
+            finally:
+                db.session.remove()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'pending': len(self._pending),
+                'flushed': self.flushed,
+                'dropped': self.dropped,
+                'failed_flushes': self.failed_flushes,
+            }
+
+
+search_history_buffer = SearchHistoryBuffer(
+    enabled=os.getenv('HISTORY_WRITE_BEHIND', '0') == '1',
+    max_pending=int(os.getenv('HISTORY_MAX_PENDING', '10000')),
+    flush_size=int(os.getenv('HISTORY_FLUSH_SIZE', '200')),
+    flush_seconds=float(os.getenv('HISTORY_FLUSH_SECONDS', '2')),
+)
+
+
+def _collect_gauges():
+    stats = search_history_buffer.stats()
+    return [
+        ('search_history_buffer_pending', 'gauge', 'Search history events waiting to be written.', [({}, stats['pending'])]),
+        ('search_history_buffer_flushed', 'counter', 'Search history events written in bulk.', [({}, stats['flushed'])]),
+        ('search_history_buffer_dropped', 'counter', 'Search history events lost because the buffer was full.', [({}, stats['dropped'])]),
+        ('search_history_buffer_failed_flushes', 'counter', 'Bulk history writes that failed (events are retried).', [({}, stats['failed_flushes'])]),
+    ]
+
+metrics_registry.register_collector(_collect_gauges)
@@ -0,0 +1,72 @@
+"""
+Fast JSON provider for the Flask app (``app.json``).
+
+Serialises with orjson when it is installed and with the standard library
+otherwise. Both ways, datetimes and dates come out as ISO 8601 strings (the
+format the handlers used to produce with isoformat()), keys stay sorted as
+with Flask's default provider, and non-ASCII text is written as UTF-8.
+"""
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is used instead
+    orjson = None
+
+
+def _default(o):
+    """Types the encoders do not handle natively"""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider backed by orjson, with the standard library as fallback."""
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def encode(self, obj, pretty=False):
+        """obj as UTF-8 JSON bytes; pretty indents by two spaces."""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits; the standard library raises for anything truly unsupported
+        dump_args = {'indent': 2} if pretty else {'separators': (',', ':')}
+        return super().dumps(obj, **dump_args).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or not set(kwargs) <= {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, pretty=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return super().loads(s)  # NaN and huge integers parse; invalid documents raise the usual error
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.encode(obj, pretty) + b"\n", mimetype=self.mimetype)
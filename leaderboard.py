@@ -0,0 +1,212 @@
+"""
+Materialized smartphone leaderboard for the rankings endpoints.
+
+The top ``LEADERBOARD_SIZE`` phones of each category are kept in memory as
+plain dicts and mirrored to the ``leaderboard_snapshots`` table (see
+models.LeaderboardSnapshot), so rankings are served without querying or
+hydrating SmartphoneScore rows.
+
+Session hooks collect the SmartphoneScore rows each flush writes, and once
+the transaction commits they are merged into the lists: a changed phone is
+re-placed in every category, and a category is re-queried only when a phone
+falls from a truncated list, where an unlisted phone could now outrank it.
+Every change bumps the snapshot version. Other processes notice the new
+version within ``LEADERBOARD_REFRESH_SECONDS`` and reload the snapshot.
+
+Writes that bypass the session (bulk UPDATEs, raw SQL) must call
+``leaderboard.rebuild()``.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event, func, select
+
+from models import db, SmartphoneScore, LeaderboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', '50'))  # the rankings endpoints cap limit at 50
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv('LEADERBOARD_REFRESH_SECONDS', '2'))
+
+# Category -> sort column; same orderings as SmartphoneScore.get_top_*
+CATEGORIES = {
+    'overall': 'overall_score',
+    'performance': 'performance_score',
+    'battery': 'battery_score',
+    'camera': 'camera_score',
+    'value': 'value_for_money',
+}
+
+FIELDS = (
+    'product_name', 'overall_score', 'positive_count', 'negative_count', 'neutral_count', 'tweets_count',
+    'price_usd', 'performance_score', 'battery_score', 'camera_score', 'value_for_money', 'last_updated',
+)
+
+
+def _entry(values):
+    """A ranked phone as a JSON-ready dict, from a row or a SmartphoneScore."""
+    entry = {field: getattr(values, field) for field in FIELDS}
+    if entry['last_updated'] is not None:
+        entry['last_updated'] = entry['last_updated'].isoformat()
+    return entry
+
+
+class Leaderboard:
+    """Per-category top-N lists of SmartphoneScore entries, best first."""
+
+    def __init__(self, size=LEADERBOARD_SIZE, refresh_seconds=LEADERBOARD_REFRESH_SECONDS):
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self.version = None
+        self._lists = None  # category -> [entry]
+        self._complete = {}  # category -> True when every phone with a value is listed
+        self._checked_at = 0.0
+        self._stale = False  # a change could not be applied; rebuild from smartphone_scores
+        self._lock = threading.Lock()
+
+    def top(self, category, limit=10):
+        """The best ``limit`` entries of category (unknown categories rank overall). Do not mutate them."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._lists.get(category, self._lists['overall'])[:limit]
+
+    def snapshot(self):
+        """(version, {category: [entry]}) of the current leaderboard."""
+        with self._lock:
+            self._ensure_fresh()
+            return self.version, dict(self._lists)
+
+    def rebuild(self):
+        """Re-query every category from smartphone_scores and store a new snapshot."""
+        with self._lock:
+            with db.engine.begin() as conn:
+                self._rebuild(conn)
+
+    def apply(self, changed, deleted=()):
+        """Merge committed changes: changed is {product_name: entry}, deleted a set of product names."""
+        with self._lock:
+            try:
+                with db.engine.begin() as conn:
+                    # Serialize writers across processes (a no-op on SQLite, which locks the file on write)
+                    conn.execute(select(LeaderboardSnapshot.category).with_for_update()).all()
+                    if not self._load(conn) or self._stale:
+                        self._rebuild(conn)
+                        return
+                    gone = set(changed) | set(deleted)
+                    for category, column in CATEGORIES.items():
+                        if not self._merge(category, column, changed, gone):
+                            self._lists[category], self._complete[category] = self._query(conn, column)
+                    self._store(conn)
+            except Exception as e:
+                logger.error(f"Leaderboard update failed, rebuilding on next read: {e}")
+                self._stale = True
+
+    def _merge(self, category, column, changed, gone):
+        """Re-place changed phones in one category; False when it has to be re-queried."""
+        current = self._lists[category]
+        complete = self._complete[category]
+        tail = current[-1][column] if current else None
+        for name in gone:
+            old = next((e for e in current if e['product_name'] == name), None)
+            new = changed.get(name)
+            value = new[column] if new else None
+            if old is not None and not complete and (value is None or value < tail):
+                return False  # an unlisted phone may now rank above it, or fill its place
+        merged = [e for e in current if e['product_name'] not in gone]
+        merged += [e for name, e in changed.items() if e[column] is not None]
+        merged.sort(key=lambda e: e[column], reverse=True)
+        if not complete:
+            # Unlisted phones rank at most at the old tail, so anything below it may be out of order
+            merged = [e for e in merged if e[column] >= tail]
+        self._complete[category] = complete and len(merged) <= self.size
+        self._lists[category] = merged[:self.size]
+        return True
+
+    def _ensure_fresh(self):
+        # Called with the lock held; checks the stored version at most every refresh_seconds
+        now = time.monotonic()
+        if self._lists is not None and not self._stale and now - self._checked_at < self.refresh_seconds:
+            return
+        with db.engine.begin() as conn:
+            if self._stale or not self._load(conn):
+                self._rebuild(conn)
+        self._checked_at = now
+
+    def _load(self, conn):
+        """Adopt the stored snapshot when it is newer than ours; False when there is none."""
+        version = conn.execute(select(func.max(LeaderboardSnapshot.version))).scalar()
+        if version is None:
+            return False
+        if version != self.version or self._lists is None:
+            rows = conn.execute(select(LeaderboardSnapshot.category, LeaderboardSnapshot.complete,
+                                       LeaderboardSnapshot.entries)).all()
+            lists = {category: json.loads(entries) for category, complete, entries in rows}
+            if set(lists) != set(CATEGORIES):
+                return False
+            self._lists = lists
+            self._complete = {category: bool(complete) for category, complete, entries in rows}
+            self.version = version
+        return True
+
+    def _query(self, conn, column):
+        col = getattr(SmartphoneScore, column)
+        rows = conn.execute(
+            select(*(getattr(SmartphoneScore, f) for f in FIELDS))
+            .where(col.isnot(None)).order_by(col.desc()).limit(self.size + 1)
+        ).all()
+        return [_entry(row) for row in rows[:self.size]], len(rows) <= self.size
+
+    def _rebuild(self, conn):
+        self._lists, self._complete = {}, {}
+        for category, column in CATEGORIES.items():
+            self._lists[category], self._complete[category] = self._query(conn, column)
+        self.version = conn.execute(select(func.max(LeaderboardSnapshot.version))).scalar()
+        self._store(conn)
+        self._stale = False
+        self._checked_at = time.monotonic()
+
+    def _store(self, conn):
+        self.version = (self.version or 0) + 1
+        table = LeaderboardSnapshot.__table__
+        conn.execute(table.delete())
+        conn.execute(table.insert(), [{
+            'category': category, 'version': self.version, 'complete': self._complete[category],
+            'entries': json.dumps(entries), 'updated_at': datetime.utcnow(),
+        } for category, entries in self._lists.items()])
+
+
+leaderboard = Leaderboard()
+
+
+# --- Session hooks: collect SmartphoneScore writes per transaction, apply them on commit ---
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    changed = session.info.setdefault('leaderboard_changed', {})
+    deleted = session.info.setdefault('leaderboard_deleted', set())
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, SmartphoneScore):
+            changed[obj.product_name] = _entry(obj)
+            deleted.discard(obj.product_name)
+    for obj in session.deleted:
+        if isinstance(obj, SmartphoneScore):
+            deleted.add(obj.product_name)
+            changed.pop(obj.product_name, None)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_changes(session):
+    changed = session.info.pop('leaderboard_changed', None)
+    deleted = session.info.pop('leaderboard_deleted', None)
+    if changed or deleted:
+        leaderboard.apply(changed or {}, deleted or ())
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('leaderboard_changed', None)
+    session.info.pop('leaderboard_deleted', None)
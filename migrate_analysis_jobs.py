@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add the AnalysisJob table (asynchronous analysis jobs).
+This script adds the new table while preserving existing data.
+"""
+
+import os
+from dotenv import load_dotenv
+from flask import Flask
+from models import db, AnalysisJob
+
+def create_app():
+    """Create and configure the Flask app for database migration."""
+    load_dotenv()
+    
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///sentiment_app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+    
+    # Initialize extensions
+    db.init_app(app)
+    
+    return app
+
+def migrate_database():
+    """Add the AnalysisJob table to the existing database."""
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            # Create the new table (existing tables are left untouched)
+            print("Creating AnalysisJob table...")
+            db.create_all()
+            print("✅ AnalysisJob table created successfully!")
+            
+            # Check if table exists and is accessible
+            existing_jobs = AnalysisJob.query.count()
+            print(f"📊 Current analysis jobs in database: {existing_jobs}")
+            
+        except Exception as e:
+            print(f"❌ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    print("🚀 Starting database migration...")
+    migrate_database()
+    print("✅ Migration completed successfully!")
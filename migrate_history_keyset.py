@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Database migration script for keyset pagination of the search history:
+adds the (user_id, search_time, id) index on SearchHistory and the RecentSearch
+table, then fills RecentSearch from the existing history.
+This script preserves existing data and can be run more than once.
+"""
+
+import os
+from dotenv import load_dotenv
+from flask import Flask
+from sqlalchemy import text
+from models import db, SearchHistory, RecentSearch
+
+def create_app():
+    """Create and configure the Flask app for database migration."""
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///sentiment_app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+
+    # Initialize extensions
+    db.init_app(app)
+
+    return app
+
+def migrate_database():
+    """Add the history index and the RecentSearch table, and backfill it."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            print("Creating RecentSearch table...")
+            db.create_all()
+            print("✅ RecentSearch table created successfully!")
+
+            # create_all only creates indexes together with new tables
+            print("Creating the search history index...")
+            for index in SearchHistory.__table__.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+                print(f"✅ {index.name}")
+
+            # Rebuilt from scratch, so running the script again is harmless
+            print("Filling recent searches from the search history...")
+            db.session.execute(RecentSearch.__table__.delete())
+            db.session.execute(text(
+                "INSERT INTO recent_searches (user_id, product_name, last_searched, search_count) "
+                "SELECT user_id, product_name, MAX(search_time), COUNT(*) "
+                "FROM search_history GROUP BY user_id, product_name"
+            ))
+            db.session.commit()
+
+            print(f"📊 Search history entries: {SearchHistory.query.count()}")
+            print(f"📊 Recent searches (one per user and product): {RecentSearch.query.count()}")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    print("🚀 Starting database migration...")
+    migrate_database()
+    print("✅ Migration completed successfully!")
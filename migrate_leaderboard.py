@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add the materialized leaderboard (LeaderboardSnapshot table)
+and the indexes on the SmartphoneScore ranking columns, then build the first snapshot.
+This script preserves existing data and can be run more than once.
+"""
+
+import os
+from dotenv import load_dotenv
+from flask import Flask
+from models import db, SmartphoneScore, LeaderboardSnapshot
+from leaderboard import leaderboard, CATEGORIES
+
+def create_app():
+    """Create and configure the Flask app for database migration."""
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///sentiment_app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+
+    # Initialize extensions
+    db.init_app(app)
+
+    return app
+
+def migrate_database():
+    """Add the LeaderboardSnapshot table and ranking indexes, then build the leaderboard."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            print("Creating LeaderboardSnapshot table...")
+            db.create_all()
+            print("✅ LeaderboardSnapshot table created successfully!")
+
+            # create_all only creates indexes together with new tables
+            print("Creating indexes on the ranking columns...")
+            for index in SmartphoneScore.__table__.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+                print(f"✅ {index.name}")
+
+            print("Building the leaderboard snapshot...")
+            leaderboard.rebuild()
+            for snapshot in LeaderboardSnapshot.query.all():
+                print(f"🏆 {snapshot.category} ({CATEGORIES[snapshot.category]}): version {snapshot.version}")
+
+        except Exception as e:
+            print(f"❌ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    print("🚀 Starting database migration...")
+    migrate_database()
+    print("✅ Migration completed successfully!")
@@ -7,6 +7,7 @@ import os
 from dotenv import load_dotenv
 from flask import Flask
 from models import db, SmartphoneScore
+import leaderboard  # noqa: F401 (its session hooks update the leaderboard snapshot on commit)
 import random  # For generating test data
 
 def create_app():
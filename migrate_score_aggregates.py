@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add exact running-sum aggregates to the SmartphoneScore table.
+Adds the new columns and backfills them from the existing (averaged) columns, preserving scores.
+"""
+
+import os
+from dotenv import load_dotenv
+from flask import Flask
+from sqlalchemy import inspect, text
+from models import db, SmartphoneScore
+
+NEW_COLUMNS = {
+    'compound_sum': 'FLOAT',
+    'total_tweets': 'INTEGER',
+    'total_positive': 'INTEGER',
+    'total_negative': 'INTEGER',
+    'total_neutral': 'INTEGER',
+    'aspect_counts': 'TEXT',
+}
+
+def create_app():
+    """Create and configure the Flask app for database migration."""
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///sentiment_app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+
+    # Initialize extensions
+    db.init_app(app)
+
+    return app
+
+def migrate_database():
+    """Add the aggregate columns to SmartphoneScore and backfill them."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            db.create_all()
+            existing_columns = {c['name'] for c in inspect(db.engine).get_columns(SmartphoneScore.__tablename__)}
+            missing = [name for name in NEW_COLUMNS if name not in existing_columns]
+            for name in missing:
+                print(f"Adding column smartphone_scores.{name}...")
+                db.session.execute(text(f"ALTER TABLE smartphone_scores ADD COLUMN {name} {NEW_COLUMNS[name]}"))
+            db.session.commit()
+            print(f"✅ {len(missing)} columns added")
+
+            # Each row holds per-analysis averages, so the sums are the averages times the
+            # number of analyses; the overall score (sum / tweets) is unchanged by the backfill.
+            print("Backfilling aggregates from existing scores...")
+            backfilled = db.session.execute(text(
+                "UPDATE smartphone_scores SET "
+                " total_tweets = COALESCE(tweets_count, 0) * COALESCE(analysis_count, 1),"
+                " total_positive = COALESCE(positive_count, 0) * COALESCE(analysis_count, 1),"
+                " total_negative = COALESCE(negative_count, 0) * COALESCE(analysis_count, 1),"
+                " total_neutral = COALESCE(neutral_count, 0) * COALESCE(analysis_count, 1),"
+                " compound_sum = COALESCE(overall_score, 0) * COALESCE(tweets_count, 0) * COALESCE(analysis_count, 1),"
+                " aspect_counts = COALESCE(aspect_counts, '{}') "
+                "WHERE total_tweets IS NULL"
+            )).rowcount
+            db.session.commit()
+            print(f"✅ {backfilled} smartphone scores backfilled")
+
+            existing_scores = SmartphoneScore.query.count()
+            print(f"📊 Current smartphone scores in database: {existing_scores}")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    print("🚀 Starting database migration...")
+    migrate_database()
+    print("✅ Migration completed successfully!")
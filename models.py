@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from flask_bcrypt import Bcrypt
+import json
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -28,6 +29,9 @@ class User(db.Model, UserMixin):
 # --- NEW CLASS ADDED ---
 class SearchHistory(db.Model):
     __tablename__ = 'search_history'
+    __table_args__ = (
+        db.Index('ix_search_history_user_time', 'user_id', 'search_time', 'id'),  # keyset pagination
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     product_name = db.Column(db.String(255), nullable=False)
@@ -42,13 +46,64 @@ class SearchHistory(db.Model):
     def __repr__(self):
         return f'<SearchHistory {self.product_name} by User {self.user_id}>'
 
+# --- NEW CLASS FOR THE RECENT SEARCHES SIDEBAR ---
+class RecentSearch(db.Model):
+    """One row per user and product searched, kept up to date with every SearchHistory insert"""
+    __tablename__ = 'recent_searches'
+    __table_args__ = (
+        db.Index('ix_recent_searches_user_time', 'user_id', 'last_searched'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    product_name = db.Column(db.String(255), primary_key=True)
+    last_searched = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    search_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<RecentSearch {self.product_name} by User {self.user_id}>'
+
+    @classmethod
+    def record(cls, events):
+        """Upsert {user_id, product_name, search_time} events in the current transaction (no commit)"""
+        merged = {}
+        for event in events:
+            key = (event['user_id'], event['product_name'])
+            row = merged.setdefault(key, {'user_id': key[0], 'product_name': key[1],
+                                          'last_searched': event['search_time'], 'search_count': 0})
+            row['last_searched'] = max(row['last_searched'], event['search_time'])
+            row['search_count'] += 1
+        if not merged:
+            return
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+                latest = db.func.max  # two-argument max() is scalar in SQLite
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+                latest = db.func.greatest
+            stmt = insert(cls.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['user_id', 'product_name'],
+                set_={'last_searched': latest(cls.__table__.c.last_searched, stmt.excluded.last_searched),
+                      'search_count': cls.__table__.c.search_count + stmt.excluded.search_count})
+            db.session.execute(stmt, list(merged.values()))
+            return
+        for row in merged.values():  # other databases: read-modify-write through the ORM
+            recent = db.session.get(cls, (row['user_id'], row['product_name']))
+            if recent is None:
+                db.session.add(cls(**row))
+            else:
+                recent.last_searched = max(recent.last_searched, row['last_searched'])
+                recent.search_count += row['search_count']
+
 # --- NEW CLASS FOR SMARTPHONE SCORES ---
 class SmartphoneScore(db.Model):
     __tablename__ = 'smartphone_scores'
 
     id = db.Column(db.Integer, primary_key=True)
     product_name = db.Column(db.String(255), nullable=False, unique=True)
-    overall_score = db.Column(db.Float, nullable=False)
+    overall_score = db.Column(db.Float, nullable=False, index=True)
     positive_count = db.Column(db.Integer, default=0)
     negative_count = db.Column(db.Integer, default=0)
     neutral_count = db.Column(db.Integer, default=0)
@@ -56,50 +111,122 @@ class SmartphoneScore(db.Model):
     last_updated = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     analysis_count = db.Column(db.Integer, default=1)  # How many times this phone was analyzed
 
+    # Exact running sums over every analyzed tweet; the columns above are derived from them.
+    # NULL on rows written before these existed (see migrate_score_aggregates.py).
+    compound_sum = db.Column(db.Float, nullable=True)  # Sum of the tweets' VADER compound scores
+    total_tweets = db.Column(db.Integer, nullable=True)
+    total_positive = db.Column(db.Integer, nullable=True)
+    total_negative = db.Column(db.Integer, nullable=True)
+    total_neutral = db.Column(db.Integer, nullable=True)
+    aspect_counts = db.Column(db.Text, nullable=True)  # JSON: {aspect: {positive, negative, neutral, mentions}}
+
     # NEW: Price and performance metrics
     price_usd = db.Column(db.Float, nullable=True)  # Price in USD
     price_currency = db.Column(db.String(3), default='USD')  # Currency code
-    performance_score = db.Column(db.Float, nullable=True)  # Overall performance score (0-100)
-    battery_score = db.Column(db.Float, nullable=True)  # Battery performance (0-100)
-    camera_score = db.Column(db.Float, nullable=True)  # Camera quality (0-100)
+    performance_score = db.Column(db.Float, nullable=True, index=True)  # Overall performance score (0-100)
+    battery_score = db.Column(db.Float, nullable=True, index=True)  # Battery performance (0-100)
+    camera_score = db.Column(db.Float, nullable=True, index=True)  # Camera quality (0-100)
     display_score = db.Column(db.Float, nullable=True)  # Display quality (0-100)
     build_quality_score = db.Column(db.Float, nullable=True)  # Build quality (0-100)
-    value_for_money = db.Column(db.Float, nullable=True)  # Value for money ratio (sentiment_score/price)
+    value_for_money = db.Column(db.Float, nullable=True, index=True)  # Value for money ratio (sentiment_score/price)
 
     def __repr__(self):
         return f'<SmartphoneScore {self.product_name}: {self.overall_score}>'
 
-    def update_score(self, new_results):
-        """Update the score with new analysis results"""
-        # Calculate weighted average based on analysis count
-        total_weight = self.analysis_count + 1
-
-        # Update overall score (weighted average)
-        self.overall_score = round(
-            (self.overall_score * self.analysis_count + new_results['overall_score']) / total_weight, 3
-        )
-
-        # Update sentiment counts (weighted average)
-        new_positive = new_results['overall_sentiment']['positive']
-        new_negative = new_results['overall_sentiment']['negative']
-        new_neutral = new_results['overall_sentiment']['neutral']
-
-        self.positive_count = round(
-            (self.positive_count * self.analysis_count + new_positive) / total_weight
-        )
-        self.negative_count = round(
-            (self.negative_count * self.analysis_count + new_negative) / total_weight
-        )
-        self.neutral_count = round(
-            (self.neutral_count * self.analysis_count + new_neutral) / total_weight
-        )
-        self.tweets_count = round(
-            (self.tweets_count * self.analysis_count + new_results['tweets_count']) / total_weight
-        )
-
-        self.analysis_count += 1
+    @staticmethod
+    def aggregates_from_results(results, aggregates=None):
+        """The additive aggregates of one analysis result, given its exact sums when known"""
+        aggregates = aggregates or {}
+        sentiment = results.get('overall_sentiment') or {}
+        tweets = results.get('tweets_count') or 0
+        return {
+            # Without the exact sums only the rounded mean is known
+            'compound_sum': aggregates.get('compound_sum', (results.get('overall_score') or 0.0) * tweets),
+            'total_tweets': tweets,
+            'total_positive': sentiment.get('positive', 0),
+            'total_negative': sentiment.get('negative', 0),
+            'total_neutral': sentiment.get('neutral', 0),
+            'aspect_counts': aggregates.get('aspect_counts', results.get('aspect_sentiments') or {}),
+        }
+
+    def _ensure_aggregates(self):
+        """Rebuild missing sums from the derived columns (rows from before the sums existed)"""
+        if self.total_tweets is not None:
+            return
+        analyses = self.analysis_count or 1
+        self.total_tweets = (self.tweets_count or 0) * analyses
+        self.total_positive = (self.positive_count or 0) * analyses
+        self.total_negative = (self.negative_count or 0) * analyses
+        self.total_neutral = (self.neutral_count or 0) * analyses
+        self.compound_sum = (self.overall_score or 0.0) * self.total_tweets
+        self.aspect_counts = self.aspect_counts or '{}'
+
+    def merge_aggregates(self, aggregates, analyses=1):
+        """Add another set of sums (one analysis, or several merged); O(1) in the number of tweets.
+
+        Merging is a plain addition, so batches can be merged in any order.
+        """
+        self._ensure_aggregates()
+        self.compound_sum += aggregates['compound_sum']
+        self.total_tweets += aggregates['total_tweets']
+        self.total_positive += aggregates['total_positive']
+        self.total_negative += aggregates['total_negative']
+        self.total_neutral += aggregates['total_neutral']
+        aspect_counts = json.loads(self.aspect_counts or '{}')
+        for aspect, counts in aggregates['aspect_counts'].items():
+            merged = aspect_counts.setdefault(aspect, {'positive': 0, 'negative': 0, 'neutral': 0, 'mentions': 0})
+            for key in merged:
+                merged[key] += counts.get(key, 0)
+        self.aspect_counts = json.dumps(aspect_counts, sort_keys=True)
+        self.analysis_count = (self.analysis_count or 0) + analyses
+        self._derive_scores()
         self.last_updated = datetime.utcnow()
 
+    def _derive_scores(self):
+        """Recompute the displayed score and per-analysis counts from the exact sums"""
+        analyses = self.analysis_count or 1
+        self.overall_score = round(self.compound_sum / self.total_tweets, 3) if self.total_tweets else 0.0
+        self.positive_count = round(self.total_positive / analyses)
+        self.negative_count = round(self.total_negative / analyses)
+        self.neutral_count = round(self.total_neutral / analyses)
+        self.tweets_count = round(self.total_tweets / analyses)
+
+    def update_score(self, new_results, aggregates=None):
+        """Update the score with new analysis results"""
+        self.merge_aggregates(self.aggregates_from_results(new_results, aggregates))
+
+    def get_aspect_counts(self):
+        return json.loads(self.aspect_counts) if self.aspect_counts else {}
+
+    @classmethod
+    def record_results(cls, results_by_product, aggregates_by_product=None):
+        """Stage score upserts for {product_name: analysis results} (no commit)
+
+        aggregates_by_product maps product names to the exact sums of their
+        analysis (see sentiment_logic.iter_product_sentiment_analysis).
+        Existing rows are loaded with one query, so a batch of any size costs a
+        single SELECT plus one flush at commit.
+        """
+        names = list(results_by_product)
+        existing = {}
+        for start in range(0, len(names), 500):  # keep IN lists under database parameter limits
+            for score in cls.query.filter(cls.product_name.in_(names[start:start + 500])).all():
+                existing[score.product_name] = score
+        aggregates_by_product = aggregates_by_product or {}
+        new_scores = []
+        for product_name, results in results_by_product.items():
+            aggregates = aggregates_by_product.get(product_name)
+            if product_name in existing:
+                existing[product_name].update_score(results, aggregates)
+            else:
+                score = cls(product_name=product_name, overall_score=0.0, analysis_count=0,
+                            compound_sum=0.0, total_tweets=0, total_positive=0, total_negative=0,
+                            total_neutral=0, aspect_counts='{}')
+                score.merge_aggregates(cls.aggregates_from_results(results, aggregates))
+                new_scores.append(score)
+        db.session.add_all(new_scores)
+        return len(existing), len(new_scores)
+
     @classmethod
     def get_top_smartphones(cls, limit=10):
         """Get top smartphones by overall sentiment score"""
@@ -123,4 +250,61 @@ class SmartphoneScore(db.Model):
     @classmethod
     def get_top_value_smartphones(cls, limit=10):
         """Get top smartphones by value for money"""
-        return cls.query.filter(cls.value_for_money.isnot(None)).order_by(cls.value_for_money.desc()).limit(limit).all()
\ No newline at end of file
+        return cls.query.filter(cls.value_for_money.isnot(None)).order_by(cls.value_for_money.desc()).limit(limit).all()
+
+# --- NEW CLASS FOR THE MATERIALIZED LEADERBOARD ---
+class LeaderboardSnapshot(db.Model):
+    __tablename__ = 'leaderboard_snapshots'
+
+    category = db.Column(db.String(32), primary_key=True)  # overall/performance/battery/camera/value
+    version = db.Column(db.Integer, nullable=False, default=0)  # same for every category of one snapshot
+    complete = db.Column(db.Boolean, nullable=False, default=True)  # False when more phones exist than listed
+    entries = db.Column(db.Text, nullable=False, default='[]')  # JSON list of ranked phones, best first
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<LeaderboardSnapshot {self.category} v{self.version}>'
+
+# --- NEW CLASS FOR ASYNCHRONOUS ANALYSIS JOBS ---
+class AnalysisJob(db.Model):
+    __tablename__ = 'analysis_jobs'
+    __table_args__ = (
+        db.Index('ix_analysis_jobs_key_status', 'job_key', 'status'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    job_key = db.Column(db.String(520), nullable=False)  # normalized product names, for de-duplication
+    product1 = db.Column(db.String(255), nullable=False)
+    product2 = db.Column(db.String(255), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # who submitted it first
+    status = db.Column(db.String(16), nullable=False, default='queued')  # queued/running/done/failed
+    progress = db.Column(db.Float, nullable=False, default=0.0)  # 0.0 to 1.0
+    result = db.Column(db.Text, nullable=True)  # JSON, same shape as /sentiment/analyze
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # last sign of life from its worker
+    finished_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # finished jobs are purged after this
+
+    def __repr__(self):
+        return f'<AnalysisJob {self.id} {self.status}>'
+
+    @property
+    def products(self):
+        return [self.product1] + ([self.product2] if self.product2 else [])
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'products': self.products,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'expires_at': self.expires_at
+        }
\ No newline at end of file
@@ -8,6 +8,7 @@ import os
 from dotenv import load_dotenv
 from flask import Flask
 from models import db, SmartphoneScore
+from leaderboard import leaderboard
 from datetime import datetime
 
 def create_app():
@@ -160,6 +161,7 @@ def populate_test_data():
                     print(f"⚠️ Skipped: {smartphone_data['product_name']} (already exists)")
             
             db.session.commit()
+            leaderboard.rebuild()  # the bulk delete above bypasses the leaderboard's session hooks
             
             # Verify data
             total_count = SmartphoneScore.query.count()
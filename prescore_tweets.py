@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Scores every tweet of the local datasets once and stores the results in
+tweet_datasets/tweet_scores.sqlite3 (see app_backend/score_store.py).
+
+The app then looks tweets up in the store and only scores text it has never
+seen. Re-runs are incremental: tweets already scored with the current
+lexicon and aspect table are skipped. Scoring runs on a process pool, one
+process per core by default:
+
+    python prescore_tweets.py                        # every dataset in tweet_datasets/
+    python prescore_tweets.py --workers 4 --prune    # also drop scores of older versions
+    python prescore_tweets.py tweet_datasets/iphone_15_tweets.json
+"""
+
+import argparse
+import glob
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from app_backend.batch_analysis import BATCH_START_METHOD, batch_worker_count
+from app_backend.dataset_stream import iter_tweets
+from app_backend.score_store import TweetScoreStore
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tweet_datasets')
+CHUNK_SIZE = 1000  # tweets per task
+
+
+def _init_worker():
+    logging.basicConfig(level=logging.WARNING)
+    from app_backend.sentiment_logic import load_nlp_resources
+    load_nlp_resources()
+
+
+def _score(texts):
+    from app_backend.sentiment_logic import score_tweets
+    return [tuple(analysis) for analysis in score_tweets(texts)]
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def prescore(datasets, store, workers=None):
+    """Scores the tweets of datasets missing from store; returns (seen, scored)."""
+    from app_backend.sentiment_logic import load_nlp_resources, aspect_matcher, tweet_cache_key, tweet_score_version
+    load_nlp_resources()
+    version = tweet_score_version(aspect_matcher)
+    workers = batch_worker_count(os.cpu_count() or 1, workers)
+    print(f"🔑 Score version {version}; {workers} worker processes")
+
+    seen_keys = set()
+    seen = scored = 0
+    context = multiprocessing.get_context(BATCH_START_METHOD)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        in_flight = {}
+
+        def collect(return_when):
+            nonlocal scored
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                keys = in_flight.pop(future)
+                store.put_many(version, zip(keys, future.result()))
+                scored += len(keys)
+
+        for path in datasets:
+            start, before = time.time(), scored
+            for chunk in _chunks(iter_tweets(path), CHUNK_SIZE):
+                todo = {}
+                for text in chunk:
+                    key = tweet_cache_key(text, aspect_matcher)
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        todo[key] = text
+                seen += len(chunk)
+                keys = store.missing(list(todo))
+                if not keys:
+                    continue
+                # Bounded read-ahead: a huge dataset never sits in memory all at once
+                while len(in_flight) >= workers * 2:
+                    collect(FIRST_COMPLETED)
+                in_flight[pool.submit(_score, [todo[k] for k in keys])] = keys
+            if in_flight:
+                collect('ALL_COMPLETED')
+            print(f"✅ {os.path.basename(path)}: {scored - before} tweets scored in {time.time() - start:.1f}s")
+    return seen, scored
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('datasets', nargs='*', help='dataset files (default: every .json/.jsonl in tweet_datasets/)')
+    parser.add_argument('--store', default=None, help='score store path (default: TWEET_SCORE_DB or tweet_datasets/tweet_scores.sqlite3)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: BATCH_WORKERS or the core count)')
+    parser.add_argument('--prune', action='store_true', help='delete scores computed with other lexicon/aspect versions')
+    args = parser.parse_args()
+
+    if args.store:
+        os.environ['TWEET_SCORE_DB'] = args.store
+    from app_backend.sentiment_logic import TWEET_SCORE_DB, aspect_matcher, tweet_score_version
+
+    datasets = args.datasets or sorted(glob.glob(os.path.join(DATASETS_DIR, '*.json')) + glob.glob(os.path.join(DATASETS_DIR, '*.jsonl')))
+    store = TweetScoreStore(TWEET_SCORE_DB, readonly=False)
+    try:
+        started = time.time()
+        seen, scored = prescore(datasets, store, args.workers)
+        print(f"\n📊 {seen} tweets read, {scored} newly scored in {time.time() - started:.1f}s")
+        if args.prune:
+            removed = store.prune(tweet_score_version(aspect_matcher))
+            print(f"🧹 Removed {removed} scores from older versions")
+        for version, count in store.counts().items():
+            print(f"💾 {count} tweets stored for version {version}")
+    except Exception as e:
+        print(f"❌ Pre-scoring failed: {e}")
+        sys.exit(1)
+    finally:
+        store.close()
@@ -0,0 +1,137 @@
+"""
+Concurrent Google lookups (fetch_product_image_url, fetch_product_specifications_snippet)
+against the local fake CSE server (fake_cse_server.py).
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Keep the API cache out of the working tree; it is disabled per test below.
+os.environ.setdefault('API_CACHE_DB', os.path.join(tempfile.mkdtemp(prefix='cse-test-'), 'api_cache.sqlite3'))
+
+from app_backend import sentiment_logic as logic
+from fake_cse_server import start_fake_cse_server
+
+LATENCY = 0.5
+
+
+@pytest.fixture(scope='module')
+def server():
+    server, url = start_fake_cse_server()
+    server.url = url
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def cse(server, monkeypatch):
+    monkeypatch.setenv('GOOGLE_CSE_ENDPOINT', server.url)
+    monkeypatch.setenv('GOOGLE_API_KEY', 'fake')
+    monkeypatch.setenv('GOOGLE_CSE_ID', 'fake')
+    monkeypatch.setattr(logic, 'api_cache_store', None)  # every lookup reaches the server
+    logic.get_cse_service('fake')  # build the client before anything is timed
+    server.latency = 0.0
+    server.latencies.clear()
+    server.responses.clear()
+    with server.lock:
+        server.request_count = 0
+        server.queries.clear()
+    return server
+
+
+def _web_response(snippet):
+    return {'kind': 'customsearch#search', 'items': [{'title': 'result', 'link': 'https://www.example.com/', 'snippet': snippet}]}
+
+
+EMPTY = {'kind': 'customsearch#search', 'items': []}
+
+
+def _baseline_specifications_snippet(product_name):
+    # The sequential lookup the concurrent one replaced; its answer must not change.
+    queries = [f"{product_name} key specifications list", f"{product_name} official tech specs", f"{product_name} gsmarena specifications"]
+    best_snippet = "Detailed specifications snippet not found."
+    max_score = 0
+    for q in queries:
+        snip = logic.fetch_google_search_result(q, product_name)
+        if snip:
+            score = len(snip)
+            if "gsmarena" in q.lower(): score += 100
+            if score > max_score and len(snip) > 50: max_score = score; best_snippet = snip
+            if "gsmarena" in q.lower() and len(snip) > 100: return snip
+    return best_snippet
+
+
+def test_image_first_non_empty_url_wins(cse):
+    product = "Pixel Image Race"
+    cse.responses[f"{product} official product image png"] = EMPTY
+    cse.latencies[f"{product} official product image white background"] = 0.1
+    cse.latencies[f"{product} product photo"] = 3 * LATENCY
+
+    started = time.perf_counter()
+    url = logic.fetch_product_image_url(product)
+    elapsed = time.perf_counter() - started
+
+    assert url == "https://images.example.com/pixel_image_race_official_product_image_white_background_0.png"
+    assert elapsed < 3 * LATENCY  # did not wait for the slow query
+
+
+def test_image_no_url_returns_none(cse):
+    product = "Pixel No Image"
+    for q in (f"{product} official product image png", f"{product} official product image white background", f"{product} product photo"):
+        cse.responses[q] = EMPTY
+    assert logic.fetch_product_image_url(product) is None
+    assert cse.request_count == 3
+
+
+@pytest.mark.parametrize('snippets', [
+    # Long gsmarena snippet: wins outright even though it arrives last
+    {'key specifications list': 'k' * 150, 'official tech specs': 'o' * 180, 'gsmarena specifications': 'g' * 120},
+    # Short gsmarena snippet: best score, gsmarena counting 100 extra
+    {'key specifications list': 'k' * 150, 'official tech specs': 'o' * 90, 'gsmarena specifications': 'g' * 60},
+    {'key specifications list': 'k' * 180, 'official tech specs': 'o' * 90, 'gsmarena specifications': 'g' * 60},
+    # No gsmarena answer, or nothing long enough
+    {'key specifications list': 'k' * 80, 'official tech specs': 'o' * 90, 'gsmarena specifications': None},
+    {'key specifications list': 'k' * 40, 'official tech specs': None, 'gsmarena specifications': 'g' * 30},
+])
+def test_specifications_snippet_matches_sequential_rule(cse, snippets):
+    product = "Galaxy Specs Race"
+    for suffix, snippet in snippets.items():
+        cse.responses[f"{product} {suffix}"] = _web_response(snippet) if snippet else EMPTY
+    cse.latencies[f"{product} gsmarena specifications"] = 0.2  # the winning query finishes last
+
+    expected = _baseline_specifications_snippet(product)
+    assert logic.fetch_product_specifications_snippet(product) == expected
+
+
+def test_queries_run_concurrently(cse):
+    cse.latency = LATENCY
+    started = time.perf_counter()
+    assert logic.fetch_product_image_url("Pixel Concurrent")
+    assert logic.fetch_product_specifications_snippet("Pixel Concurrent").startswith("Pixel Concurrent gsmarena specifications")
+    elapsed = time.perf_counter() - started
+
+    # Two helpers of three queries each: about one round-trip per helper, not three
+    assert elapsed < 2 * (2 * LATENCY)
+    assert cse.request_count == 6
+
+
+def test_queries_not_started_are_cancelled(cse, monkeypatch):
+    # With one query worker the later queries wait in the executor's queue. The worker may
+    # pick up the second before the race sees the first answer, but never the third.
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(logic, '_query_executor', executor)
+    cse.latency = LATENCY
+    try:
+        started = time.perf_counter()
+        url = logic.fetch_product_image_url("Pixel Cancel")
+        elapsed = time.perf_counter() - started
+    finally:
+        executor.shutdown(wait=True)
+
+    assert url == "https://images.example.com/pixel_cancel_official_product_image_png_0.png"
+    assert elapsed < 2 * LATENCY
+    assert cse.queries[0] == "Pixel Cancel official product image png"
+    assert "Pixel Cancel product photo" not in cse.queries